@@ -0,0 +1,52 @@
+"""Request body size limit, enforced before the body is parsed."""
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+# Multipart boundaries, part headers and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than max_bytes with 413.
+
+    Starlette parses (and spools to disk) a whole multipart body before the
+    route runs, so a limit checked in the route only applies once the
+    upload has been received in full. This rejects a declared
+    Content-Length over the limit without reading the body, and aborts a
+    body without one (chunked) as soon as the bytes received cross it.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> str:
+        return f"Request body too large. Maximum size is {self.max_bytes // (1024 * 1024)}MB"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": self._too_large()}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing; FastAPI re-raises HTTPExceptions as they are
+                    raise HTTPException(status_code=413, detail=self._too_large())
+            return message
+
+        await self.app(scope, limited_receive, send)
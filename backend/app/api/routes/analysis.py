@@ -1,23 +1,79 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import Optional
+import asyncio
+import hashlib
+import json
 import os
 import uuid
 
-from app.models.database import get_db
-from app.models.models import Analysis, Paper, AnalysisStatus, PaperSourceType
+from app.models.database import AsyncSessionLocal, get_async_db
+from app.models.models import Analysis, Paper, Quote, AnalysisStatus, PaperSourceType, QuoteStatus
 from app.config import get_settings
 from app.api.schemas import AnalysisResponse, AnalysisCreate, AnalysisListResponse
 
 router = APIRouter()
 settings = get_settings()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+async def save_upload(file: UploadFile, file_path: str) -> str:
+    """
+    Copy an upload to its final path in chunks, hashing it on the way.
+
+    By the time the route runs, Starlette has already received the whole
+    multipart body and spooled the file; the request body is capped before
+    that by BodySizeLimitMiddleware (app/api/middleware.py). This enforces
+    max_upload_size_mb on the file itself. File I/O runs off the event loop
+    and memory use stays at one chunk.
+
+    Returns:
+        SHA-256 hash of the file content
+    """
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+
+    f = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {settings.max_upload_size_mb}MB")
+            digest.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(os.remove, file_path)
+        raise
+    await run_in_threadpool(f.close)
+
+    return digest.hexdigest()
+
+
+async def load_analysis(db: AsyncSession, analysis_id: int) -> Analysis:
+    """Load an analysis with its uploaded paper, or raise 404."""
+    analysis = await db.scalar(
+        select(Analysis).options(selectinload(Analysis.uploaded_paper)).where(Analysis.id == analysis_id)
+    )
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
 
 def run_analysis_sync(analysis_id: int, manual_mode: bool = False):
     """Run analysis synchronously (for testing without Celery/Redis)."""
-    from app.tasks import process_analysis
+    from app.tasks import process_analysis, evict_reference_registry_task, evict_validation_cache_task
     # Call the task function directly (not as Celery task)
     process_analysis(analysis_id, manual_mode=manual_mode)
+    # Without celery beat, evict after each analysis instead
+    evict_reference_registry_task()
+    evict_validation_cache_task()
 
 
 @router.post("/", response_model=AnalysisResponse)
@@ -25,13 +81,16 @@ async def create_analysis(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     manual_mode: bool = Form(False),
-    db: Session = Depends(get_db),
+    batch_mode: bool = Form(False),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Start a new analysis by uploading a paper to validate.
 
     - manual_mode: If True, user will upload all reference papers manually.
                    If False (default), system will try to download references automatically.
+    - batch_mode: If True, quotes are validated through the cheaper Message Batches API.
+                  Results can take hours, so use it for runs nobody is waiting on.
     """
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
@@ -44,47 +103,149 @@ async def create_analysis(
     file_id = str(uuid.uuid4())
     file_path = os.path.join(settings.upload_dir, f"{file_id}.pdf")
 
-    content = await file.read()
-    if len(content) > settings.max_upload_size_mb * 1024 * 1024:
-        raise HTTPException(status_code=400, detail=f"File too large. Maximum size is {settings.max_upload_size_mb}MB")
-
-    with open(file_path, "wb") as f:
-        f.write(content)
+    content_hash = await save_upload(file, file_path)
 
     # Create analysis record
-    analysis = Analysis(status=AnalysisStatus.PENDING)
+    analysis = Analysis(status=AnalysisStatus.PENDING, batch_mode=batch_mode, manual_mode=manual_mode)
     db.add(analysis)
-    db.flush()
+    await db.flush()
 
     # Create paper record for uploaded file
     paper = Paper(
         title=file.filename.replace(".pdf", ""),
         file_path=file_path,
+        content_hash=content_hash,
         source_type=PaperSourceType.UPLOADED,
         analysis_id=analysis.id,
     )
     db.add(paper)
-    db.flush()
+    await db.flush()
 
     # Link paper to analysis
-    analysis.uploaded_paper_id = paper.id
-    db.commit()
-    db.refresh(analysis)
-
-    # Trigger background processing
-    # Uses FastAPI BackgroundTasks (works without Redis/Celery)
-    background_tasks.add_task(run_analysis_sync, analysis.id, manual_mode)
+    analysis.uploaded_paper = paper
+    await db.commit()
+    await db.refresh(analysis, ["created_at", "updated_at"])
+
+    # Trigger background processing: on the Celery workers if enabled, otherwise
+    # in this process with FastAPI BackgroundTasks (works without Redis/Celery)
+    if settings.use_celery:
+        from app.tasks import queue_analysis
+        await run_in_threadpool(queue_analysis, analysis.id, manual_mode)
+    else:
+        background_tasks.add_task(run_analysis_sync, analysis.id, manual_mode)
 
     return analysis
 
 
 @router.get("/{analysis_id}", response_model=AnalysisResponse)
-async def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
-    """Get the status and results of an analysis."""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-    if not analysis:
+async def get_analysis(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the status and results of an analysis, including partial progress."""
+    analysis = await load_analysis(db, analysis_id)
+
+    response = AnalysisResponse.model_validate(analysis)
+    for field, count in (await quote_counts(db, analysis_id)).items():
+        setattr(response, field, count)
+    return response
+
+
+async def quote_counts(db: AsyncSession, analysis_id: int) -> dict:
+    """Total, validated and failed quote counts of an analysis."""
+    counts = dict((await db.execute(
+        select(Quote.status, func.count(Quote.id)).where(Quote.analysis_id == analysis_id).group_by(Quote.status)
+    )).all())
+
+    return {
+        "quotes_total": sum(counts.values()),
+        "quotes_validated": counts.get(QuoteStatus.VALIDATED, 0),
+        "quotes_failed": counts.get(QuoteStatus.FAILED, 0),
+    }
+
+
+async def progress_snapshot(analysis_id: int) -> Optional[dict]:
+    """
+    Current status, quote counts and the status of every graded quote, as
+    sent when an event stream opens.
+
+    Clients track quotes by ID from there, so a quote graded again (e.g. a
+    retried failure) replaces its earlier status instead of being counted twice.
+    """
+    # A session per snapshot: the stream outlives the request's session
+    async with AsyncSessionLocal() as db:
+        analysis = await db.get(Analysis, analysis_id)
+        if not analysis:
+            return None
+        graded = (await db.execute(
+            select(Quote.id, Quote.status).where(Quote.analysis_id == analysis_id, Quote.status != QuoteStatus.PENDING)
+        )).all()
+        return {
+            "type": "snapshot",
+            "status": analysis.status.value,
+            "message": analysis.status_message,
+            **await quote_counts(db, analysis_id),
+            "quote_statuses": {quote_id: status.value for quote_id, status in graded},
+        }
+
+
+async def progress_events(analysis_id: int):
+    """
+    Yield an analysis' progress as server-sent events until it stops running.
+
+    Events come from Redis pub/sub, so no database queries are made while
+    the analysis runs. If Redis is unavailable the stream falls back to
+    polling the database every progress_poll_seconds.
+    """
+    from redis import RedisError
+    from app.services import progress
+
+    # Subscribe before taking the snapshot so no change falls between the two
+    pubsub = await progress.subscribe(analysis_id) if settings.progress_events_enabled else None
+    try:
+        event = await progress_snapshot(analysis_id)
+        while event is not None:
+            yield f"data: {json.dumps(event)}\n\n"
+            if event["type"] in ("snapshot", "status") and event["status"] in progress.TERMINAL_STATUSES:
+                return
+
+            if pubsub is None:
+                previous = event
+                while event == previous:
+                    await asyncio.sleep(settings.progress_poll_seconds)
+                    event = await progress_snapshot(analysis_id)
+                continue
+
+            try:
+                event = await progress.next_event(pubsub, timeout=settings.progress_keepalive_seconds)
+                # Comment lines keep proxies from closing an idle stream
+                while event is None:
+                    yield ": keepalive\n\n"
+                    event = await progress.next_event(pubsub, timeout=settings.progress_keepalive_seconds)
+            except (RedisError, OSError):
+                await progress.close(pubsub)
+                pubsub = None
+                event = await progress_snapshot(analysis_id)
+    finally:
+        if pubsub is not None:
+            await progress.close(pubsub)
+
+
+@router.get("/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Stream an analysis' progress as server-sent events.
+
+    The first event is a snapshot of the status and quote counts; after that
+    come status changes, reference fetch results and quote grades as they are
+    committed. The stream ends once the analysis completes, fails or waits
+    for uploads.
+    """
+    if not await db.get(Analysis, analysis_id):
         raise HTTPException(status_code=404, detail="Analysis not found")
-    return analysis
+
+    return StreamingResponse(
+        progress_events(analysis_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/{analysis_id}/papers")
@@ -92,13 +253,13 @@ async def upload_reference_paper(
     analysis_id: int,
     file: UploadFile = File(...),
     reference_key: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Upload a reference paper that couldn't be automatically downloaded.
     reference_key should match the citation key (e.g., "[1]" or "[Smith2020]").
     """
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
@@ -116,39 +277,37 @@ async def upload_reference_paper(
     file_id = str(uuid.uuid4())
     file_path = os.path.join(settings.upload_dir, f"{file_id}.pdf")
 
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    content_hash = await save_upload(file, file_path)
 
     # Find and update the reference paper record
-    paper = db.query(Paper).filter(
+    paper = await db.scalar(select(Paper).where(
         Paper.analysis_id == analysis_id,
         Paper.reference_key == reference_key,
         Paper.file_path.is_(None)
-    ).first()
+    ).limit(1))
 
     if paper:
         paper.file_path = file_path
+        paper.content_hash = content_hash
         paper.source_type = PaperSourceType.MANUAL
     else:
         # Create new paper record
         paper = Paper(
             title=file.filename.replace(".pdf", ""),
             file_path=file_path,
+            content_hash=content_hash,
             source_type=PaperSourceType.MANUAL,
             reference_key=reference_key,
             analysis_id=analysis_id,
         )
         db.add(paper)
 
-    db.commit()
+    await db.commit()
 
-    # Check if all required papers are now uploaded
-    missing_papers = db.query(Paper).filter(
-        Paper.analysis_id == analysis_id,
-        Paper.file_path.is_(None),
-        Paper.reference_key.isnot(None)
-    ).count()
+    # Check if all papers blocking a quote are now uploaded (the query is shared with the workers)
+    from app.tasks import missing_reference_papers
+    missing_papers = await db.run_sync(lambda session: missing_reference_papers(session, analysis_id).count())
 
     return {
         "message": "Paper uploaded successfully",
@@ -157,17 +316,17 @@ async def upload_reference_paper(
 
 
 @router.get("/{analysis_id}/missing-papers")
-async def get_missing_papers(analysis_id: int, db: Session = Depends(get_db)):
-    """Get list of reference papers that need to be uploaded manually."""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+async def get_missing_papers(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get list of reference papers that need to be uploaded manually (only those cited by a quote)."""
+    from app.tasks import missing_reference_papers
+
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    missing_papers = db.query(Paper).filter(
-        Paper.analysis_id == analysis_id,
-        Paper.file_path.is_(None),
-        Paper.reference_key.isnot(None)
-    ).all()
+    missing_papers = await db.run_sync(
+        lambda session: missing_reference_papers(session, analysis_id).order_by(Paper.id).all()
+    )
 
     return {
         "missing_papers": [
@@ -192,17 +351,36 @@ def run_continue_analysis_sync(analysis_id: int):
 async def continue_analysis(
     analysis_id: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Continue analysis after uploading missing papers."""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    """
+    Continue analysis after uploading missing papers, or resume a failed one.
+
+    A failed analysis resumes after its last completed stage; quotes that
+    were already validated are kept.
+    """
+    from app.services.analysis_lock import is_locked
+
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    if analysis.status != AnalysisStatus.AWAITING_UPLOADS:
-        raise HTTPException(status_code=400, detail="Analysis is not awaiting uploads")
-
-    # Trigger background validation
-    background_tasks.add_task(run_continue_analysis_sync, analysis_id)
+    if analysis.status not in (AnalysisStatus.AWAITING_UPLOADS, AnalysisStatus.FAILED):
+        raise HTTPException(status_code=400, detail="Analysis is not awaiting uploads or failed")
+
+    if is_locked(analysis):
+        raise HTTPException(status_code=409, detail="Analysis is already being processed")
+
+    # Trigger background validation (or resume from the last checkpoint)
+    if settings.use_celery:
+        from app.tasks import queue_analysis, queue_validation
+        if analysis.status == AnalysisStatus.FAILED:
+            await run_in_threadpool(queue_analysis, analysis_id)
+        else:
+            await run_in_threadpool(queue_validation, analysis_id)
+    elif analysis.status == AnalysisStatus.FAILED:
+        background_tasks.add_task(run_analysis_sync, analysis_id)
+    else:
+        background_tasks.add_task(run_continue_analysis_sync, analysis_id)
 
     return {"message": "Analysis resumed"}
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 
-from app.models.database import get_db
+from app.models.database import get_async_db
 from app.models.models import User, Analysis
 from app.api.schemas import UserCreate, UserResponse, Token, AnalysisListResponse
 from app.config import get_settings
@@ -41,7 +43,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Optional[User]:
     """Get current user from token. Returns None if no token or invalid token."""
     if not token:
@@ -55,7 +57,7 @@ async def get_current_user(
     except JWTError:
         return None
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     return user
 
 
@@ -73,10 +75,10 @@ async def get_required_user(
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user account."""
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -86,8 +88,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         password_hash=get_password_hash(user_data.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
@@ -95,10 +97,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Login and get access token."""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -121,13 +123,15 @@ async def get_user_analyses(
     skip: int = 0,
     limit: int = 20,
     user: User = Depends(get_required_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get analysis history for the current user."""
-    analyses = db.query(Analysis).filter(
-        Analysis.user_id == user.id
-    ).order_by(Analysis.created_at.desc()).offset(skip).limit(limit).all()
+    analyses = (await db.scalars(
+        select(Analysis).options(selectinload(Analysis.uploaded_paper)).where(
+            Analysis.user_id == user.id
+        ).order_by(Analysis.created_at.desc()).offset(skip).limit(limit)
+    )).all()
 
-    total = db.query(Analysis).filter(Analysis.user_id == user.id).count()
+    total = await db.scalar(select(func.count(Analysis.id)).where(Analysis.user_id == user.id))
 
     return AnalysisListResponse(analyses=analyses, total=total)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.models.database import get_db
+from app.models.database import get_async_db
 from app.models.models import Quote, Analysis, QuoteStatus
 from app.api.schemas import QuoteResponse, QuoteDetailResponse, QuotesListResponse
 
@@ -14,37 +15,40 @@ async def get_quotes_for_analysis(
     analysis_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all quotes for an analysis with their grades."""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    quotes = db.query(Quote).filter(
-        Quote.analysis_id == analysis_id
-    ).offset(skip).limit(limit).all()
+    quotes = (await db.scalars(
+        select(Quote).where(Quote.analysis_id == analysis_id).offset(skip).limit(limit)
+    )).all()
 
-    total = db.query(Quote).filter(Quote.analysis_id == analysis_id).count()
-
-    # Calculate average grade for validated quotes
-    avg_grade = db.query(func.avg(Quote.grade)).filter(
-        Quote.analysis_id == analysis_id,
-        Quote.status == QuoteStatus.VALIDATED,
-        Quote.grade.isnot(None)
-    ).scalar()
+    # Total, average grade of validated quotes and local matcher metrics in one query
+    total, avg_grade, matched, skipped = (await db.execute(
+        select(
+            func.count(Quote.id),
+            func.avg(Quote.grade).filter(Quote.status == QuoteStatus.VALIDATED),
+            func.count(Quote.match_score),
+            func.count(Quote.id).filter(Quote.validated_locally.is_(True)),
+        ).where(Quote.analysis_id == analysis_id)
+    )).one()
 
     return QuotesListResponse(
         quotes=quotes,
         total=total,
-        average_grade=round(avg_grade, 1) if avg_grade else None
+        average_grade=round(avg_grade, 1) if avg_grade else None,
+        match_rate=round(matched / total, 3) if total else None,
+        skipped_llm_calls=skipped,
     )
 
 
 @router.get("/{quote_id}", response_model=QuoteDetailResponse)
-async def get_quote(quote_id: int, db: Session = Depends(get_db)):
+async def get_quote(quote_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get detailed information about a specific quote."""
-    quote = db.query(Quote).filter(Quote.id == quote_id).first()
+    quote = await db.scalar(select(Quote).options(selectinload(Quote.reference)).where(Quote.id == quote_id))
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     return quote
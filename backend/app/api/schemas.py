@@ -28,6 +28,7 @@ class Token(BaseModel):
 # Analysis schemas
 class AnalysisCreate(BaseModel):
     manual_mode: bool = False
+    batch_mode: bool = False
 
 
 class PaperResponse(BaseModel):
@@ -47,10 +48,17 @@ class AnalysisResponse(BaseModel):
     id: int
     status: AnalysisStatus
     status_message: Optional[str]
+    batch_mode: bool = False
+    manual_mode: bool = False
     created_at: datetime
     updated_at: Optional[datetime]
     uploaded_paper: Optional[PaperResponse]
 
+    # Progress, filled in while the analysis runs (quotes are validated as their references arrive)
+    quotes_total: int = 0
+    quotes_validated: int = 0
+    quotes_failed: int = 0
+
     class Config:
         from_attributes = True
 
@@ -73,6 +81,8 @@ class QuoteResponse(BaseModel):
     explanation: Optional[str]
     source_text: Optional[str]
     source_page: Optional[int]
+    match_score: Optional[float] = None
+    validated_locally: bool = False
 
     class Config:
         from_attributes = True
@@ -80,9 +90,14 @@ class QuoteResponse(BaseModel):
 
 class QuoteDetailResponse(QuoteResponse):
     reference: Optional[PaperResponse]
+    input_tokens: Optional[int] = None
+    cache_read_tokens: Optional[int] = None
+    cache_creation_tokens: Optional[int] = None
 
 
 class QuotesListResponse(BaseModel):
     quotes: List[QuoteResponse]
     total: int
     average_grade: Optional[float]
+    match_rate: Optional[float] = None  # Share of quotes located in their source locally
+    skipped_llm_calls: int = 0  # Quotes graded without an LLM call
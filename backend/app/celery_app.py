@@ -1,4 +1,5 @@
 from celery import Celery
+from kombu import Exchange, Queue
 from app.config import get_settings
 
 settings = get_settings()
@@ -10,6 +11,28 @@ celery_app = Celery(
     include=["app.tasks"],
 )
 
+# Work is split by the resource it waits on, so each tier can be sized on its own:
+#   cpu      PDF extraction and parsing      threads pool, low concurrency (e.g. 2); large
+#                                            documents are split across an in-task process
+#                                            pool, which daemonic prefork children cannot start
+#   network  reference downloads             threads pool, high concurrency (e.g. 32)
+#   llm      quote validation                threads pool, moderate concurrency (e.g. 4);
+#                                            each task runs its own validation threads
+#   default  bookkeeping (stage callbacks, cache and registry eviction)
+celery_app.conf.task_queues = tuple(
+    Queue(name, Exchange(name), routing_key=name) for name in ("default", "cpu", "network", "llm")
+)
+celery_app.conf.task_default_queue = "default"
+celery_app.conf.task_routes = {
+    "app.tasks.process_analysis_task": {"queue": "cpu"},
+    "app.tasks.analysis_pipeline_task": {"queue": "cpu"},
+    "app.tasks.reference_fetch_task": {"queue": "network"},
+    "app.tasks.validate_quote_chunk_task": {"queue": "llm"},
+    "app.tasks.validate_reference_task": {"queue": "llm"},
+    "app.tasks.continue_analysis_celery_task": {"queue": "llm"},
+    "app.tasks.validate_quotes_batch_celery_task": {"queue": "llm"},
+}
+
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
@@ -19,4 +42,18 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max per task
     worker_prefetch_multiplier=1,  # Process one task at a time
+    # Tasks resume from their checkpoints, so redeliver work lost with a worker
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Run with a single `celery beat` process (see docker-compose.yml)
+    beat_schedule={
+        "evict-reference-registry": {
+            "task": "app.tasks.evict_reference_registry_task",
+            "schedule": settings.reference_registry_eviction_interval_seconds,
+        },
+        "evict-validation-cache": {
+            "task": "app.tasks.evict_validation_cache_task",
+            "schedule": settings.validation_cache_eviction_interval_seconds,
+        },
+    },
 )
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
+from app.api.middleware import BodySizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
 from app.api.routes import analysis, auth, quotes
 
 settings = get_settings()
@@ -12,6 +13,12 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Reject oversized uploads before they are received (added first, so CORS headers still wrap the 413)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=settings.max_upload_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+)
+
 # CORS middleware for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -1,10 +1,14 @@
-from app.models.database import Base, get_db, engine, SessionLocal
+from app.models.database import Base, get_db, get_async_db, engine, async_engine, SessionLocal, AsyncSessionLocal
 from app.models.models import (
     User,
     Analysis,
     Paper,
+    PaperPage,
     Quote,
+    ReferenceRegistryEntry,
+    ValidationCacheEntry,
     AnalysisStatus,
+    AnalysisCheckpoint,
     PaperSourceType,
     QuoteStatus,
 )
@@ -12,13 +16,20 @@ from app.models.models import (
 __all__ = [
     "Base",
     "get_db",
+    "get_async_db",
     "engine",
+    "async_engine",
     "SessionLocal",
+    "AsyncSessionLocal",
     "User",
     "Analysis",
     "Paper",
+    "PaperPage",
     "Quote",
+    "ReferenceRegistryEntry",
+    "ValidationCacheEntry",
     "AnalysisStatus",
+    "AnalysisCheckpoint",
     "PaperSourceType",
     "QuoteStatus",
 ]
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Float, Enum, Boolean, LargeBinary, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 
@@ -16,6 +16,11 @@ class AnalysisStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class AnalysisCheckpoint(str, enum.Enum):
+    EXTRACTED = "extracted"  # Quotes and references stored
+    FETCHED = "fetched"  # Reference fetching done (or skipped in manual mode)
+
+
 class PaperSourceType(str, enum.Enum):
     UPLOADED = "uploaded"  # User uploaded
     ARXIV = "arxiv"
@@ -51,6 +56,18 @@ class Analysis(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Validate through the Message Batches API instead of interactive calls
+    batch_mode = Column(Boolean, default=False, nullable=False)
+    manual_mode = Column(Boolean, default=False, nullable=False)  # References are uploaded, never downloaded
+    validation_batch_id = Column(String(100), nullable=True)  # Submitted batch awaiting results
+
+    # Last completed pipeline stage, so an interrupted analysis resumes after it
+    checkpoint = Column(Enum(AnalysisCheckpoint), nullable=True)
+
+    # Lease held by the worker currently processing the analysis
+    lock_token = Column(String(36), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
     # Optional user association
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User", back_populates="analyses")
@@ -74,8 +91,11 @@ class Paper(Base):
     doi = Column(String(255), nullable=True, index=True)
     arxiv_id = Column(String(50), nullable=True, index=True)
     file_path = Column(String(500), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the file
+    fetch_attempted = Column(Boolean, default=False, nullable=False)  # Uncited references stay metadata only
     source_type = Column(Enum(PaperSourceType), default=PaperSourceType.UPLOADED)
-    extracted_text = Column(Text, nullable=True)
+    # Legacy whole-document text; extracted text now lives in PaperPage
+    extracted_text = deferred(Column(Text, nullable=True))
 
     # Reference info (from the uploaded paper's reference list)
     reference_key = Column(String(50), nullable=True)  # e.g., "[1]", "[Smith2020]"
@@ -84,9 +104,66 @@ class Paper(Base):
     analysis_id = Column(Integer, ForeignKey("analyses.id"), nullable=True)
     analysis = relationship("Analysis", back_populates="papers", foreign_keys=[analysis_id])
 
+    # Shared copy of the fetched paper (see ReferenceRegistryEntry)
+    registry_entry_id = Column(Integer, ForeignKey("reference_registry.id"), nullable=True, index=True)
+    registry_entry = relationship("ReferenceRegistryEntry", back_populates="papers")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class PaperPage(Base):
+    """
+    Extracted text of one page, stored zlib-compressed.
+
+    Pages belong either to a Paper or to a ReferenceRegistryEntry, and are
+    only loaded when a consumer asks for them.
+    """
+    __tablename__ = "paper_pages"
+    __table_args__ = (
+        Index("ix_paper_pages_paper_page", "paper_id", "page_number"),
+        Index("ix_paper_pages_registry_page", "registry_entry_id", "page_number"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    paper_id = Column(Integer, ForeignKey("papers.id", ondelete="CASCADE"), nullable=True)
+    registry_entry_id = Column(Integer, ForeignKey("reference_registry.id", ondelete="CASCADE"), nullable=True)
+    page_number = Column(Integer, nullable=False)
+    content = Column(LargeBinary, nullable=False)
+
+
+class ReferenceRegistryEntry(Base):
+    """
+    A fetched reference paper shared across analyses.
+
+    Each PDF is stored once under its content hash, together with its
+    extracted text, and looked up by normalized DOI, arXiv ID or title.
+    """
+    __tablename__ = "reference_registry"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # SHA-256 of the PDF
+
+    # Normalized lookup keys
+    doi = Column(String(255), nullable=True, index=True)
+    arxiv_id = Column(String(50), nullable=True, index=True)
+    title_key = Column(String(500), nullable=True, index=True)
+
+    # Metadata copied onto linked Paper rows
+    title = Column(String(500), nullable=True)
+    authors = Column(Text, nullable=True)
+    year = Column(Integer, nullable=True)
+    source_type = Column(Enum(PaperSourceType), nullable=True)
+
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger, nullable=False, default=0)
+    extracted_text = deferred(Column(Text, nullable=True))  # Legacy, see PaperPage
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    papers = relationship("Paper", back_populates="registry_entry")
+
+
 class Quote(Base):
     __tablename__ = "quotes"
 
@@ -109,8 +186,32 @@ class Quote(Base):
     explanation = Column(Text, nullable=True)
     source_text = Column(Text, nullable=True)  # The original text from the source paper
     source_page = Column(Integer, nullable=True)
+    retryable = Column(Boolean, default=False, nullable=False)  # FAILED with a transient error
+    validation_attempts = Column(Integer, default=0, nullable=False)  # LLM validations attempted
+
+    # Local verbatim matching (before any LLM call)
+    match_score = Column(Float, nullable=True)  # Share of quote words found in the source
+    validated_locally = Column(Boolean, default=False, nullable=False)  # Graded without an LLM call
+
+    # Token usage of the validation request (prompt cache hits vs. misses)
+    input_tokens = Column(Integer, nullable=True)  # Uncached input tokens
+    cache_read_tokens = Column(Integer, nullable=True)
+    cache_creation_tokens = Column(Integer, nullable=True)
 
     analysis_id = Column(Integer, ForeignKey("analyses.id"), nullable=False)
     analysis = relationship("Analysis", back_populates="quotes")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ValidationCacheEntry(Base):
+    """A validation result reusable for the same quote, source, model and prompt version."""
+    __tablename__ = "validation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    result = Column(Text, nullable=False)  # JSON of the parsed validation result
+    hit_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,80 @@
+"""Analysis Lock Service - Keeps two workers from processing the same analysis."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.models import Analysis
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def acquire_lock(
+    db: Session,
+    analysis_id: int,
+    token: Optional[str] = None,
+    new_token: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Take the processing lease on an analysis (commits).
+
+    The lease is taken with a single conditional UPDATE, so only one worker
+    can win it. An expired lease (e.g. from a killed worker) can be taken
+    over. Passing the token of a lease already held renews it, so nested
+    tasks can share their caller's lease; a token never takes a free or
+    expired lease, so a straggling subtask cannot re-take a lease its
+    caller has released.
+
+    Args:
+        token: Token of a lease the caller holds (renew only)
+        new_token: Token for a newly taken lease (random if None), to
+            cover several analyses with one token
+
+    Returns:
+        The lease token, or None if another worker holds the lease (or,
+        with token, if the lease is no longer held)
+    """
+    now = datetime.now(timezone.utc)
+    if token:
+        available = Analysis.lock_token == token
+    else:
+        available = or_(Analysis.lock_token.is_(None), Analysis.locked_until < now)
+        token = new_token or str(uuid.uuid4())
+
+    updated = db.query(Analysis).filter(Analysis.id == analysis_id, available).update({
+        Analysis.lock_token: token,
+        Analysis.locked_until: now + timedelta(seconds=settings.analysis_lock_seconds),
+    }, synchronize_session=False)
+    db.commit()
+    return token if updated else None
+
+
+def renew_lock(db: Session, analysis_id: int, token: str):
+    """Extend a held lease (does not commit)."""
+    db.query(Analysis).filter(Analysis.id == analysis_id, Analysis.lock_token == token).update({
+        Analysis.locked_until: datetime.now(timezone.utc) + timedelta(seconds=settings.analysis_lock_seconds),
+    }, synchronize_session=False)
+
+
+def release_lock(db: Session, analysis_id: int, token: str):
+    """Give up a held lease (commits)."""
+    db.rollback()
+    db.query(Analysis).filter(Analysis.id == analysis_id, Analysis.lock_token == token).update({
+        Analysis.lock_token: None,
+        Analysis.locked_until: None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def is_locked(analysis: Analysis) -> bool:
+    """Whether a worker currently holds the analysis' lease."""
+    if not analysis.lock_token or not analysis.locked_until:
+        return False
+    locked_until = analysis.locked_until
+    if locked_until.tzinfo is None:
+        locked_until = locked_until.replace(tzinfo=timezone.utc)
+    return locked_until > datetime.now(timezone.utc)
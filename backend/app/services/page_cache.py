@@ -0,0 +1,203 @@
+"""Page Cache Service - Persistent per-page text cache for PDF files."""
+
+import json
+import os
+import struct
+import tempfile
+import zlib
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from app.config import get_settings
+from app.services.reference_registry import compute_file_hash
+
+settings = get_settings()
+
+# Sidecar layout: MAGIC, the zlib-compressed text of each page, then a
+# zlib-compressed JSON index {"page_count": n, "pages": [[index, offset, length], ...]}
+# and a footer with the index's offset and length. Any page can be read
+# with one seek, and pages can be appended without decompressing the others.
+MAGIC = b"PGC1"
+_footer = struct.Struct("<QI4s")
+
+
+@lru_cache(maxsize=1024)
+def _content_hash(file_path: str, size: int, mtime_ns: int) -> str:
+    return compute_file_hash(file_path)
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-256 of a file, hashed once per version of the file in this process."""
+    stat = os.stat(file_path)
+    return _content_hash(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def cache_dir() -> str:
+    return settings.page_cache_dir or os.path.join(settings.upload_dir, "page_cache")
+
+
+def sidecar_path(file_path: str, backend: str) -> str:
+    """Sidecar of a PDF's pages as extracted by a backend; copies of the same PDF share it."""
+    return os.path.join(cache_dir(), f"{content_hash(file_path)}.{backend}.pages")
+
+
+class PageCache:
+    """
+    The cached pages of one PDF, plus pages extracted since it was opened.
+
+    New pages are spooled to a temporary file and written together with the
+    cached ones when the cache is closed, replacing the sidecar atomically.
+    A concurrent writer's pages may be lost that way, never corrupted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.page_count: Optional[int] = None
+        self._cached: dict[int, tuple[int, int]] = {}
+        self._new: dict[int, tuple[int, int]] = {}
+        self._file = None
+        self._spool = None
+
+        try:
+            self._file = open(path, "rb")
+            self._load_index()
+            # Marks the sidecar as recently used for evict()
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, zlib.error, struct.error) as e:
+            print(f"Page cache: Ignoring unreadable {path}: {e}")
+            self._cached = {}
+            self.page_count = None
+
+    def _load_index(self):
+        self._file.seek(-_footer.size, os.SEEK_END)
+        index_offset, index_length, magic = _footer.unpack(self._file.read(_footer.size))
+        if magic != MAGIC:
+            raise ValueError("not a page cache file")
+        self._file.seek(index_offset)
+        index = json.loads(zlib.decompress(self._file.read(index_length)))
+        self.page_count = index["page_count"]
+        self._cached = {page: (offset, length) for page, offset, length in index["pages"]}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, page_index: int) -> bool:
+        return page_index in self._cached or page_index in self._new
+
+    def get(self, page_index: int) -> str:
+        """Text of a cached page (0-based index)."""
+        if page_index in self._new:
+            source, (offset, length) = self._spool, self._new[page_index]
+        else:
+            source, (offset, length) = self._file, self._cached[page_index]
+        source.seek(offset)
+        return zlib.decompress(source.read(length)).decode("utf-8")
+
+    def put(self, page_index: int, text: str):
+        if page_index in self:
+            return
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile()
+        blob = zlib.compress(text.encode("utf-8"))
+        self._spool.seek(0, os.SEEK_END)
+        self._new[page_index] = (self._spool.tell(), len(blob))
+        self._spool.write(blob)
+
+    def missing_runs(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Yield the [start, end) runs of pages in a range that are not cached."""
+        run_start = None
+        for page_index in range(start, end):
+            if page_index in self:
+                if run_start is not None:
+                    yield run_start, page_index
+                    run_start = None
+            elif run_start is None:
+                run_start = page_index
+        if run_start is not None:
+            yield run_start, end
+
+    def close(self):
+        """Write any new pages to the sidecar and release the files."""
+        try:
+            if self._new:
+                self._save()
+        except OSError as e:
+            print(f"Page cache: Could not write {self.path}: {e}")
+        finally:
+            for f in (self._file, self._spool):
+                if f is not None:
+                    f.close()
+            self._file = self._spool = None
+            self._new = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(MAGIC)
+                entries = []
+                for page_index in sorted(self._cached.keys() | self._new.keys()):
+                    if page_index in self._cached:
+                        source, (offset, length) = self._file, self._cached[page_index]
+                    else:
+                        source, (offset, length) = self._spool, self._new[page_index]
+                    source.seek(offset)
+                    entries.append([page_index, out.tell(), length])
+                    out.write(source.read(length))
+
+                index = zlib.compress(json.dumps({"page_count": self.page_count, "pages": entries}).encode())
+                index_offset = out.tell()
+                out.write(index)
+                out.write(_footer.pack(index_offset, len(index), MAGIC))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def open_cache(file_path: str, backend: str) -> Optional[PageCache]:
+    """Open the page cache of a PDF, or None if caching is disabled."""
+    if not settings.page_cache_enabled:
+        return None
+    return PageCache(sidecar_path(file_path, backend))
+
+
+def evict(max_size_mb: Optional[int] = None) -> int:
+    """
+    Remove the least recently used sidecars until the cache fits within max_size_mb.
+
+    Returns:
+        Number of removed sidecars
+    """
+    if max_size_mb is None:
+        max_size_mb = settings.page_cache_max_size_mb
+
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return 0
+
+    sidecars = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".pages"):
+            stat = entry.stat()
+            sidecars.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in sidecars)
+    max_size = max_size_mb * 1024 * 1024
+    removed = 0
+    for _, size, path in sorted(sidecars):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+        removed += 1
+    return removed
@@ -1,21 +1,148 @@
 """Paper Fetcher Service - Downloads reference papers from various sources."""
 
 import os
+import threading
 import time
+import traceback
 import requests
 import arxiv
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from app.models.database import SessionLocal
 from app.models.models import Paper, PaperSourceType
 from app.config import get_settings
 from app.services.pdf_processor import extract_text_from_pdf
+from app.services.text_store import store_text
 
 settings = get_settings()
 
-# Rate limiting for APIs
-_last_semantic_scholar_call = 0
-SEMANTIC_SCHOLAR_MIN_INTERVAL = 1.0  # Minimum seconds between calls
+
+class RateLimiter:
+    """
+    Thread-safe limiter enforcing a minimum interval between calls to one source.
+
+    Each caller reserves the next free time slot, so concurrent workers are
+    spaced out instead of all firing once the interval has elapsed.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until this caller's slot is reached."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def backoff(self, seconds: float):
+        """Push back all pending slots, e.g. after a 429 response."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+# Rate limiting for APIs (minimum seconds between calls, per source)
+SEMANTIC_SCHOLAR_MIN_INTERVAL = 1.0
+ARXIV_MIN_INTERVAL = 3.0  # As requested by the arXiv API terms of use
+UNPAYWALL_MIN_INTERVAL = 0.1
+
+_rate_limiters = {
+    "semantic_scholar": RateLimiter(SEMANTIC_SCHOLAR_MIN_INTERVAL),
+    "arxiv": RateLimiter(ARXIV_MIN_INTERVAL),
+    "unpaywall": RateLimiter(UNPAYWALL_MIN_INTERVAL),
+}
+
+# Shared HTTP session with a keep-alive connection pool
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Get or create the pooled HTTP session used for all fetches."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=max(settings.reference_fetch_concurrency, 10),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+    return _http_session
+
+
+def fetch_references(paper_ids: list[int], max_workers: Optional[int] = None) -> dict[int, bool]:
+    """
+    Resolve many reference papers concurrently.
+
+    Each reference is handled on a worker thread with its own database
+    session: it is linked from the reference registry if possible, and
+    otherwise fetched and registered. Per-source rate limiters keep the
+    combined request rate within each API's limits.
+
+    Args:
+        paper_ids: IDs of the reference Paper rows to resolve
+        max_workers: Maximum number of references fetched in parallel
+
+    Returns:
+        Dict mapping paper ID to whether the paper is now available
+    """
+    if not paper_ids:
+        return {}
+
+    max_workers = max_workers or settings.reference_fetch_concurrency
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paper_ids))) as executor:
+        results = executor.map(fetch_reference, paper_ids)
+        return dict(zip(paper_ids, results))
+
+
+def fetch_reference(paper_id: int) -> bool:
+    """Resolve a single reference paper in its own database session."""
+    from app.services.reference_registry import link_from_registry, register_paper
+    from app.services import progress
+
+    db = SessionLocal()
+    paper = None
+    success = False
+    try:
+        paper = db.query(Paper).filter(Paper.id == paper_id).first()
+        if not paper:
+            return False
+        analysis_id, reference_key = paper.analysis_id, paper.reference_key
+
+        paper.fetch_attempted = True
+        db.commit()
+
+        # Reuse a copy fetched by an earlier analysis if we have one
+        if link_from_registry(paper, db):
+            success = True
+            return True
+
+        success = fetch_paper(paper, db)
+        if success:
+            register_paper(paper, db)
+        return success
+
+    except Exception as e:
+        print(f"Reference fetch failed for paper {paper_id}: {e}")
+        traceback.print_exc()
+        return False
+    finally:
+        if paper is not None:
+            progress.publish(
+                analysis_id, "reference",
+                paper_id=paper_id, reference_key=reference_key, available=success,
+            )
+        db.close()
 
 
 def fetch_paper(paper: Paper, db: Session) -> bool:
@@ -58,6 +185,7 @@ def fetch_from_arxiv(paper: Paper, db: Session) -> bool:
     """
     try:
         client = arxiv.Client()
+        limiter = _rate_limiters["arxiv"]
 
         # Search by arXiv ID if available
         if paper.arxiv_id:
@@ -70,6 +198,7 @@ def fetch_from_arxiv(paper: Paper, db: Session) -> bool:
         else:
             return False
 
+        limiter.wait()
         for result in client.results(search):
             # If searching by title, verify it's a reasonable match
             if not paper.arxiv_id and paper.title:
@@ -82,8 +211,9 @@ def fetch_from_arxiv(paper: Paper, db: Session) -> bool:
             # Download PDF
             os.makedirs(settings.upload_dir, exist_ok=True)
             arxiv_id = result.entry_id.split('/')[-1]
-            file_path = os.path.join(settings.upload_dir, f"arxiv_{arxiv_id}.pdf")
+            file_path = os.path.join(settings.upload_dir, f"arxiv_{arxiv_id}_{paper.id}.pdf")
 
+            limiter.wait()
             result.download_pdf(dirpath=settings.upload_dir, filename=os.path.basename(file_path))
 
             # Update paper record
@@ -95,7 +225,7 @@ def fetch_from_arxiv(paper: Paper, db: Session) -> bool:
             paper.arxiv_id = arxiv_id
 
             # Extract text
-            paper.extracted_text = extract_text_from_pdf(file_path)
+            store_text(db, extract_text_from_pdf(file_path), paper=paper)
 
             db.commit()
             print(f"arXiv: Downloaded '{result.title}'")
@@ -116,7 +246,8 @@ def fetch_from_doi(paper: Paper, db: Session) -> bool:
     try:
         # Try Unpaywall API for open access versions
         unpaywall_url = f"https://api.unpaywall.org/v2/{paper.doi}?email=academic-validator@example.com"
-        response = requests.get(unpaywall_url, timeout=10)
+        _rate_limiters["unpaywall"].wait()
+        response = get_http_session().get(unpaywall_url, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -138,15 +269,9 @@ def fetch_from_semantic_scholar(paper: Paper, db: Session) -> bool:
     Search Semantic Scholar for the paper.
     Falls back to arXiv if Semantic Scholar returns an arXiv ID but no direct PDF.
     """
-    global _last_semantic_scholar_call
+    limiter = _rate_limiters["semantic_scholar"]
 
     try:
-        # Rate limiting
-        elapsed = time.time() - _last_semantic_scholar_call
-        if elapsed < SEMANTIC_SCHOLAR_MIN_INTERVAL:
-            time.sleep(SEMANTIC_SCHOLAR_MIN_INTERVAL - elapsed)
-        _last_semantic_scholar_call = time.time()
-
         # Search by title or reference text
         search_query = paper.title or (paper.reference_text[:100] if paper.reference_text else None)
         if not search_query:
@@ -162,13 +287,16 @@ def fetch_from_semantic_scholar(paper: Paper, db: Session) -> bool:
             "limit": 3
         }
 
-        response = requests.get(search_url, params=params, timeout=10)
+        session = get_http_session()
+        limiter.wait()
+        response = session.get(search_url, params=params, timeout=10)
 
-        # Handle rate limiting with retry
+        # Handle rate limiting with retry (backs off every worker, not just this one)
         if response.status_code == 429:
             print("Semantic Scholar: Rate limited, waiting 5 seconds...")
-            time.sleep(5)
-            response = requests.get(search_url, params=params, timeout=10)
+            limiter.backoff(5)
+            limiter.wait()
+            response = session.get(search_url, params=params, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -226,8 +354,11 @@ def download_pdf_from_url(url: str, paper: Paper, db: Session, source_type: Pape
     Download a PDF from a URL and update the paper record.
     """
     try:
-        response = requests.get(url, timeout=30, stream=True)
-        if response.status_code == 200 and 'pdf' in response.headers.get('content-type', '').lower():
+        # Closing the streamed response returns its connection to the shared pool
+        with get_http_session().get(url, timeout=30, stream=True) as response:
+            if response.status_code != 200 or 'pdf' not in response.headers.get('content-type', '').lower():
+                return False
+
             os.makedirs(settings.upload_dir, exist_ok=True)
 
             # Generate filename
@@ -238,12 +369,12 @@ def download_pdf_from_url(url: str, paper: Paper, db: Session, source_type: Pape
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
 
-            paper.file_path = file_path
-            paper.source_type = source_type
-            paper.extracted_text = extract_text_from_pdf(file_path)
-            db.commit()
+        paper.file_path = file_path
+        paper.source_type = source_type
+        store_text(db, extract_text_from_pdf(file_path), paper=paper)
+        db.commit()
 
-            return True
+        return True
 
     except Exception as e:
         print(f"PDF download failed: {e}")
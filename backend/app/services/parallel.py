@@ -0,0 +1,47 @@
+"""Parallel Service - Process pool sizing shared by the CPU-bound services."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_daemon_notice_shown = False
+
+
+def worker_count() -> int:
+    """Process pool size for PDF extraction and large bibliographies (settings.pdf_extraction_workers, else CPU count)."""
+    return settings.pdf_extraction_workers or os.cpu_count() or 1
+
+
+def can_spawn_processes() -> bool:
+    """Whether this process may start a process pool."""
+    global _daemon_notice_shown
+    # Daemonic processes (e.g. Celery prefork children) cannot have children
+    if not multiprocessing.current_process().daemon:
+        return True
+    if not _daemon_notice_shown:
+        _daemon_notice_shown = True
+        print("Parallel: Running in a daemonic process (e.g. a Celery prefork child), "
+              "process pools are disabled; run the cpu worker with -P threads to enable them")
+    return False
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    A process pool whose workers are not forked from the calling process.
+
+    Callers may run in a thread of a threads-pool worker, and forking a
+    multi-threaded process can deadlock the child on locks held by other
+    threads.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # The fork server is started once per process and imports these up
+        # front, so workers fork from it with the services already loaded
+        context.set_forkserver_preload(["app.services.pdf_processor", "app.services.reference_parser"])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
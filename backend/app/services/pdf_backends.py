@@ -0,0 +1,111 @@
+"""PDF Backends Service - Interchangeable text extraction backends for the PDF processor."""
+
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+import fitz  # PyMuPDF
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PdfBackend(ABC):
+    """
+    Extracts the text of a range of pages of a PDF.
+
+    Backends are looked up by name (see BACKENDS), so the name is all that
+    crosses process boundaries when extracting on a process pool.
+    """
+
+    name = ""
+
+    def page_count(self, file_path: str) -> int:
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+
+    @abstractmethod
+    def iter_range(self, file_path: str, start: int, end: int) -> Iterator[tuple[int, str]]:
+        """Yield the (page index, text) pairs of pages [start, end), opening the file once."""
+
+    def extract_range(self, file_path: str, start: int, end: int) -> list[tuple[int, str]]:
+        return list(self.iter_range(file_path, start, end))
+
+
+class PyMuPDFBackend(PdfBackend):
+    """
+    PyMuPDF's plain text extraction.
+
+    Args:
+        flags: TEXT_* extraction flags (None for PyMuPDF's defaults)
+        sort: Reorder text blocks top-left to bottom-right (helps with
+            multi-column layouts whose content stream is out of order)
+        margins: Fractions of the page height to drop at the top and
+            bottom, which removes running headers, footers and page numbers
+    """
+
+    def __init__(self, name: str, flags: Optional[int] = None, sort: bool = False, margins: Optional[tuple[float, float]] = None):
+        self.name = name
+        self.flags = flags
+        self.sort = sort
+        self.margins = margins
+
+    def _clip(self, page) -> Optional[fitz.Rect]:
+        if not self.margins:
+            return None
+        rect = page.rect
+        top, bottom = self.margins
+        return fitz.Rect(rect.x0, rect.y0 + rect.height * top, rect.x1, rect.y1 - rect.height * bottom)
+
+    def iter_range(self, file_path: str, start: int, end: int) -> Iterator[tuple[int, str]]:
+        with fitz.open(file_path) as doc:
+            for page_num in range(start, end):
+                page = doc[page_num]
+                yield page_num, page.get_text(clip=self._clip(page), flags=self.flags, sort=self.sort)
+
+
+class PdfPlumberBackend(PdfBackend):
+    """pdfplumber (pdfminer.six): much slower, but rebuilds lines from character positions."""
+
+    name = "pdfplumber"
+
+    def page_count(self, file_path: str) -> int:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_range(self, file_path: str, start: int, end: int) -> Iterator[tuple[int, str]]:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            for page_num in range(start, end):
+                page = pdf.pages[page_num]
+                yield page_num, page.extract_text() or ""
+                # pdfplumber caches parsed layout objects per page
+                page.flush_cache()
+
+
+# Flags of PyMuPDF's default plain text extraction
+_DEFAULT_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+# Ligatures expanded ("ﬁ" -> "fi") and line-end hyphens joined, as quotes are typed in a paper
+_QUOTE_FRIENDLY_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_DEHYPHENATE
+
+BACKENDS = {
+    backend.name: backend
+    for backend in [
+        PyMuPDFBackend("pymupdf"),
+        PyMuPDFBackend("pymupdf_dehyphenate", flags=_QUOTE_FRIENDLY_FLAGS),
+        PyMuPDFBackend("pymupdf_sorted", flags=_QUOTE_FRIENDLY_FLAGS, sort=True),
+        PyMuPDFBackend("pymupdf_body", flags=_QUOTE_FRIENDLY_FLAGS, sort=True, margins=(0.06, 0.06)),
+        PdfPlumberBackend(),
+    ]
+}
+
+
+def get_backend(name: Optional[str] = None) -> PdfBackend:
+    """Look up a backend by name (settings.pdf_backend by default)."""
+    name = name or settings.pdf_backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name]
@@ -1,46 +1,235 @@
 """PDF Processing Service - Extracts text from PDF files."""
 
-import fitz  # PyMuPDF
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterator, Optional
 
+from app.config import get_settings
+from app.services import page_cache
+from app.services.parallel import can_spawn_processes, process_pool, worker_count
+from app.services.pdf_backends import get_backend
 
-def extract_text_from_pdf(file_path: str) -> str:
+settings = get_settings()
+
+
+def extract_text_from_pdf(
+    file_path: str,
+    parallel: Optional[bool] = None,
+    backend: Optional[str] = None,
+    cache: bool = True,
+) -> str:
     """
     Extract all text content from a PDF file.
 
+    Documents with at least settings.pdf_parallel_min_pages pages are split
+    into page ranges extracted on a process pool; smaller ones are read
+    serially. Both paths produce identical output. Pages are served from
+    and added to the PDF's page cache, so no page is decoded twice.
+
     Args:
         file_path: Path to the PDF file
+        parallel: Force (True) or disable (False) parallel extraction;
+            None decides by page count
+        backend: Name of the extraction backend (settings.pdf_backend by default)
+        cache: Use the page cache (if enabled in the settings)
 
     Returns:
         Extracted text content
     """
-    text_parts = []
+    return "\n\n".join(
+        f"--- Page {number} ---\n{text}"
+        for number, text in _cached_pages(file_path, 0, None, parallel, backend, cache, stream=False)
+    )
+
+
+def extract_pages(
+    file_path: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    parallel: Optional[bool] = None,
+    backend: Optional[str] = None,
+    cache: bool = True,
+) -> list[tuple[int, str]]:
+    """
+    Extract only a range of pages, e.g. extract_pages(path, -10) for the last ten.
+
+    start and end are 0-based page indices with slice semantics (negative
+    values count from the end). Only pages that are not cached yet are
+    decoded.
+
+    Returns:
+        (page number, text) pairs of the non-blank pages in the range
+    """
+    return list(_cached_pages(file_path, start, end, parallel, backend, cache, stream=False))
+
+
+# Pages per process pool task when streaming
+STREAM_RANGE_PAGES = 16
+
+
+def get_page_count(file_path: str, backend: Optional[str] = None) -> int:
+    """Number of pages of a PDF, as seen by the extraction backend."""
+    return get_backend(backend).page_count(file_path)
+
+
+def iter_pages(
+    file_path: str,
+    parallel: Optional[bool] = None,
+    backend: Optional[str] = None,
+    cache: bool = True,
+) -> Iterator[tuple[int, str]]:
+    """
+    Yield the (page number, text) pairs of a PDF's non-blank pages in order.
+
+    Unlike extract_text_from_pdf, the document's text is never held in
+    memory at once. In parallel mode at most two ranges of
+    STREAM_RANGE_PAGES pages per worker are in flight.
+
+    Args:
+        file_path: Path to the PDF file
+        parallel: Force (True) or disable (False) parallel extraction;
+            None decides by page count
+        backend: Name of the extraction backend (settings.pdf_backend by default)
+        cache: Use the page cache (if enabled in the settings)
+    """
+    return _cached_pages(file_path, 0, None, parallel, backend, cache, stream=True)
+
+
+def _cached_pages(
+    file_path: str,
+    start: int,
+    end: Optional[int],
+    parallel: Optional[bool],
+    backend: Optional[str],
+    cache: bool,
+    stream: bool,
+    keep_blank: bool = False,
+) -> Iterator[tuple[int, str]]:
+    """Non-blank (or all) pages of a page range, decoding only those missing from the page cache."""
+    backend = get_backend(backend).name
+    pages = page_cache.open_cache(file_path, backend) if cache else None
+
+    with pages if pages is not None else nullcontext():
+        if pages is None:
+            page_count = get_page_count(file_path, backend)
+        else:
+            if pages.page_count is None:
+                pages.page_count = get_page_count(file_path, backend)
+            page_count = pages.page_count
+        start, end, _ = slice(start, end).indices(page_count)
+
+        if pages is None:
+            extracted = _decode_range(file_path, start, end, parallel, backend, stream)
+        else:
+            extracted = _fill_range(pages, file_path, start, end, parallel, backend, stream)
+
+        for page_num, text in extracted:
+            if keep_blank or text.strip():
+                yield page_num + 1, text
+
+
+def _fill_range(
+    pages: page_cache.PageCache,
+    file_path: str,
+    start: int,
+    end: int,
+    parallel: Optional[bool],
+    backend: str,
+    stream: bool,
+) -> Iterator[tuple[int, str]]:
+    """All pages of [start, end) in order, from the cache or decoded and added to it."""
+    position = start
+    for run_start, run_end in list(pages.missing_runs(start, end)):
+        for page_num in range(position, run_start):
+            yield page_num, pages.get(page_num)
+        for page_num, text in _decode_range(file_path, run_start, run_end, parallel, backend, stream):
+            pages.put(page_num, text)
+            yield page_num, text
+        position = run_end
+    for page_num in range(position, end):
+        yield page_num, pages.get(page_num)
+
+
+def _decode_range(
+    file_path: str,
+    start: int,
+    end: int,
+    parallel: Optional[bool],
+    backend: str,
+    stream: bool,
+) -> Iterator[tuple[int, str]]:
+    workers = worker_count()
+    if parallel is None:
+        parallel = end - start >= settings.pdf_parallel_min_pages and workers > 1
+
+    if parallel and can_spawn_processes():
+        if stream:
+            return _iter_pages_parallel(file_path, start, end, workers, backend)
+        return iter(_extract_pages_parallel(file_path, start, end, workers, backend))
+    return get_backend(backend).iter_range(file_path, start, end)
+
+
+def _iter_pages_parallel(file_path: str, start: int, end: int, workers: int, backend: str) -> Iterator[tuple[int, str]]:
+    """Extract page ranges on a process pool with a bounded window, yielding pages in order."""
+    ranges = (
+        (range_start, min(range_start + STREAM_RANGE_PAGES, end))
+        for range_start in range(start, end, STREAM_RANGE_PAGES)
+    )
+
+    with process_pool(workers) as executor:
+        in_flight = deque(
+            executor.submit(_extract_page_range, file_path, range_start, range_end, backend)
+            for range_start, range_end in islice(ranges, workers * 2)
+        )
+        while in_flight:
+            chunk = in_flight.popleft().result()
+            for range_start, range_end in islice(ranges, 1):
+                in_flight.append(executor.submit(_extract_page_range, file_path, range_start, range_end, backend))
+            yield from chunk
+
+
+def _extract_page_range(file_path: str, start: int, end: int, backend: str) -> list[tuple[int, str]]:
+    """Extract pages [start, end) of a PDF as (page index, text) pairs."""
+    return get_backend(backend).extract_range(file_path, start, end)
+
 
-    with fitz.open(file_path) as doc:
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
-            if text.strip():
-                text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
+def _extract_pages_parallel(file_path: str, start: int, end: int, workers: int, backend: str) -> list[tuple[int, str]]:
+    """Extract page ranges on a process pool and reassemble them in page order."""
+    # A few ranges per worker keeps workers busy when some pages are heavier
+    page_count = end - start
+    range_count = min(page_count, workers * 4)
+    bounds = [start + page_count * i // range_count for i in range(range_count + 1)]
 
-    return "\n\n".join(text_parts)
+    with process_pool(min(workers, range_count)) as executor:
+        chunks = executor.map(
+            _extract_page_range,
+            [file_path] * range_count,
+            bounds[:-1],
+            bounds[1:],
+            [backend] * range_count,
+        )
+        return [page for chunk in chunks for page in chunk]
 
 
-def extract_text_by_page(file_path: str) -> list[dict]:
+def extract_text_by_page(file_path: str, backend: Optional[str] = None) -> list[dict]:
     """
-    Extract text from each page separately.
+    Extract text from each page separately (blank pages included, so the
+    list index matches the page number).
 
     Args:
         file_path: Path to the PDF file
+        backend: Name of the extraction backend (settings.pdf_backend by default)
 
     Returns:
         List of dicts with page_number and text
     """
     pages = []
 
-    with fitz.open(file_path) as doc:
-        for page_num, page in enumerate(doc):
-            pages.append({
-                "page_number": page_num + 1,
-                "text": page.get_text()
-            })
+    for page_number, text in _cached_pages(file_path, 0, None, None, backend, True, stream=False, keep_blank=True):
+        pages.append({
+            "page_number": page_number,
+            "text": text
+        })
 
     return pages
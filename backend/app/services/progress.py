@@ -0,0 +1,166 @@
+"""Progress Service - Publishes analysis progress events over Redis pub/sub."""
+
+import json
+import threading
+import time
+from typing import Optional
+
+import redis
+from sqlalchemy import event, inspect
+
+from app.models.models import Analysis, Quote, QuoteStatus
+from app.config import get_settings
+
+settings = get_settings()
+
+# Statuses after which an analysis emits no more events until it is continued
+TERMINAL_STATUSES = {"completed", "failed", "awaiting_uploads"}
+
+_client = None
+_client_lock = threading.Lock()
+_paused_until = 0.0
+
+# After a failed publish, skip publishing this long rather than wait on Redis every commit
+PAUSE_AFTER_ERROR_SECONDS = 30
+
+
+def channel_name(analysis_id: int) -> str:
+    return f"analysis:{analysis_id}:progress"
+
+
+def get_redis() -> redis.Redis:
+    """Shared Redis client for publishing (connections are pooled)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+    return _client
+
+
+def publish_events(events: list[tuple[int, dict]]):
+    """
+    Publish (analysis ID, event) pairs, best effort.
+
+    Progress is advisory: if Redis is down the events are dropped (the
+    analysis itself is unaffected) and publishing pauses for a while.
+    """
+    global _paused_until
+    if not events or not settings.progress_events_enabled or time.monotonic() < _paused_until:
+        return
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for analysis_id, payload in events:
+            pipe.publish(channel_name(analysis_id), json.dumps(payload))
+        pipe.execute()
+    except redis.RedisError as e:
+        _paused_until = time.monotonic() + PAUSE_AFTER_ERROR_SECONDS
+        print(f"Progress: Could not publish events, pausing for {PAUSE_AFTER_ERROR_SECONDS}s: {e}")
+
+
+def publish(analysis_id: int, event_type: str, **data):
+    """Publish a single event."""
+    publish_events([(analysis_id, {"type": event_type, **data})])
+
+
+def status_event(analysis: Analysis) -> dict:
+    status = analysis.status.value if analysis.status is not None else None
+    return {"type": "status", "status": status, "message": analysis.status_message}
+
+
+def quote_event(quote: Quote) -> dict:
+    return {
+        "type": "quote",
+        "quote_id": quote.id,
+        "reference_key": quote.reference_key,
+        "status": quote.status.value,
+        "grade": quote.grade,
+        "validated_locally": quote.validated_locally,
+    }
+
+
+def _changed(obj, attribute: str) -> bool:
+    return inspect(obj).attrs[attribute].history.has_changes()
+
+
+def _collect_changes(session, flush_context):
+    """Queue events for analyses and quotes whose status changed in this flush."""
+    events = session.info.setdefault("progress_events", [])
+    for obj in session.dirty:
+        if isinstance(obj, Analysis) and (_changed(obj, "status") or _changed(obj, "status_message")):
+            events.append((obj.id, status_event(obj)))
+        elif isinstance(obj, Quote) and _changed(obj, "status") and obj.status != QuoteStatus.PENDING:
+            events.append((obj.analysis_id, quote_event(obj)))
+
+
+def queue_events(session, events: list[tuple[int, dict]]):
+    """
+    Publish (analysis ID, event) pairs when the session next commits.
+
+    For changes the flush hooks cannot see, such as bulk query(...).update()
+    calls, which bypass the session's objects.
+    """
+    session.info.setdefault("progress_events", []).extend(events)
+
+
+def _publish_committed(session):
+    publish_events(session.info.pop("progress_events", []))
+
+
+def _discard(session):
+    session.info.pop("progress_events", None)
+
+
+def install(session_factory):
+    """
+    Publish status and quote changes whenever a session of the factory commits.
+
+    Covers every place that updates an analysis or grades a quote through
+    its objects, so subscribers see changes exactly when they become visible
+    in the database. Bulk updates must queue their events (see queue_events).
+    """
+    if getattr(session_factory, "_progress_installed", False):
+        return
+    event.listen(session_factory, "after_flush", _collect_changes)
+    event.listen(session_factory, "after_commit", _publish_committed)
+    event.listen(session_factory, "after_soft_rollback", lambda session, previous: _discard(session))
+    session_factory._progress_installed = True
+
+
+async def subscribe(analysis_id: int):
+    """
+    Subscribe to an analysis' events.
+
+    Returns:
+        An async Redis PubSub subscribed to the analysis' channel, or None
+        if Redis is unavailable
+    """
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis.from_url(settings.redis_url, socket_connect_timeout=1)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(channel_name(analysis_id))
+    except (redis.RedisError, OSError) as e:
+        print(f"Progress: Could not subscribe to analysis {analysis_id}: {e}")
+        await close(pubsub)
+        return None
+    return pubsub
+
+
+async def close(pubsub):
+    """Unsubscribe and release the subscription's connection."""
+    try:
+        await pubsub.unsubscribe()
+    except (redis.RedisError, OSError):
+        pass
+    await pubsub.aclose() if hasattr(pubsub, "aclose") else await pubsub.close()
+    await pubsub.connection_pool.disconnect()
+
+
+async def next_event(pubsub, timeout: float) -> Optional[dict]:
+    """Wait up to timeout seconds for the next event."""
+    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+    if message is None:
+        return None
+    return json.loads(message["data"])
@@ -1,7 +1,190 @@
 """Quote Extraction Service - Extracts quotes and citations from academic papers."""
 
 import re
-from typing import Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+_page_pattern = re.compile(r'--- Page (\d+) ---')
+
+# Characters of context kept on each side of a quote (within its page)
+CONTEXT_CHARS = 50
+
+
+class QuoteGrammar:
+    """A quotation style: 10-500 characters between an opening and a closing mark (captured as group 1)."""
+
+    def __init__(self, name: str, opening: str, closing: str):
+        self.name = name
+        self.pattern = f"{re.escape(opening)}([^{re.escape(closing)}]{{10,500}}){re.escape(closing)}"
+
+
+class CitationGrammar:
+    """
+    A citation style.
+
+    pattern is the regex for a citation marker; keys turns a matched marker
+    into the reference keys it cites, e.g. "[1, 3-4]" -> ["[1]", "[3]", "[4]"].
+    """
+
+    def __init__(self, name: str, pattern: str, keys: Callable[[str], list[str]]):
+        self.name = name
+        self.pattern = pattern
+        # Papers cite the same sources over and over
+        self.keys = lru_cache(maxsize=4096)(keys)
+
+
+def _bracket_keys(citation: str) -> list[str]:
+    """[1], [1, 2], [1-3], [Smith2020; Jones2019]"""
+    keys = []
+    for part in re.split(r'[,;]', citation[1:-1]):
+        part = part.strip()
+        numeric_range = re.fullmatch(r'(\d+)\s*[-–]\s*(\d+)', part)
+        if numeric_range and int(numeric_range.group(2)) - int(numeric_range.group(1)) < 100:
+            keys.extend(f"[{n}]" for n in range(int(numeric_range.group(1)), int(numeric_range.group(2)) + 1))
+        elif part:
+            keys.append(f"[{part}]")
+    return keys
+
+
+_author_year_pattern = re.compile(r'([^,;]+?),\s*(\d{4})')
+
+
+def _author_year_keys(citation: str) -> list[str]:
+    """(Smith, 2020), (Smith et al., 2020, p. 4), (Smith & Jones, 2020; Lee, 2019)"""
+    keys = [
+        normalize_citation_key(f"({match.group(1).strip()}, {match.group(2)})")
+        for match in _author_year_pattern.finditer(citation[1:-1])
+    ]
+    return keys or [normalize_citation_key(citation)]
+
+
+QUOTE_GRAMMARS = [
+    QuoteGrammar("straight", '"', '"'),
+    QuoteGrammar("curly", "“", "”"),
+]
+
+CITATION_GRAMMARS = [
+    CitationGrammar("bracket", r'\[[^\[\]]{1,100}\]', _bracket_keys),
+    CitationGrammar("author_year", r'\([^()]{1,300}?,\s*\d{4}[^()]{0,100}\)', _author_year_keys),
+]
+
+
+class QuoteExtractor:
+    """
+    Finds quotes followed by a citation in a single pass over the text.
+
+    Each quote grammar is compiled together with all citation grammars into
+    one pattern. Since each pattern starts with a literal quotation mark,
+    the regex engine scans for it with its fast literal search (a character
+    class of all opening marks would be scanned one character at a time);
+    the grammars' matches are merged in document order. Page numbers are
+    looked up by bisecting the offsets of the page markers, so the document
+    is never split or copied.
+    """
+
+    def __init__(
+        self,
+        quote_grammars: Optional[list[QuoteGrammar]] = None,
+        citation_grammars: Optional[list[CitationGrammar]] = None,
+    ):
+        self.quote_grammars = quote_grammars or QUOTE_GRAMMARS
+        self.citation_grammars = citation_grammars or CITATION_GRAMMARS
+
+        citations = "|".join(f"(?P<c{i}>{g.pattern})" for i, g in enumerate(self.citation_grammars))
+        self.patterns = [re.compile(f"{g.pattern}\\s*(?:{citations})") for g in self.quote_grammars]
+
+    def iter_quotes(self, text: str) -> Iterator[dict]:
+        """
+        Yield the quotes of a document in order of appearance.
+
+        A quote citing several references is yielded once per reference key.
+        """
+        marker_starts, marker_ends, page_numbers = [], [], []
+        for marker in _page_pattern.finditer(text):
+            marker_starts.append(marker.start())
+            marker_ends.append(marker.end())
+            page_numbers.append(int(marker.group(1)))
+
+        pos = 0
+        # Next match of each grammar at or after pos
+        upcoming = [pattern.search(text) for pattern in self.patterns]
+        while True:
+            for i, pattern in enumerate(self.patterns):
+                if upcoming[i] is not None and upcoming[i].start() < pos:
+                    upcoming[i] = pattern.search(text, pos)
+            candidates = [i for i, match in enumerate(upcoming) if match is not None]
+            if not candidates:
+                return
+            grammar_index = min(candidates, key=lambda i: upcoming[i].start())
+            match = upcoming[grammar_index]
+
+            start, end = match.span()
+            index = bisect_right(marker_starts, start) - 1
+
+            # Quotes don't span pages: look for one that ends on this page, else go on to the next
+            next_marker = marker_starts[index + 1] if index + 1 < len(marker_starts) else len(text)
+            if end > next_marker:
+                match = self.patterns[grammar_index].search(text, start, next_marker)
+                if match is None:
+                    pos = next_marker
+                    upcoming[grammar_index] = self.patterns[grammar_index].search(text, pos)
+                    continue
+                start, end = match.span()
+            pos = end
+
+            page = page_numbers[index] if index >= 0 else 1
+            page_start = marker_ends[index] if index >= 0 else 0
+            yield from self._quotes(match, text, page, page_start, next_marker)
+
+    def iter_page_quotes(self, page_number: int, text: str) -> Iterator[dict]:
+        """
+        Yield the quotes of a single page's text (without page markers).
+
+        For streaming extraction; gives the same results as iter_quotes on
+        the whole document.
+        """
+        upcoming = [pattern.search(text) for pattern in self.patterns]
+        pos = 0
+        while True:
+            for i, pattern in enumerate(self.patterns):
+                if upcoming[i] is not None and upcoming[i].start() < pos:
+                    upcoming[i] = pattern.search(text, pos)
+            candidates = [match for match in upcoming if match is not None]
+            if not candidates:
+                return
+            match = min(candidates, key=lambda m: m.start())
+            pos = match.end()
+            yield from self._quotes(match, text, page_number, 0, len(text))
+
+    def _quotes(self, match: re.Match, text: str, page: int, page_start: int, page_end: int) -> Iterator[dict]:
+        """One quote per reference key of a match, with context from within its page."""
+        start, end = match.span()
+        grammar = self.citation_grammars[int(match.lastgroup[1:])]
+        context_before = text[max(page_start, start - CONTEXT_CHARS):start].strip()
+        context_after = text[end:min(page_end, end + CONTEXT_CHARS)].strip()
+
+        for reference_key in grammar.keys(match.group(match.lastgroup)):
+            yield {
+                "text": match.group(1).strip(),
+                "reference_key": reference_key,
+                "page": page,
+                "context_before": context_before or None,
+                "context_after": context_after or None,
+            }
+
+
+_default_extractor = QuoteExtractor()
+
+
+def iter_quotes(text: str) -> Iterator[dict]:
+    """Yield quotes and their citations with the default grammars."""
+    return _default_extractor.iter_quotes(text)
+
+
+def iter_page_quotes(page_number: int, text: str) -> Iterator[dict]:
+    """Yield the quotes of one page with the default grammars."""
+    return _default_extractor.iter_page_quotes(page_number, text)
 
 
 def extract_quotes(text: str) -> list[dict]:
@@ -9,8 +192,9 @@ def extract_quotes(text: str) -> list[dict]:
     Extract all quotes and their associated citations from paper text.
 
     This identifies:
-    - Direct quotes (in quotation marks)
-    - Citations in various formats: [1], [Smith2020], (Smith, 2020), etc.
+    - Direct quotes (in straight or curly quotation marks)
+    - Citations in various formats: [1], [1, 2], [Smith2020], (Smith, 2020),
+      (Smith et al., 2020; Jones, 2019), etc.
 
     Args:
         text: The full text of the paper
@@ -18,45 +202,7 @@ def extract_quotes(text: str) -> list[dict]:
     Returns:
         List of quote dictionaries with text, context, page, and reference_key
     """
-    quotes = []
-
-    # Pattern for quoted text with citation
-    # Matches: "quoted text" [1] or "quoted text" (Smith, 2020)
-    quote_pattern = r'"([^"]{10,500})"[\s]*(\[[^\]]+\]|\([^)]+,\s*\d{4}[^)]*\))'
-
-    # Split text by pages (assuming "--- Page X ---" markers)
-    page_pattern = r'--- Page (\d+) ---'
-    pages = re.split(page_pattern, text)
-
-    current_page = 1
-    for i, section in enumerate(pages):
-        if i % 2 == 1:  # This is a page number
-            current_page = int(section)
-            continue
-
-        # Find quotes in this section
-        for match in re.finditer(quote_pattern, section):
-            quote_text = match.group(1)
-            citation = match.group(2)
-
-            # Get context (50 chars before and after)
-            start = max(0, match.start() - 50)
-            end = min(len(section), match.end() + 50)
-            context_before = section[start:match.start()].strip()
-            context_after = section[match.end():end].strip()
-
-            # Normalize citation key
-            reference_key = normalize_citation_key(citation)
-
-            quotes.append({
-                "text": quote_text.strip(),
-                "reference_key": reference_key,
-                "page": current_page,
-                "context_before": context_before[-100:] if context_before else None,
-                "context_after": context_after[:100] if context_after else None,
-            })
-
-    return quotes
+    return list(iter_quotes(text))
 
 
 def normalize_citation_key(citation: str) -> str:
@@ -68,6 +214,7 @@ def normalize_citation_key(citation: str) -> str:
         "[Smith2020]" -> "[Smith2020]"
         "(Smith, 2020)" -> "[Smith2020]"
         "(Smith & Jones, 2020)" -> "[SmithJones2020]"
+        "(Smith et al., 2020)" -> "[Smith2020]"
     """
     # Already in bracket format
     if citation.startswith("["):
@@ -82,7 +229,8 @@ def normalize_citation_key(citation: str) -> str:
         # Pattern: "Author, Year" or "Author & Author, Year"
         match = re.match(r'([^,]+),\s*(\d{4})', inner)
         if match:
-            author = match.group(1).replace(" & ", "").replace(" ", "")
+            author = re.sub(r'\s+et\s+al\.?', '', match.group(1))
+            author = re.sub(r'\s+(?:&|and)\s+', '', author).replace(" ", "")
             year = match.group(2)
             return f"[{author}{year}]"
 
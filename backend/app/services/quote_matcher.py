@@ -0,0 +1,222 @@
+"""Quote Matcher Service - Locates quotes verbatim in source text without the LLM."""
+
+import re
+import unicodedata
+from bisect import bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Optional
+
+_page_pattern = re.compile(r'--- Page (\d+) ---')
+
+# Characters PDF extraction commonly produces in place of plain ASCII
+_CHAR_REPLACEMENTS = {
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"', "\u201f": '"',
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-",
+    "\u00ad": "",  # Soft hyphen
+}
+
+NGRAM_SIZE = 3
+
+
+def normalize_with_offsets(text: str) -> tuple[str, list[int]]:
+    """
+    Normalize text for matching and map each output character to its source offset.
+
+    Lowercases, expands ligatures (NFKC), joins words hyphenated across line
+    breaks, drops page markers, and turns punctuation and whitespace runs
+    into single spaces.
+
+    Returns:
+        (normalized text, offsets) where offsets[i] is the index in text of
+        normalized character i
+    """
+    markers = {m.start(): m.end() for m in _page_pattern.finditer(text)}
+
+    chars = []
+    offsets = []
+    length = len(text)
+    i = 0
+    while i < length:
+        if i in markers:
+            i = markers[i]
+            if chars and chars[-1] != " ":
+                chars.append(" ")
+                offsets.append(i - 1)
+            continue
+
+        ch = text[i]
+
+        # Hyphenation across a line break: "exam-\nple" -> "example"
+        if ch in "-\u00ad\u2010" and chars and chars[-1].isalpha():
+            j = i + 1
+            while j < length and text[j] in " \t":
+                j += 1
+            if j < length and text[j] == "\n":
+                j += 1
+                while j < length and text[j].isspace():
+                    j += 1
+                if j < length and text[j].islower():
+                    i = j
+                    continue
+
+        if ord(ch) > 127:
+            ch = _CHAR_REPLACEMENTS.get(ch, ch)
+            if len(ch) == 1 and ord(ch) > 127:
+                ch = unicodedata.normalize("NFKC", ch)
+
+        for c in ch.lower():
+            if c.isalnum():
+                chars.append(c)
+                offsets.append(i)
+            elif chars and chars[-1] != " ":
+                chars.append(" ")
+                offsets.append(i)
+        i += 1
+
+    # Drop a trailing separator
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+
+    return "".join(chars), offsets
+
+
+class SourceMatchIndex:
+    """Normalized text, token n-gram index and page offsets for one source."""
+
+    def __init__(self, source_text: str):
+        self.source_text = source_text
+        self.normalized, self.offsets = normalize_with_offsets(source_text)
+
+        self.page_starts = []
+        self.page_numbers = []
+        for match in _page_pattern.finditer(source_text):
+            self.page_starts.append(match.start())
+            self.page_numbers.append(int(match.group(1)))
+
+        # Token start offsets (in the normalized text)
+        self.tokens = self.normalized.split(" ") if self.normalized else []
+        self.token_starts = []
+        position = 0
+        for token in self.tokens:
+            self.token_starts.append(position)
+            position += len(token) + 1
+
+        self.ngrams = {}
+        for i in range(len(self.tokens) - NGRAM_SIZE + 1):
+            self.ngrams.setdefault(tuple(self.tokens[i:i + NGRAM_SIZE]), []).append(i)
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """Page number containing an offset of the original text."""
+        index = bisect_right(self.page_starts, offset) - 1
+        return self.page_numbers[index] if index >= 0 else None
+
+    def excerpt(self, norm_start: int, norm_end: int) -> tuple[int, int]:
+        """Original text span covering a normalized span."""
+        return self.offsets[norm_start], self.offsets[norm_end - 1] + 1
+
+
+@lru_cache(maxsize=32)
+def get_match_index(source_text: str) -> SourceMatchIndex:
+    """Build (or reuse) the match index for a source."""
+    return SourceMatchIndex(source_text)
+
+
+def match_quote(quote_text: str, source_text: str, min_score: float = 0.8) -> Optional[dict]:
+    """
+    Find a quote in the source text.
+
+    Tries an exact match on normalized text first, then a fuzzy alignment
+    anchored on shared word n-grams.
+
+    Args:
+        quote_text: The quote as it appears in the paper
+        source_text: Full text of the source paper (with page markers)
+        min_score: Minimum share of quote words that must align
+
+    Returns:
+        Dict with exact, score, words (normalized words in the quote),
+        source_text, source_page, start and end (offsets into source_text),
+        or None if no match reaches min_score
+    """
+    quote_norm, _ = normalize_with_offsets(quote_text)
+    if not quote_norm:
+        return None
+
+    index = get_match_index(source_text)
+
+    # Exact match on word boundaries
+    normalized = index.normalized
+    position = normalized.find(quote_norm)
+    while position >= 0:
+        end = position + len(quote_norm)
+        if (position == 0 or normalized[position - 1] == " ") and (end == len(normalized) or normalized[end] == " "):
+            return _build_match(index, position, end, 1.0, exact=True, words=quote_norm.count(" ") + 1)
+        position = normalized.find(quote_norm, position + 1)
+
+    quote_tokens = quote_norm.split(" ")
+    if len(quote_tokens) < NGRAM_SIZE:
+        return None
+
+    # Vote for alignment starts using the quote's n-grams
+    votes = Counter()
+    for j in range(len(quote_tokens) - NGRAM_SIZE + 1):
+        for i in index.ngrams.get(tuple(quote_tokens[j:j + NGRAM_SIZE]), ()):
+            votes[i - j] += 1
+
+    best = None
+    slack = len(quote_tokens) // 10 + 2
+    for start, _ in votes.most_common(3):
+        lo = max(0, start - slack)
+        hi = min(len(index.tokens), start + len(quote_tokens) + slack)
+        window = index.tokens[lo:hi]
+
+        blocks = [b for b in SequenceMatcher(None, quote_tokens, window, autojunk=False).get_matching_blocks() if b.size]
+        if not blocks:
+            continue
+        matched = sum(b.size for b in blocks)
+        span_start = lo + blocks[0].b
+        span_end = lo + blocks[-1].b + blocks[-1].size
+        score = matched / max(len(quote_tokens), span_end - span_start)
+
+        if score >= min_score and (best is None or score > best[0]):
+            best = (score, span_start, span_end)
+
+    if best is None:
+        return None
+
+    score, token_start, token_end = best
+    norm_start = index.token_starts[token_start]
+    norm_end = index.token_starts[token_end - 1] + len(index.tokens[token_end - 1])
+    return _build_match(index, norm_start, norm_end, score, exact=False, words=len(quote_tokens))
+
+
+def _build_match(index: SourceMatchIndex, norm_start: int, norm_end: int, score: float, exact: bool, words: int) -> dict:
+    start, end = index.excerpt(norm_start, norm_end)
+    return {
+        "exact": exact,
+        "score": round(score, 3),
+        "words": words,
+        "source_text": " ".join(_page_pattern.sub(" ", index.source_text[start:end]).split()),
+        "source_page": index.page_at(start),
+        "start": start,
+        "end": end,
+    }
+
+
+def located_passage(source_text: str, match: dict, context_chars: int = 1500) -> str:
+    """
+    The matched region plus surrounding context, labelled with its page.
+
+    Used in place of the full source when asking the LLM about a located quote.
+    """
+    start = max(0, match["start"] - context_chars)
+    end = min(len(source_text), match["end"] + context_chars)
+    passage = source_text[start:end].strip()
+    page = get_match_index(source_text).page_at(start)
+    if page is not None and not passage.startswith("--- Page"):
+        passage = f"--- Page {page} ---\n{passage}"
+    return passage
@@ -3,81 +3,160 @@
 import re
 from typing import Optional
 
-
-def parse_references(text: str) -> list[dict]:
+from app.config import get_settings
+from app.services.parallel import can_spawn_processes, process_pool, worker_count
+
+settings = get_settings()
+
+# Section headers
+SECTION_HEADERS = ["References", "Bibliography", "REFERENCES", "BIBLIOGRAPHY", "Works Cited"]
+
+# All patterns are compiled once. None of them can backtrack more than a
+# bounded amount per position: no nested or adjacent unbounded quantifiers
+# over overlapping character classes.
+_header_tail = re.compile(r'\s*\n')
+_numbered_key = re.compile(r'\[(\d+)\]')
+_entry_key = re.compile(r'\[([^\]]+)\]')
+_year = re.compile(r'\b(19|20)\d{2}\b')
+_doi = re.compile(r'(?:doi[:\s]*)?10\.\d{4,}/[^\s]+', re.IGNORECASE)
+_arxiv = re.compile(r'arXiv[:\s]*(\d{4}\.\d{4,5}(?:v\d+)?)', re.IGNORECASE)
+_quoted_title = re.compile(r'"([^"]{10,200})"')
+# End of the author list: a period or "(year)". Whitespace before "(year)"
+# is stripped afterwards rather than matched, since "\s*" in front of it
+# made the search quadratic on long runs of whitespace.
+_author_end = re.compile(r'\.|\(\d{4}\)')
+
+
+def parse_references(text: str, parallel: Optional[bool] = None) -> list[dict]:
     """
     Parse the reference/bibliography section of a paper.
 
+    Bibliographies with at least settings.reference_parallel_min_entries
+    entries are parsed in chunks on a process pool; both paths produce
+    identical output.
+
     Args:
         text: Full paper text
+        parallel: Force (True) or disable (False) parallel parsing;
+            None decides by entry count
 
     Returns:
         List of reference dictionaries with key, title, authors, year, doi, arxiv_id
     """
-    references = []
-
     # Find the references section
-    ref_section = extract_references_section(text)
+    return parse_reference_section(extract_references_section(text), parallel=parallel)
+
+
+def parse_reference_section(ref_section: Optional[str], parallel: Optional[bool] = None) -> list[dict]:
+    """Parse a references section as returned by extract_references_section."""
     if not ref_section:
-        return references
+        return []
 
     # Split into individual references
     # Common patterns: numbered [1], [2] or just line breaks
     ref_entries = split_references(ref_section)
 
-    for entry in ref_entries:
-        parsed = parse_single_reference(entry)
-        if parsed:
-            references.append(parsed)
+    if parallel is None:
+        parallel = len(ref_entries) >= settings.reference_parallel_min_entries
+    if parallel:
+        return _parse_entries_parallel(ref_entries)
+    return _parse_entries(ref_entries)
+
 
-    return references
+def _parse_entries(entries: list[str]) -> list[dict]:
+    return [parsed for parsed in map(parse_single_reference, entries) if parsed]
+
+
+def _parse_entries_parallel(entries: list[str]) -> list[dict]:
+    """Parse chunks of entries on a process pool (sized by parallel.worker_count), keeping their order."""
+    workers = worker_count()
+    if workers < 2 or not can_spawn_processes() or not entries:
+        return _parse_entries(entries)
+
+    chunk_count = min(len(entries), workers * 4)
+    bounds = [len(entries) * i // chunk_count for i in range(chunk_count + 1)]
+
+    with process_pool(min(workers, chunk_count)) as executor:
+        chunks = executor.map(_parse_entries, [entries[lo:hi] for lo, hi in zip(bounds, bounds[1:])])
+        return [reference for chunk in chunks for reference in chunk]
 
 
 def extract_references_section(text: str) -> Optional[str]:
     """
     Extract the references/bibliography section from paper text.
+
+    The last header in the document wins, so a table of contents or a
+    "References" line in the body is skipped. Each header is searched
+    backwards from the end with str.rfind, which stops at the first hit.
     """
-    # Common section headers
-    headers = [
-        r'References\s*\n',
-        r'Bibliography\s*\n',
-        r'REFERENCES\s*\n',
-        r'BIBLIOGRAPHY\s*\n',
-        r'Works Cited\s*\n',
-    ]
+    best_start, best_end = -1, None
+
+    for header in SECTION_HEADERS:
+        pos = text.rfind(header, best_start + 1)
+        while pos != -1:
+            # The header must be followed by a line break
+            tail = _header_tail.match(text, pos + len(header))
+            if tail:
+                if pos > best_start:
+                    best_start, best_end = pos, tail.end()
+                break
+            pos = text.rfind(header, best_start + 1, pos)
+
+    if best_end is None:
+        return None
+
+    # Return everything after the header
+    return text[best_end:]
+
 
-    for pattern in headers:
-        match = re.search(pattern, text)
-        if match:
-            # Return everything after the header
-            return text[match.end():]
+class ReferenceSectionBuffer:
+    """
+    Collects the references section from a stream of pages.
+
+    Only the text after the last header seen so far is kept, so a long
+    document is never held in memory, and section() matches what
+    extract_references_section returns for the whole text.
+    """
 
-    return None
+    def __init__(self):
+        self._parts = []
+        self._found = False
+
+    def add_page(self, page_number: int, text: str):
+        # Pages as they appear in the text from extract_text_from_pdf
+        chunk = f"--- Page {page_number} ---\n{text}\n\n"
+        section = extract_references_section(chunk)
+        if section is not None:
+            self._parts = [section]
+            self._found = True
+        elif self._found:
+            self._parts.append(chunk)
+
+    def section(self) -> Optional[str]:
+        return "".join(self._parts) if self._found else None
 
 
 def split_references(ref_section: str) -> list[str]:
     """
-    Split reference section into individual entries.
+    Split reference section into individual entries in one pass.
     """
-    entries = []
-
     # Try numbered format first: [1], [2], etc.
-    numbered_pattern = r'\[(\d+)\]'
-    numbered_splits = re.split(numbered_pattern, ref_section)
+    keys = list(_numbered_key.finditer(ref_section))
 
-    if len(numbered_splits) > 2:
+    if keys:
         # Numbered format found
-        for i in range(1, len(numbered_splits), 2):
-            num = numbered_splits[i]
-            text = numbered_splits[i + 1] if i + 1 < len(numbered_splits) else ""
-            entries.append(f"[{num}] {text.strip()}")
-        return entries
+        bounds = [key.end() for key in keys]
+        ends = [key.start() for key in keys[1:]] + [len(ref_section)]
+        return [
+            f"[{key.group(1)}] {ref_section[start:end].strip()}"
+            for key, start, end in zip(keys, bounds, ends)
+        ]
 
     # Try splitting by blank lines or numbered lists
-    lines = ref_section.split('\n')
+    entries = []
     current_entry = []
 
-    for line in lines:
+    for line in ref_section.split('\n'):
         line = line.strip()
         if not line:
             if current_entry:
@@ -111,28 +190,28 @@ def parse_single_reference(entry: str) -> Optional[dict]:
     }
 
     # Extract reference key if numbered
-    key_match = re.match(r'\[([^\]]+)\]', entry)
+    key_match = _entry_key.match(entry)
     if key_match:
         result["key"] = f"[{key_match.group(1)}]"
 
     # Extract year (4-digit number, typically 1900-2030)
-    year_match = re.search(r'\b(19|20)\d{2}\b', entry)
+    year_match = _year.search(entry)
     if year_match:
         result["year"] = int(year_match.group())
 
     # Extract DOI
-    doi_match = re.search(r'(?:doi[:\s]*)?10\.\d{4,}/[^\s]+', entry, re.IGNORECASE)
+    doi_match = _doi.search(entry)
     if doi_match:
         result["doi"] = doi_match.group().lower().replace('doi:', '').replace('doi', '').strip()
 
     # Extract arXiv ID
-    arxiv_match = re.search(r'arXiv[:\s]*(\d{4}\.\d{4,5}(?:v\d+)?)', entry, re.IGNORECASE)
+    arxiv_match = _arxiv.search(entry)
     if arxiv_match:
         result["arxiv_id"] = arxiv_match.group(1)
 
     # Try to extract title (usually in quotes or after authors)
     # This is a simplified heuristic
-    title_match = re.search(r'"([^"]{10,200})"', entry)
+    title_match = _quoted_title.search(entry)
     if title_match:
         result["title"] = title_match.group(1)
     else:
@@ -153,8 +232,8 @@ def parse_single_reference(entry: str) -> Optional[dict]:
         author_section = entry
 
     # Authors typically end with year in parentheses or period
-    author_match = re.match(r'^([^.]+?)(?:\s*\(\d{4}\)|\.)', author_section)
-    if author_match:
-        result["authors"] = author_match.group(1).strip()
+    author_end = _author_end.search(author_section, 1)
+    if author_end and not author_section.startswith("."):
+        result["authors"] = author_section[:author_end.start()].strip()
 
     return result
@@ -0,0 +1,268 @@
+"""Reference Registry Service - Shares fetched reference papers across analyses."""
+
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.models import Analysis, AnalysisStatus, Paper, ReferenceRegistryEntry
+from app.config import get_settings
+from app.services.text_store import delete_text, move_text
+
+settings = get_settings()
+
+REGISTRY_SUBDIR = "registry"
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """
+    Normalize a DOI for lookups.
+
+    Examples:
+        "https://doi.org/10.1000/XYZ." -> "10.1000/xyz"
+        "doi:10.1000/xyz" -> "10.1000/xyz"
+    """
+    if not doi:
+        return None
+    doi = doi.strip().lower()
+    doi = re.sub(r'^(?:https?://)?(?:dx\.)?doi\.org/', '', doi)
+    doi = re.sub(r'^doi:\s*', '', doi)
+    doi = doi.rstrip('.,;')
+    return doi or None
+
+
+def normalize_arxiv_id(arxiv_id: Optional[str]) -> Optional[str]:
+    """
+    Normalize an arXiv ID for lookups (drops prefix and version suffix).
+
+    Examples:
+        "arXiv:2101.00001v2" -> "2101.00001"
+    """
+    if not arxiv_id:
+        return None
+    arxiv_id = arxiv_id.strip().lower()
+    arxiv_id = re.sub(r'^arxiv:\s*', '', arxiv_id)
+    arxiv_id = re.sub(r'v\d+$', '', arxiv_id)
+    return arxiv_id or None
+
+
+def normalize_title(title: Optional[str]) -> Optional[str]:
+    """Normalize a title to lowercase words without punctuation."""
+    if not title:
+        return None
+    words = re.findall(r'\w+', title.lower())
+    if len(words) < 3:  # Too short to identify a paper reliably
+        return None
+    return " ".join(words)[:500]
+
+
+def compute_file_hash(file_path: str) -> str:
+    """Compute the SHA-256 hash of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_entry(paper: Paper, db: Session) -> Optional[ReferenceRegistryEntry]:
+    """
+    Find a registry entry matching the paper's DOI, arXiv ID or title.
+    """
+    doi = normalize_doi(paper.doi)
+    if doi:
+        entry = db.query(ReferenceRegistryEntry).filter(ReferenceRegistryEntry.doi == doi).first()
+        if entry:
+            return entry
+
+    arxiv_id = normalize_arxiv_id(paper.arxiv_id)
+    if arxiv_id:
+        entry = db.query(ReferenceRegistryEntry).filter(ReferenceRegistryEntry.arxiv_id == arxiv_id).first()
+        if entry:
+            return entry
+
+    title_key = normalize_title(paper.title)
+    if title_key:
+        entry = db.query(ReferenceRegistryEntry).filter(ReferenceRegistryEntry.title_key == title_key).first()
+        if entry:
+            return entry
+
+    return None
+
+
+def link_paper(paper: Paper, entry: ReferenceRegistryEntry, db: Session):
+    """
+    Point a reference Paper row at a registry entry instead of fetching it again.
+    """
+    paper.registry_entry = entry
+    paper.file_path = entry.file_path
+    paper.source_type = entry.source_type or paper.source_type
+    paper.title = entry.title or paper.title
+    paper.authors = entry.authors or paper.authors
+    paper.year = entry.year or paper.year
+    paper.doi = paper.doi or entry.doi
+    paper.arxiv_id = paper.arxiv_id or entry.arxiv_id
+
+    entry.last_used_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def link_from_registry(paper: Paper, db: Session) -> bool:
+    """
+    Link the paper to an existing registry entry if one matches.
+
+    Returns:
+        True if the paper was linked, False if it still needs to be fetched
+    """
+    entry = find_entry(paper, db)
+    if not entry or not os.path.exists(entry.file_path):
+        return False
+
+    link_paper(paper, entry, db)
+    print(f"Registry: Reusing '{entry.title}' for {paper.reference_key}")
+    return True
+
+
+def _get_or_create_entry(db: Session, content_hash: str, file_path: str) -> tuple[ReferenceRegistryEntry, bool]:
+    """
+    Get the registry entry of a PDF, or insert one.
+
+    content_hash is unique: when two workers register the same PDF at once,
+    the second insert fails and that worker uses the first one's entry.
+
+    Returns:
+        (entry, whether it was created)
+    """
+    query = db.query(ReferenceRegistryEntry).filter(ReferenceRegistryEntry.content_hash == content_hash)
+    entry = query.first()
+    if entry:
+        return entry, False
+
+    entry = ReferenceRegistryEntry(content_hash=content_hash, file_path=file_path)
+    db.add(entry)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return query.one(), False
+    return entry, True
+
+
+def register_paper(paper: Paper, db: Session) -> Optional[ReferenceRegistryEntry]:
+    """
+    Add a freshly fetched paper to the registry and link it.
+
+    The PDF is moved to a content-addressed path, so a paper that was
+    already registered under different keys is stored only once.
+    """
+    if not paper.file_path or not os.path.exists(paper.file_path):
+        return None
+
+    try:
+        content_hash = compute_file_hash(paper.file_path)
+        registry_dir = os.path.join(settings.upload_dir, REGISTRY_SUBDIR)
+        file_path = os.path.join(registry_dir, f"{content_hash}.pdf")
+
+        entry, created = _get_or_create_entry(db, content_hash, file_path)
+
+        if not created and os.path.exists(entry.file_path):
+            # Same PDF already registered, drop the duplicate download and text
+            if os.path.abspath(paper.file_path) != os.path.abspath(entry.file_path):
+                os.remove(paper.file_path)
+            delete_text(db, paper=paper)
+        else:
+            os.makedirs(registry_dir, exist_ok=True)
+            os.replace(paper.file_path, file_path)
+
+            if not created:
+                delete_text(db, registry_entry=entry)
+            entry.file_path = file_path
+            entry.file_size = os.path.getsize(file_path)
+            move_text(db, paper, entry)
+
+        # Fill in any lookup keys the entry does not have yet
+        entry.doi = entry.doi or normalize_doi(paper.doi)
+        entry.arxiv_id = entry.arxiv_id or normalize_arxiv_id(paper.arxiv_id)
+        entry.title_key = entry.title_key or normalize_title(paper.title)
+        entry.title = entry.title or paper.title
+        entry.authors = entry.authors or paper.authors
+        entry.year = entry.year or paper.year
+        entry.source_type = entry.source_type or paper.source_type
+
+        link_paper(paper, entry, db)
+        return entry
+
+    except Exception as e:
+        db.rollback()
+        print(f"Registry: Failed to register paper: {e}")
+        return None
+
+
+def evict_entries(
+    db: Session,
+    max_size_mb: Optional[int] = None,
+    max_age_days: Optional[int] = None,
+) -> int:
+    """
+    Evict registry entries that are too old or exceed the size budget.
+
+    Entries unused for longer than max_age_days are always removed. After
+    that, least recently used entries are removed until the total stored
+    size fits within max_size_mb. Entries used by an analysis that has not
+    completed (including failed ones, which can be continued) are never
+    removed (they count towards the size, though).
+
+    Returns:
+        Number of evicted entries
+    """
+    if max_size_mb is None:
+        max_size_mb = settings.reference_registry_max_size_mb
+    if max_age_days is None:
+        max_age_days = settings.reference_registry_max_age_days
+
+    in_use = select(Paper.registry_entry_id).join(Analysis, Paper.analysis_id == Analysis.id).where(
+        Paper.registry_entry_id.isnot(None),
+        # Failed analyses can still be continued, which needs their papers
+        Analysis.status != AnalysisStatus.COMPLETED,
+    )
+    evictable = db.query(ReferenceRegistryEntry).filter(ReferenceRegistryEntry.id.notin_(in_use))
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    to_evict = evictable.filter(ReferenceRegistryEntry.last_used_at < cutoff).all()
+
+    evicted_ids = {entry.id for entry in to_evict}
+    total_size = (db.query(func.sum(ReferenceRegistryEntry.file_size)).scalar() or 0)
+    total_size -= sum(entry.file_size or 0 for entry in to_evict)
+
+    max_size = max_size_mb * 1024 * 1024
+    if total_size > max_size:
+        lru_entries = evictable.order_by(
+            ReferenceRegistryEntry.last_used_at.asc()
+        ).all()
+        for entry in lru_entries:
+            if total_size <= max_size:
+                break
+            if entry.id in evicted_ids:
+                continue
+            to_evict.append(entry)
+            evicted_ids.add(entry.id)
+            total_size -= entry.file_size or 0
+
+    for entry in to_evict:
+        # Linked papers lose their copy and show up as missing again
+        for paper in entry.papers:
+            paper.registry_entry_id = None
+            if paper.file_path == entry.file_path:
+                paper.file_path = None
+        if os.path.exists(entry.file_path):
+            os.remove(entry.file_path)
+        delete_text(db, registry_entry=entry)
+        db.delete(entry)
+
+    db.commit()
+    return len(to_evict)
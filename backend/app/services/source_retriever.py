@@ -0,0 +1,174 @@
+"""Source Retriever Service - Selects the passages of a source relevant to a quote."""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Bump when passage selection changes in a way the constants below don't
+# capture; cached validation results depend on it (see validation_cache)
+RETRIEVER_VERSION = 2
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Passage windows (in words) within each page
+PASSAGE_WORDS = 200
+PASSAGE_STRIDE = 150
+
+_page_pattern = re.compile(r'--- Page (\d+) ---')
+_token_pattern = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens."""
+    return _token_pattern.findall(text.lower())
+
+
+def split_passages(source_text: str) -> list[dict]:
+    """
+    Split source text into overlapping passages that stay within one page.
+
+    Returns:
+        List of dicts with page (None if the text has no page markers) and text
+    """
+    sections = _page_pattern.split(source_text)
+
+    pages = []
+    if sections[0].strip():
+        pages.append((None, sections[0]))
+    for i in range(1, len(sections) - 1, 2):
+        pages.append((int(sections[i]), sections[i + 1]))
+
+    passages = []
+    for page, page_text in pages:
+        words = page_text.split()
+        for start in range(0, max(len(words) - PASSAGE_WORDS + PASSAGE_STRIDE, 1), PASSAGE_STRIDE):
+            chunk = words[start:start + PASSAGE_WORDS]
+            if chunk:
+                passages.append({"page": page, "text": " ".join(chunk)})
+
+    return passages
+
+
+class SourceIndex:
+    """
+    BM25 index over the passages of one source.
+
+    The BM25 term weights are precomputed into a sparse passage x term
+    matrix, so scoring a query is a single sparse matrix-vector product.
+    """
+
+    def __init__(self, source_text: str):
+        self.passages = split_passages(source_text)
+        self.vocabulary = {}
+
+        indptr = [0]
+        indices = []
+        data = []
+        for passage in self.passages:
+            counts = {}
+            for token in tokenize(passage["text"]):
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+
+        shape = (len(self.passages), len(self.vocabulary))
+        tf = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=shape,
+        )
+
+        # Precompute BM25 weights for every (passage, term) pair
+        doc_lengths = np.asarray(tf.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() if len(doc_lengths) else 0.0
+        doc_freq = np.bincount(tf.indices, minlength=shape[1])
+        idf = np.log1p((shape[0] - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        rows = np.repeat(np.arange(shape[0]), np.diff(tf.indptr))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[rows] / max(avg_length, 1e-9))
+        weights = idf[tf.indices] * tf.data * (BM25_K1 + 1) / (tf.data + norm)
+        self.weights = sparse.csr_matrix((weights.astype(np.float32), tf.indices, tf.indptr), shape=shape)
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """
+        Rank passages for a query.
+
+        Returns:
+            Up to top_k (passage index, score) pairs, best first
+        """
+        term_ids = [self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary]
+        if not term_ids or not self.passages:
+            return []
+
+        query_vector = np.bincount(term_ids, minlength=len(self.vocabulary)).astype(np.float32)
+        scores = self.weights @ query_vector
+
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(i), float(scores[i])) for i in best if scores[i] > 0]
+
+
+@lru_cache(maxsize=32)
+def get_source_index(source_text: str) -> SourceIndex:
+    """Build (or reuse) the index for a source, so it is built once per reference."""
+    return SourceIndex(source_text)
+
+
+def retrieve_passages(
+    source_text: str,
+    queries: list[str],
+    top_k: Optional[int] = None,
+    max_passages: Optional[int] = None,
+) -> str:
+    """
+    Select the source passages most relevant to one or more quotes.
+
+    Passages are taken round-robin from each query's ranking until
+    max_passages is reached, then returned in document order with their
+    page numbers.
+
+    Args:
+        source_text: Full text of the source paper (with page markers)
+        queries: One query per quote (quote text plus context)
+        top_k: Passages to consider per query
+        max_passages: Cap on the total number of passages returned
+
+    Returns:
+        The selected passages formatted for the prompt
+    """
+    top_k = top_k or settings.retrieval_top_k
+    max_passages = max_passages or settings.retrieval_max_passages
+
+    index = get_source_index(source_text)
+    rankings = [index.search(query, top_k) for query in queries]
+
+    selected = []
+    seen = set()
+    for rank in range(top_k):
+        for ranking in rankings:
+            if rank < len(ranking) and len(selected) < max_passages:
+                passage_id = ranking[rank][0]
+                if passage_id not in seen:
+                    seen.add(passage_id)
+                    selected.append(passage_id)
+
+    if not selected:
+        return "[No passages in the source matched the quote]"
+
+    parts = []
+    for passage_id in sorted(selected):
+        passage = index.passages[passage_id]
+        label = f"[Page {passage['page']}]" if passage["page"] is not None else "[Page unknown]"
+        parts.append(f"{label}\n{passage['text']}")
+    return "\n\n[...]\n\n".join(parts)
@@ -0,0 +1,157 @@
+"""Text Store Service - Stores extracted paper text page by page."""
+
+import os
+import re
+import zlib
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import Paper, PaperPage, ReferenceRegistryEntry
+
+_page_pattern = re.compile(r'--- Page (\d+) ---\n?')
+
+
+def split_pages(text: str) -> list[tuple[int, str]]:
+    """
+    Split text produced by extract_text_from_pdf into (page number, text) pairs.
+
+    Text without page markers is treated as a single page 1.
+    """
+    sections = _page_pattern.split(text)
+    if len(sections) == 1:
+        return [(1, text)] if text.strip() else []
+
+    pages = []
+    for i in range(1, len(sections) - 1, 2):
+        page_text = sections[i + 1]
+        if i + 2 < len(sections):
+            page_text = page_text[:-2] if page_text.endswith("\n\n") else page_text
+        pages.append((int(sections[i]), page_text))
+    return pages
+
+
+def join_pages(pages: Iterable[tuple[int, str]]) -> str:
+    """Reassemble pages in the extract_text_from_pdf format."""
+    return "\n\n".join(f"--- Page {number} ---\n{text}" for number, text in pages)
+
+
+def _owner_filter(paper: Optional[Paper], registry_entry: Optional[ReferenceRegistryEntry]):
+    if paper is not None:
+        return PaperPage.paper_id == paper.id
+    return PaperPage.registry_entry_id == registry_entry.id
+
+
+def store_text(
+    db: Session,
+    text: str,
+    paper: Optional[Paper] = None,
+    registry_entry: Optional[ReferenceRegistryEntry] = None,
+):
+    """Replace the stored pages of a paper or registry entry (does not commit)."""
+    db.flush()  # Make sure the owner has an ID
+    delete_text(db, paper=paper, registry_entry=registry_entry)
+    append_pages(db, split_pages(text), paper=paper, registry_entry=registry_entry)
+
+
+def append_pages(
+    db: Session,
+    pages: Iterable[tuple[int, str]],
+    paper: Optional[Paper] = None,
+    registry_entry: Optional[ReferenceRegistryEntry] = None,
+):
+    """Add (page number, text) pages to a paper or registry entry, e.g. while streaming (does not commit)."""
+    db.bulk_insert_mappings(PaperPage, [
+        {
+            "paper_id": paper.id if paper is not None else None,
+            "registry_entry_id": registry_entry.id if registry_entry is not None else None,
+            "page_number": number,
+            "content": zlib.compress(page_text.encode("utf-8")),
+        }
+        for number, page_text in pages
+    ])
+
+
+def move_text(db: Session, paper: Paper, registry_entry: ReferenceRegistryEntry):
+    """Hand a paper's pages over to a registry entry (does not commit)."""
+    db.flush()
+    db.query(PaperPage).filter(PaperPage.paper_id == paper.id).update(
+        {PaperPage.paper_id: None, PaperPage.registry_entry_id: registry_entry.id},
+        synchronize_session=False,
+    )
+
+
+def delete_text(
+    db: Session,
+    paper: Optional[Paper] = None,
+    registry_entry: Optional[ReferenceRegistryEntry] = None,
+):
+    """Delete the stored pages of a paper or registry entry (does not commit)."""
+    db.query(PaperPage).filter(_owner_filter(paper, registry_entry)).delete(synchronize_session=False)
+
+
+def load_pages(
+    db: Session,
+    paper: Optional[Paper] = None,
+    registry_entry: Optional[ReferenceRegistryEntry] = None,
+    page_numbers: Optional[Iterable[int]] = None,
+) -> list[tuple[int, str]]:
+    """
+    Load stored pages in page order.
+
+    Args:
+        page_numbers: Only load these pages (all pages if None)
+    """
+    query = db.query(PaperPage.page_number, PaperPage.content).filter(_owner_filter(paper, registry_entry))
+    if page_numbers is not None:
+        query = query.filter(PaperPage.page_number.in_(list(page_numbers)))
+
+    return [
+        (number, zlib.decompress(content).decode("utf-8"))
+        for number, content in query.order_by(PaperPage.page_number)
+    ]
+
+
+def _text_owner(db: Session, paper: Paper) -> Optional[dict]:
+    """Which owner holds the paper's pages, as keyword arguments for load_pages."""
+    if db.query(PaperPage.id).filter(PaperPage.paper_id == paper.id).first():
+        return {"paper": paper}
+    if paper.registry_entry_id and db.query(PaperPage.id).filter(
+        PaperPage.registry_entry_id == paper.registry_entry_id
+    ).first():
+        return {"registry_entry": paper.registry_entry}
+    return None
+
+
+def get_paper_text(
+    paper: Paper,
+    db: Session,
+    page_numbers: Optional[Iterable[int]] = None,
+) -> Optional[str]:
+    """
+    Get the extracted text of a paper, or only some of its pages.
+
+    Looks at the paper's own pages, then its registry entry's pages, then
+    the legacy extracted_text columns. A paper with a file but no text yet
+    (e.g. a manual upload) is extracted and stored on first use.
+    """
+    owner = _text_owner(db, paper)
+
+    if owner is None:
+        legacy = paper.extracted_text or (paper.registry_entry.extracted_text if paper.registry_entry else None)
+        if legacy:
+            if page_numbers is None:
+                return legacy
+            wanted = set(page_numbers)
+            return join_pages(page for page in split_pages(legacy) if page[0] in wanted)
+
+        if not paper.file_path or not os.path.exists(paper.file_path):
+            return None
+
+        from app.services.pdf_processor import extract_text_from_pdf
+        store_text(db, extract_text_from_pdf(paper.file_path), paper=paper)
+        db.commit()
+        owner = {"paper": paper}
+
+    pages = load_pages(db, page_numbers=page_numbers, **owner)
+    return join_pages(pages) if pages else None
@@ -1,12 +1,24 @@
 """Quote Validation Agent - Uses Claude to validate quotes against source papers."""
 
 import anthropic
-from typing import Optional
+import random
+import re
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
 
 from app.config import get_settings
 
 settings = get_settings()
 
+MODEL = "claude-sonnet-4-20250514"
+
+# Grouped validation (several quotes against one source per request)
+GROUP_OUTPUT_TOKENS_PER_QUOTE = 400
+
 # Lazy initialization of Anthropic client
 _client = None
 
@@ -17,15 +29,171 @@ def get_client():
     if _client is None:
         if not settings.anthropic_api_key or settings.anthropic_api_key.startswith("test"):
             raise ValueError("Valid ANTHROPIC_API_KEY is required for quote validation")
-        _client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        # Retries are handled by _create_message so the rate controller sees every 429
+        _client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url,
+            max_retries=0,
+        )
     return _client
 
 
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits in-flight API requests and adapts the limit to the API's feedback.
+
+    The limit grows additively while requests succeed, is cut in half on
+    429/529 responses, and is capped by the remaining request budget
+    reported in the rate-limit response headers.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free and no backoff is active."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self._in_flight < int(self.limit):
+                    self._in_flight += 1
+                    return
+                self._cond.wait(timeout=pause if pause > 0 else None)
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, headers):
+        """Grow the limit and respect the remaining request budget."""
+        with self._cond:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            remaining = _header_int(headers, "anthropic-ratelimit-requests-remaining")
+            if remaining is not None and remaining < self.limit:
+                self.limit = float(max(self.min_limit, remaining))
+            self._cond.notify_all()
+
+    def on_overloaded(self, retry_after: float):
+        """Halve the limit and pause all requests for retry_after seconds."""
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> AdaptiveConcurrencyLimiter:
+    """Get or create the process-wide concurrency limiter."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveConcurrencyLimiter(settings.validation_max_concurrency)
+    return _limiter
+
+
+def _header_int(headers, name: str) -> Optional[int]:
+    value = headers.get(name) if headers is not None else None
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a validation error is transient (rate limits, overload, server and connection errors)."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in (408, 409, 429, 529) or error.status_code >= 500
+    return False
+
+
+def _create_message(**kwargs):
+    """
+    Call the Messages API through the adaptive limiter, retrying with backoff.
+
+    Retryable failures (rate limits, overload, server and connection errors)
+    are retried up to settings.validation_max_retries times, honouring the
+    retry-after header when present.
+    """
+    client = get_client()
+    limiter = get_limiter()
+
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            raw = client.messages.with_raw_response.create(**kwargs)
+            limiter.on_success(raw.headers)
+            return raw.parse()
+
+        except Exception as e:
+            if not is_retryable_error(e) or attempt >= settings.validation_max_retries:
+                raise
+
+            retry_after = None
+            if isinstance(e, anthropic.APIStatusError):
+                retry_after = _header_int(e.response.headers, "retry-after")
+            delay = retry_after if retry_after is not None else min(60, 2 ** attempt) + random.random()
+
+            if isinstance(e, anthropic.APIStatusError) and e.status_code in (429, 529):
+                # Pauses every worker, not just this one
+                limiter.on_overloaded(delay)
+                print(f"Validation: API returned {e.status_code}, limit now {int(limiter.limit)}")
+                delay = 0
+            attempt += 1
+
+        finally:
+            limiter.release()
+
+        if delay:
+            time.sleep(delay)
+
+
+def build_validation_request(
+    quote_text: str,
+    context_before: Optional[str],
+    context_after: Optional[str],
+    source_text: str,
+    retrieval_queries: Optional[list[str]] = None,
+) -> dict:
+    """Build the Messages API parameters for validating one quote."""
+    prompt = create_validation_prompt(
+        quote_text=quote_text,
+        context_before=context_before,
+        context_after=context_after,
+        source_text=source_text,
+        retrieval_queries=retrieval_queries,
+    )
+
+    return {
+        "model": MODEL,
+        "max_tokens": 2000,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "system": create_system_blocks(),
+    }
+
+
 def validate_quote(
     quote_text: str,
     context_before: Optional[str],
     context_after: Optional[str],
     source_text: str,
+    retrieval_queries: Optional[list[str]] = None,
 ) -> dict:
     """
     Validate a quote against the source paper using Claude.
@@ -35,32 +203,285 @@ def validate_quote(
         context_before: Text appearing before the quote
         context_after: Text appearing after the quote
         source_text: The full text of the source paper
+        retrieval_queries: Queries selecting the passages of a long source
+            (see share_retrieval_queries); defaults to this quote's own
 
     Returns:
         Dictionary with grade (1-100), explanation, source_text, and source_page
     """
-    prompt = create_validation_prompt(
+    response = _create_message(**build_validation_request(
         quote_text=quote_text,
         context_before=context_before,
         context_after=context_after,
         source_text=source_text,
-    )
+        retrieval_queries=retrieval_queries,
+    ))
 
-    client = get_client()
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2000,
+    # Parse the response
+    result = parse_validation_response(response.content[0].text)
+    result["usage"] = get_usage(response)
+    return result
+
+
+def validate_quote_group(
+    quotes: list[dict],
+    source_text: str,
+    retrieval_queries: Optional[list[str]] = None,
+) -> list[Optional[dict]]:
+    """
+    Validate several quotes citing the same source in one request.
+
+    The source text is sent once for the whole group instead of once per quote.
+
+    Args:
+        quotes: Dicts with quote_text, context_before and context_after
+        source_text: The full text of the source paper
+        retrieval_queries: Queries selecting the passages of a long source;
+            defaults to the group's quotes
+
+    Returns:
+        One result per quote (same order), or None for quotes the model
+        did not answer
+    """
+    prompt = create_group_validation_prompt(quotes=quotes, source_text=source_text, retrieval_queries=retrieval_queries)
+
+    response = _create_message(
+        model=MODEL,
+        max_tokens=min(16000, 500 + GROUP_OUTPUT_TOKENS_PER_QUOTE * len(quotes)),
         messages=[
             {
                 "role": "user",
                 "content": prompt
             }
         ],
-        system=SYSTEM_PROMPT,
+        system=create_system_blocks(),
     )
 
-    # Parse the response
-    return parse_validation_response(response.content[0].text)
+    results = parse_group_validation_response(response.content[0].text, len(quotes))
+
+    # Attribute the request's token usage evenly to its quotes
+    usage = get_usage(response)
+    for result in results:
+        if result is not None:
+            result["usage"] = {key: value // len(quotes) for key, value in usage.items()}
+    return results
+
+
+def get_usage(response) -> dict:
+    """Extract input and prompt cache token counts from an API response."""
+    usage = response.usage
+    return {
+        "input_tokens": getattr(usage, "input_tokens", None) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+
+
+def plan_quote_groups(
+    jobs: list[dict],
+    token_budget: Optional[int] = None,
+    max_size: Optional[int] = None,
+) -> list[list[int]]:
+    """
+    Group validate_quote jobs that share a source text.
+
+    Each group's estimated quote and output tokens stay within token_budget,
+    and it has at most max_size quotes, so long groups are split instead of
+    overflowing the response.
+
+    Returns:
+        Lists of job indexes, one list per request
+    """
+    token_budget = token_budget or settings.validation_group_token_budget
+    max_size = max_size or settings.validation_group_max_size
+
+    by_source = {}
+    for index, job in enumerate(jobs):
+        by_source.setdefault(_source_key(job), []).append(index)
+
+    groups = []
+    for indexes in by_source.values():
+        current, current_tokens = [], 0
+        for index in indexes:
+            job = jobs[index]
+            quote_chars = sum(len(job.get(k) or "") for k in ("quote_text", "context_before", "context_after"))
+            tokens = quote_chars // 4 + GROUP_OUTPUT_TOKENS_PER_QUOTE
+            if current and (current_tokens + tokens > token_budget or len(current) >= max_size):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+
+    return groups
+
+
+def _validate_group_job(jobs: list[dict], indexes: list[int]) -> list[tuple[int, Optional[dict], Optional[Exception]]]:
+    """Validate one planned group, retrying unanswered quotes individually."""
+    if len(indexes) == 1:
+        index = indexes[0]
+        try:
+            return [(index, validate_quote(**jobs[index]), None)]
+        except Exception as e:
+            return [(index, None, e)]
+
+    group = [jobs[i] for i in indexes]
+    try:
+        results = validate_quote_group(group, group[0]["source_text"], group[0].get("retrieval_queries"))
+    except Exception as e:
+        return [(index, None, e) for index in indexes]
+
+    outcomes = []
+    for index, result in zip(indexes, results):
+        if result is None or result["grade"] is None:
+            try:
+                result = validate_quote(**jobs[index])
+            except Exception as e:
+                outcomes.append((index, None, e))
+                continue
+        outcomes.append((index, result, None))
+    return outcomes
+
+
+def validate_quotes_concurrently(
+    jobs: list[dict],
+    max_concurrency: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[tuple[int, Optional[dict], Optional[Exception]]]:
+    """
+    Validate many quotes in parallel.
+
+    Quotes citing the same source are sent together (see plan_quote_groups)
+    unless settings.validation_grouping is disabled, and requests against
+    one source are ordered back-to-back to reuse its cached prompt prefix.
+
+    Args:
+        jobs: Keyword arguments for validate_quote, one dict per quote
+        max_concurrency: Number of worker threads (the adaptive limiter may
+            allow fewer requests in flight)
+        executor: Send the requests from this pool instead of a new one, so
+            concurrent callers share one cap on requests in flight
+
+    Yields:
+        (job index, result, error) tuples in completion order; exactly one
+        of result and error is set
+    """
+    if not jobs:
+        return
+
+    jobs = share_retrieval_queries(jobs)
+    if settings.validation_grouping:
+        groups = plan_quote_groups(jobs)
+    else:
+        groups = [[index] for index in range(len(jobs))]
+
+    # Requests against one source run after its first request has finished,
+    # so they hit the prompt cache that request wrote instead of all missing it
+    lanes = {}
+    for indexes in groups:
+        lanes.setdefault(_source_key(jobs[indexes[0]]), []).append(indexes)
+
+    max_concurrency = max_concurrency or settings.validation_max_concurrency
+    if executor is None:
+        pool = ThreadPoolExecutor(max_workers=min(max_concurrency, len(groups)))
+    else:
+        pool = nullcontext(executor)
+    with pool as executor:
+        pending = {}
+        for lane in lanes.values():
+            pending[executor.submit(_validate_group_job, jobs, lane[0])] = lane[1:]
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for indexes in pending.pop(future):
+                    pending[executor.submit(_validate_group_job, jobs, indexes)] = []
+                yield from future.result()
+
+
+def submit_validation_batch(jobs: dict[str, dict]) -> str:
+    """
+    Submit many quote validations as one Message Batch.
+
+    Batches are billed at a discount and do not count against the
+    interactive rate limits, at the cost of results arriving later.
+
+    Args:
+        jobs: Maps a custom ID (letters, digits, "-" and "_") to keyword
+            arguments for build_validation_request
+
+    Returns:
+        The batch ID
+    """
+    client = get_client()
+    shared_jobs = share_retrieval_queries(list(jobs.values()))
+    batch = client.messages.batches.create(
+        requests=[
+            {"custom_id": custom_id, "params": build_validation_request(**job)}
+            for custom_id, job in zip(jobs, shared_jobs)
+        ]
+    )
+    return batch.id
+
+
+def wait_for_batch(
+    batch_id: str,
+    poll_interval: Optional[float] = None,
+    on_poll: Optional[Callable[[], None]] = None,
+    timeout: Optional[float] = None,
+):
+    """
+    Poll a Message Batch until it has finished processing or timeout expires.
+
+    Batches can take up to 24 hours, so callers poll for a bounded time and
+    check again later rather than holding a worker.
+
+    Args:
+        on_poll: Called after every poll that finds the batch still running
+        timeout: Seconds to keep polling (polls once if 0, forever if None)
+
+    Returns:
+        The ended batch, or None if it was still running at the deadline
+    """
+    client = get_client()
+    poll_interval = poll_interval or settings.validation_batch_poll_seconds
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        if batch.processing_status == "ended":
+            return batch
+        if on_poll:
+            on_poll()
+        if deadline is not None and time.monotonic() + poll_interval > deadline:
+            return None
+        time.sleep(poll_interval)
+
+
+def get_batch_results(batch_id: str) -> dict[str, tuple[Optional[dict], Optional[str]]]:
+    """
+    Fetch and parse the results of a finished Message Batch.
+
+    Returns:
+        Dict mapping custom ID to (parsed result, error message); exactly one
+        of the two is set
+    """
+    client = get_client()
+    results = {}
+
+    for entry in client.messages.batches.results(batch_id):
+        if entry.result.type == "succeeded":
+            result = parse_validation_response(entry.result.message.content[0].text)
+            result["usage"] = get_usage(entry.result.message)
+            results[entry.custom_id] = (result, None)
+        elif entry.result.type == "errored":
+            results[entry.custom_id] = (None, f"Batch request failed: {entry.result.error}")
+        else:
+            # canceled or expired
+            results[entry.custom_id] = (None, f"Batch request {entry.result.type}")
+
+    return results
 
 
 SYSTEM_PROMPT = """You are an expert academic reviewer specializing in verifying the accuracy of citations and quotes in academic papers. Your task is to validate whether a quote accurately represents the source material.
@@ -80,37 +501,144 @@ Grade quotes on a scale of 1-100:
 Always respond in the exact format specified, with clear sections for the grade, explanation, and source text."""
 
 
-def create_validation_prompt(
-    quote_text: str,
-    context_before: Optional[str],
-    context_after: Optional[str],
-    source_text: str,
-) -> str:
-    """Create the validation prompt for Claude."""
-
-    # Truncate source text if too long (keep first and last parts)
+def _truncate_source(source_text: str) -> str:
+    """Truncate source text if too long (keep first and last parts)."""
     max_source_length = 50000
     if len(source_text) > max_source_length:
         half = max_source_length // 2
         source_text = source_text[:half] + "\n\n[... content truncated ...]\n\n" + source_text[-half:]
+    return source_text
+
+
+def _uses_retrieval(source_text: str) -> bool:
+    return settings.retrieval_enabled and len(source_text) > settings.retrieval_full_source_chars
+
+
+def _select_source(source_text: str, queries: list[str]) -> str:
+    """
+    Choose the part of the source to send for the given quote queries.
+
+    Short sources are sent whole. Longer ones are reduced to the passages
+    retrieved for the quotes, or head+tail truncated if retrieval is off.
+    """
+    if len(source_text) <= settings.retrieval_full_source_chars:
+        return source_text
+    if not settings.retrieval_enabled:
+        return _truncate_source(source_text)
+    return _retrieve(source_text, tuple(queries))
+
+
+@lru_cache(maxsize=64)
+def _retrieve(source_text: str, queries: tuple[str, ...]) -> str:
+    """Retrieved passages, computed once for the many requests and cache keys sharing the queries."""
+    from app.services.source_retriever import retrieve_passages
+    return retrieve_passages(source_text, list(queries))
+
+
+def job_source(job: dict) -> str:
+    """The source text a job's request sends: the whole source, its head and tail, or the retrieved passages."""
+    return _select_source(job["source_text"], job.get("retrieval_queries") or [_quote_query(job)])
+
+
+def _source_key(job: dict) -> tuple:
+    """Jobs with the same key send the same source block."""
+    return job["source_text"], tuple(job.get("retrieval_queries") or ())
+
+
+def _quote_query(quote: dict) -> str:
+    return " ".join(filter(None, [quote.get("context_before"), quote["quote_text"], quote.get("context_after")]))
+
+
+def retrieval_queries(source_text: str, quotes: list[dict]) -> Optional[list[str]]:
+    """
+    Queries selecting the passages of a source for the quotes citing it.
+
+    Returns:
+        One query per quote, or None if the source is sent without retrieval
+    """
+    if not _uses_retrieval(source_text):
+        return None
+    return [_quote_query(quote) for quote in quotes]
+
+
+def share_retrieval_queries(jobs: list[dict]) -> list[dict]:
+    """
+    Retrieve the passages of each long source once for all the jobs citing it.
+
+    Every job against a source that goes through retrieval gets the queries
+    of all those jobs, so their requests send the same source block and share
+    its cached prompt prefix. Retrieving per request would give each one
+    different passages, paying a cache write every time and never a read.
+    The trade-off is fewer passages per quote when many quotes cite one
+    source, as retrieval_max_passages caps the shared selection.
+
+    Jobs that already have retrieval_queries (see tasks._collect_validation_jobs)
+    keep them, since their cache keys were computed from them.
 
+    Returns:
+        Copies of the jobs, with retrieval_queries set where retrieval applies
+    """
+    unshared = {}
+    for job in jobs:
+        if "retrieval_queries" not in job:
+            unshared.setdefault(job["source_text"], []).append(job)
+    queries = {source_text: retrieval_queries(source_text, source_jobs) for source_text, source_jobs in unshared.items()}
+
+    return [
+        {**job, "retrieval_queries": queries[job["source_text"]]}
+        if "retrieval_queries" not in job and queries[job["source_text"]] else job
+        for job in jobs
+    ]
+
+
+def _format_quote(quote_text: str, context_before: Optional[str], context_after: Optional[str]) -> str:
     context_str = ""
     if context_before:
         context_str += f"Context before: ...{context_before}\n"
     context_str += f"QUOTE: \"{quote_text}\"\n"
     if context_after:
         context_str += f"Context after: {context_after}...\n"
+    return context_str
+
+
+def create_system_blocks() -> list[dict]:
+    """System prompt as a cacheable content block."""
+    return [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+def create_source_block(source_text: str, queries: list[str]) -> dict:
+    """
+    Source text (or the passages retrieved for the queries) as a cacheable
+    content block.
+
+    It comes first in the user message, so requests sending the same source
+    text share the cached system + source prefix. With retrieval that only
+    holds when they pass the same queries (see share_retrieval_queries).
+    """
+    return {
+        "type": "text",
+        "text": f"## Source Paper Text\n{_select_source(source_text, queries)}",
+        "cache_control": {"type": "ephemeral"},
+    }
 
-    return f"""Please validate the following quote from an academic paper against its source.
+
+def create_validation_prompt(
+    quote_text: str,
+    context_before: Optional[str],
+    context_after: Optional[str],
+    source_text: str,
+    retrieval_queries: Optional[list[str]] = None,
+) -> list[dict]:
+    """Create the validation prompt content blocks for Claude."""
+    context_str = _format_quote(quote_text, context_before, context_after)
+
+    instructions = f"""Please validate the following quote from an academic paper against the source paper text above.
 
 ## Quote to Validate
 {context_str}
 
-## Source Paper Text
-{source_text}
-
 ## Instructions
-1. Search the source paper for text matching or similar to the quote
+1. Search the source paper for text matching or similar to the quote (long sources are given as excerpts labelled with their page)
 2. Evaluate accuracy, context preservation, and proper representation
 3. Provide your assessment in the following exact format:
 
@@ -122,6 +650,47 @@ SOURCE_TEXT: [The exact text from the source paper that the quote references, or
 
 SOURCE_PAGE: [Page number if identifiable, or "UNKNOWN"]"""
 
+    if retrieval_queries is None:
+        retrieval_queries = [_quote_query({"quote_text": quote_text, "context_before": context_before, "context_after": context_after})]
+    return [create_source_block(source_text, retrieval_queries), {"type": "text", "text": instructions}]
+
+
+def create_group_validation_prompt(
+    quotes: list[dict],
+    source_text: str,
+    retrieval_queries: Optional[list[str]] = None,
+) -> list[dict]:
+    """Create the prompt content blocks validating several quotes against the same source."""
+    quote_sections = []
+    for number, quote in enumerate(quotes, start=1):
+        context_str = _format_quote(quote["quote_text"], quote.get("context_before"), quote.get("context_after"))
+        quote_sections.append(f"### Quote {number}\n{context_str}")
+    quotes_str = "\n".join(quote_sections)
+
+    instructions = f"""Please validate each of the following {len(quotes)} quotes from an academic paper against the source paper text above.
+
+## Quotes to Validate
+{quotes_str}
+
+## Instructions
+1. For each quote, search the source paper for text matching or similar to it (long sources are given as excerpts labelled with their page)
+2. Evaluate each quote independently for accuracy, context preservation, and proper representation
+3. Provide one assessment per quote, in order, in the following exact format:
+
+QUOTE_ID: [quote number]
+
+GRADE: [number 1-100]
+
+EXPLANATION: [2-4 sentences explaining your grade, noting any issues found]
+
+SOURCE_TEXT: [The exact text from the source paper that the quote references, or "NOT FOUND" if you cannot locate it]
+
+SOURCE_PAGE: [Page number if identifiable, or "UNKNOWN"]"""
+
+    if retrieval_queries is None:
+        retrieval_queries = [_quote_query(q) for q in quotes]
+    return [create_source_block(source_text, retrieval_queries), {"type": "text", "text": instructions}]
+
 
 def parse_validation_response(response_text: str) -> dict:
     """Parse Claude's response into structured data."""
@@ -198,3 +767,24 @@ def parse_validation_response(response_text: str) -> dict:
         result["source_text"] = None
 
     return result
+
+
+def parse_group_validation_response(response_text: str, quote_count: int) -> list[Optional[dict]]:
+    """
+    Parse a grouped validation response into one result per quote.
+
+    Each QUOTE_ID block is parsed with parse_validation_response. Quotes
+    missing from the response (or with unknown IDs) are returned as None.
+    """
+    results = [None] * quote_count
+
+    blocks = re.split(r'^\s*QUOTE_ID:\s*', response_text, flags=re.MULTILINE)
+    for block in blocks[1:]:
+        id_match = re.match(r'\[?(\d+)\]?', block)
+        if not id_match:
+            continue
+        number = int(id_match.group(1))
+        if 1 <= number <= quote_count and results[number - 1] is None:
+            results[number - 1] = parse_validation_response(block[id_match.end():])
+
+    return results
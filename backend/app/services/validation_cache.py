@@ -0,0 +1,167 @@
+"""Validation Cache Service - Reuses validation results across analyses."""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import ValidationCacheEntry
+from app.config import get_settings
+
+settings = get_settings()
+
+LOOKUP_CHUNK_SIZE = 500
+
+
+@lru_cache()
+def get_prompt_version() -> str:
+    """
+    Identifier of the current prompts and source selection.
+
+    Derived from SYSTEM_PROMPT, the rendered prompt templates, the grouping
+    and retrieval settings and the retriever's version and parameters, so
+    editing any of them changes the version and invalidates cached results
+    automatically.
+    """
+    from app.services import source_retriever
+    from app.services.validation_agent import SYSTEM_PROMPT, create_validation_prompt, create_group_validation_prompt
+
+    sample = {"quote_text": "{quote}", "context_before": "{before}", "context_after": "{after}"}
+    parts = [
+        SYSTEM_PROMPT,
+        json.dumps(create_validation_prompt(source_text="{source}", **sample)),
+        json.dumps(create_group_validation_prompt(quotes=[sample], source_text="{source}")),
+        json.dumps([
+            # Which quotes share a grouped prompt
+            settings.validation_grouping,
+            settings.validation_group_token_budget,
+            settings.validation_group_max_size,
+            settings.retrieval_enabled,
+            settings.retrieval_full_source_chars,
+            settings.retrieval_top_k,
+            settings.retrieval_max_passages,
+            source_retriever.RETRIEVER_VERSION,
+            source_retriever.BM25_K1,
+            source_retriever.BM25_B,
+            source_retriever.PASSAGE_WORDS,
+            source_retriever.PASSAGE_STRIDE,
+        ]),
+    ]
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()[:16]
+
+
+def compute_cache_key(job: dict) -> str:
+    """
+    Cache key for a validate_quote job.
+
+    Combines a hash of the quote and its context, a hash of the source
+    text sent for it (for long sources, the retrieved passages, which
+    depend on the job's retrieval_queries), the model name and the prompt
+    version.
+    """
+    from app.services.validation_agent import MODEL, job_source
+
+    quote_hash = hashlib.sha256("\x00".join([
+        job["quote_text"],
+        job.get("context_before") or "",
+        job.get("context_after") or "",
+    ]).encode()).hexdigest()
+    source_hash = hashlib.sha256(job_source(job).encode()).hexdigest()
+
+    key = f"{quote_hash}:{source_hash}:{MODEL}:{get_prompt_version()}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_results(jobs: list[dict], db: Session) -> list[Optional[dict]]:
+    """
+    Look up cached results for many jobs at once, refreshing their LRU timestamps.
+
+    Returns:
+        One cached result (or None) per job, in order
+    """
+    keys = [compute_cache_key(job) for job in jobs]
+
+    entries = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+        for entry in db.query(ValidationCacheEntry).filter(ValidationCacheEntry.cache_key.in_(chunk)):
+            entries[entry.cache_key] = entry
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.validation_cache_ttl_days)
+
+    results = []
+    for key in keys:
+        entry = entries.get(key)
+        created_at = entry.created_at if entry else None
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        if not entry or (created_at and created_at < cutoff):
+            results.append(None)
+            continue
+
+        entry.last_used_at = now
+        entry.hit_count = (entry.hit_count or 0) + 1
+        results.append(json.loads(entry.result))
+
+    return results
+
+
+def store_results(items: list[tuple[dict, dict]], db: Session):
+    """Cache the results of successful validations (without token usage; does not commit)."""
+    cached = {}
+    for job, result in items:
+        cached[compute_cache_key(job)] = json.dumps({k: v for k, v in result.items() if k != "usage"})
+    if not cached:
+        return
+
+    now = datetime.now(timezone.utc)
+    existing = db.query(ValidationCacheEntry).filter(ValidationCacheEntry.cache_key.in_(list(cached))).all()
+    for entry in existing:
+        entry.result = cached.pop(entry.cache_key)
+        entry.created_at = now
+
+    db.bulk_insert_mappings(ValidationCacheEntry, [
+        {"cache_key": key, "result": result, "hit_count": 0, "created_at": now, "last_used_at": now}
+        for key, result in cached.items()
+    ])
+
+
+def evict_entries(
+    db: Session,
+    max_entries: Optional[int] = None,
+    ttl_days: Optional[int] = None,
+) -> int:
+    """
+    Drop expired entries, then the least recently used ones beyond max_entries.
+
+    Returns:
+        Number of evicted entries
+    """
+    if max_entries is None:
+        max_entries = settings.validation_cache_max_entries
+    if ttl_days is None:
+        ttl_days = settings.validation_cache_ttl_days
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
+    evicted = db.query(ValidationCacheEntry).filter(
+        ValidationCacheEntry.created_at < cutoff
+    ).delete(synchronize_session=False)
+
+    excess = db.query(ValidationCacheEntry).count() - max_entries
+    if excess > 0:
+        stale_ids = [
+            row.id for row in db.query(ValidationCacheEntry.id).order_by(
+                ValidationCacheEntry.last_used_at.asc()
+            ).limit(excess)
+        ]
+        evicted += db.query(ValidationCacheEntry).filter(
+            ValidationCacheEntry.id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    return evicted
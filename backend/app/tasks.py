@@ -1,7 +1,43 @@
+import time
+import uuid
+
 from app.celery_app import celery_app
 from app.models.database import SessionLocal
-from app.models.models import Analysis, Paper, Quote, AnalysisStatus, QuoteStatus
-from typing import Optional
+from app.models.models import Analysis, Paper, Quote, AnalysisStatus, AnalysisCheckpoint, QuoteStatus
+from app.services import progress
+from typing import Callable, Optional
+
+# Stream status changes and quote grades to subscribers as they are committed
+progress.install(SessionLocal)
+
+
+class CommitBatcher:
+    """
+    Commits after every `size` changes or `interval` seconds, whichever comes first.
+
+    Keeps crash recovery close to per-row commits without an fsync per row.
+    """
+
+    def __init__(self, db, size: int, interval: float, before_commit: Optional[Callable[[], None]] = None):
+        self.db = db
+        self.size = size
+        self.interval = interval
+        self.before_commit = before_commit
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def add(self, count: int = 1):
+        self.pending += count
+        if self.pending >= self.size or time.monotonic() - self.last_commit >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            if self.before_commit:
+                self.before_commit()
+            self.db.commit()
+        self.pending = 0
+        self.last_commit = time.monotonic()
 
 
 def process_analysis(analysis_id: int, manual_mode: bool = False):
@@ -14,98 +50,667 @@ def process_analysis(analysis_id: int, manual_mode: bool = False):
     3. Parse reference list
     4. If not manual_mode: attempt to download reference papers
     5. Validate quotes against source papers
+
+    Completed stages are checkpointed on the analysis, so running it again
+    after a failure resumes after the last completed stage.
+
+    Only references cited by a quote are fetched. With
+    settings.analysis_pipelined, steps 4 and 5 overlap: each reference's
+    quotes are validated as soon as it is available (see _process_pipelined).
     """
+    from app.config import get_settings
+    from app.services.analysis_lock import acquire_lock, renew_lock, release_lock
+
     db = SessionLocal()
+    lock_token = acquire_lock(db, analysis_id)
+    if lock_token is None:
+        try:
+            return _lock_conflict(db, [analysis_id])
+        finally:
+            db.close()
+
     try:
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
         if not analysis:
             return {"error": "Analysis not found"}
 
-        # Update status to extracting
-        analysis.status = AnalysisStatus.EXTRACTING_QUOTES
-        analysis.status_message = "Extracting quotes and references from paper..."
-        db.commit()
+        manual_mode = manual_mode or analysis.manual_mode
+        settings = get_settings()
+        if settings.analysis_pipelined and not (analysis.batch_mode or settings.validation_batch_mode):
+            return _process_pipelined(db, analysis, manual_mode, lock_token)
+
+        if analysis.checkpoint is None:
+            stopped = _run_extraction_stage(db, analysis, manual_mode)
+            if stopped:
+                return stopped
+
+        if analysis.checkpoint == AnalysisCheckpoint.EXTRACTED:
+            # Step 4: Attempt to download reference papers
+            _start_fetch_stage(db, analysis, lock_token)
+
+            from app.services.paper_fetcher import fetch_references
+
+            # Fetch all references concurrently (each worker uses its own session)
+            fetch_references(_cited_unfetched_reference_ids(db, analysis_id))
+
+            renew_lock(db, analysis_id, lock_token)
+            stopped = _finish_fetch_stage(db, analysis)
+            if stopped:
+                return stopped
+
+        # Step 5: Validate quotes
+        return validate_quotes_task(analysis_id, lock_token=lock_token)
+
+    except Exception as e:
+        db.rollback()
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        if analysis:
+            analysis.status = AnalysisStatus.FAILED
+            analysis.status_message = str(e)
+            db.commit()
+        raise
+    finally:
+        release_lock(db, analysis_id, lock_token)
+        db.close()
+
+
+def _process_pipelined(db, analysis: Analysis, manual_mode: bool, lock_token: str) -> dict:
+    """
+    Steps 1-5 with overlapping fetch and validation stages.
+
+    Downloads of the cited references start as soon as the quotes are
+    extracted, and the quotes citing a reference are validated as soon as
+    its text is available, instead of waiting for the slowest download. Results are
+    committed as they arrive, with progress in the status message.
+    """
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+    from app.config import get_settings
+    from app.services.analysis_lock import renew_lock
+    from app.services.paper_fetcher import fetch_reference
+    from app.services.validation_agent import validate_quotes_concurrently, is_retryable_error
+
+    settings = get_settings()
+    analysis_id = analysis.id
+    pending = {}  # Future -> ("fetch", paper ID) or ("validate", jobs)
+    fetched = 0
+
+    # Each reference's quotes are validated from a thread of validation_pool,
+    # which sends their requests from the shared request_pool, so at most
+    # validation_max_concurrency requests are in flight across references
+    with ThreadPoolExecutor(max_workers=settings.reference_fetch_concurrency) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=settings.validation_max_concurrency) as validation_pool, \
+            ThreadPoolExecutor(max_workers=settings.validation_max_concurrency) as request_pool:
+
+        def start_fetching():
+            _start_fetch_stage(db, analysis, lock_token)
+            for paper_id in _cited_unfetched_reference_ids(db, analysis_id):
+                pending[fetch_pool.submit(fetch_reference, paper_id)] = ("fetch", paper_id)
+
+        def start_validation(reference_keys: list[str]):
+            quote_ids = [row.id for row in _outstanding_quotes(db, analysis_id).filter(
+                Quote.reference_key.in_(reference_keys)
+            ).with_entities(Quote.id)]
+            jobs = _collect_validation_jobs(db, analysis_id, quote_ids) if quote_ids else []
+            if jobs:
+                future = validation_pool.submit(
+                    lambda: list(validate_quotes_concurrently([job for _, job in jobs], executor=request_pool))
+                )
+                pending[future] = ("validate", jobs)
 
-        # Step 1: Extract text from PDF
-        from app.services.pdf_processor import extract_text_from_pdf
-        paper = analysis.uploaded_paper
-        if not paper or not paper.file_path:
-            raise ValueError("No uploaded paper found")
+        if analysis.checkpoint is None:
+            stopped = _run_extraction_stage(db, analysis, manual_mode)
+            if stopped:
+                return stopped
 
+        if analysis.checkpoint == AnalysisCheckpoint.FETCHED:
+            return validate_quotes_task(analysis_id, lock_token=lock_token)
+
+        start_fetching()
+        total_references = fetched + len(pending)
+
+        # Quotes of references available before this run can go straight away
+        available = db.query(Paper.reference_key).filter(
+            Paper.analysis_id == analysis_id,
+            Paper.reference_key.isnot(None),
+            Paper.file_path.isnot(None)
+        ).all()
+        total_references += len(available)
+        fetched += len(available)
+        start_validation([row.reference_key for row in available])
+
+        batcher = CommitBatcher(
+            db, settings.db_commit_batch_size, settings.db_commit_interval_seconds,
+            before_commit=lambda: renew_lock(db, analysis_id, lock_token),
+        )
+        fresh_results = []
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, payload = pending.pop(future)
+                if kind == "fetch":
+                    if future.result():
+                        fetched += 1
+                        reference_key = db.query(Paper.reference_key).filter(Paper.id == payload).scalar()
+                        start_validation([reference_key])
+                    continue
+
+                for index, result, error in future.result():
+                    quote, job = payload[index]
+                    if error is None:
+                        _apply_validation_result(quote, result, None)
+                        fresh_results.append((job, result))
+                    else:
+                        _apply_validation_result(quote, None, str(error), retryable=is_retryable_error(error))
+
+            validated = db.query(Quote).filter(
+                Quote.analysis_id == analysis_id,
+                Quote.status == QuoteStatus.VALIDATED
+            ).count()
+            analysis.status = AnalysisStatus.VALIDATING
+            analysis.status_message = (
+                f"Downloaded {fetched}/{total_references} reference papers, validated {validated} quotes..."
+            )
+            batcher.add(len(done))
+        batcher.flush()
+
+    _cache_validation_results(db, fresh_results)
+
+    stopped = _finish_fetch_stage(db, analysis)
+    if stopped:
+        return stopped
+
+    # Quotes whose citation matched no reference
+    leftover_ids = [row.id for row in _outstanding_quotes(db, analysis_id).filter(
+        Quote.status == QuoteStatus.PENDING
+    ).with_entities(Quote.id)]
+    if leftover_ids:
+        _validate_jobs(db, analysis_id, lock_token, _collect_validation_jobs(db, analysis_id, leftover_ids))
+
+    _complete_analysis(db, analysis)
+    return {"status": "completed"}
+
+
+def _run_extraction_stage(db, analysis: Analysis, manual_mode: bool) -> Optional[dict]:
+    """
+    Steps 1-3: extract the text, quotes and references of the uploaded paper.
+
+    Returns:
+        The task result if the pipeline stops here (manual mode), else None
+    """
+    from app.config import get_settings
+    from app.services.pdf_processor import extract_text_from_pdf, get_page_count
+    from app.services.quote_extractor import extract_quotes
+    from app.services.reference_parser import parse_references
+    from app.services.text_store import store_text
+
+    # Update status to extracting
+    analysis.status = AnalysisStatus.EXTRACTING_QUOTES
+    analysis.status_message = "Extracting quotes and references from paper..."
+    db.commit()
+
+    # Step 1: Extract text from PDF
+    paper = analysis.uploaded_paper
+    if not paper or not paper.file_path:
+        raise ValueError("No uploaded paper found")
+
+    if get_page_count(paper.file_path) >= get_settings().extraction_streaming_min_pages:
+        # Steps 1-3 page by page; the quotes are already stored
+        references = _extract_streaming(db, analysis.id, paper)
+        quotes_data = []
+    else:
         text = extract_text_from_pdf(paper.file_path)
-        paper.extracted_text = text
+        store_text(db, text, paper=paper)
         db.commit()
 
         # Step 2: Extract quotes and citations
-        from app.services.quote_extractor import extract_quotes
         quotes_data = extract_quotes(text)
 
         # Step 3: Parse reference list
-        from app.services.reference_parser import parse_references
         references = parse_references(text)
 
-        # Create paper records for references
-        for ref in references:
-            ref_paper = Paper(
-                title=ref.get("title"),
-                authors=ref.get("authors"),
-                year=ref.get("year"),
-                doi=ref.get("doi"),
-                arxiv_id=ref.get("arxiv_id"),
-                reference_key=ref.get("key"),
-                reference_text=ref.get("raw_text"),
-                analysis_id=analysis_id,
-            )
-            db.add(ref_paper)
+    # Records and checkpoint are committed together; manual mode skips fetching
+    analysis.checkpoint = AnalysisCheckpoint.FETCHED if manual_mode else AnalysisCheckpoint.EXTRACTED
+    _create_records(db, analysis.id, references, quotes_data)
+
+    if manual_mode:
+        # Skip auto-download, wait for user to upload all papers
+        analysis.status = AnalysisStatus.AWAITING_UPLOADS
+        analysis.status_message = "Please upload the reference papers"
         db.commit()
+        return {"status": "awaiting_uploads"}
+    return None
 
-        # Create quote records
-        for quote_data in quotes_data:
-            quote = Quote(
-                text=quote_data["text"],
-                page_number=quote_data.get("page"),
-                context_before=quote_data.get("context_before"),
-                context_after=quote_data.get("context_after"),
-                reference_key=quote_data.get("reference_key"),
-                analysis_id=analysis_id,
-            )
-            db.add(quote)
+
+def _extract_streaming(db, analysis_id: int, paper: Paper) -> list[dict]:
+    """
+    Extract text, quotes and references of a large paper with bounded memory.
+
+    Pages are read from the PDF one at a time; pages and their quotes are
+    written every extraction_batch_pages pages. Only the references section
+    is buffered, and parsed at the end.
+
+    Returns:
+        The parsed references
+    """
+    from app.config import get_settings
+    from app.services.pdf_processor import iter_pages
+    from app.services.quote_extractor import iter_page_quotes
+    from app.services.reference_parser import ReferenceSectionBuffer, parse_reference_section
+    from app.services.text_store import append_pages, delete_text
+
+    batch_pages = get_settings().extraction_batch_pages
+
+    # Nothing is validated before the extraction checkpoint, so an interrupted run starts over
+    delete_text(db, paper=paper)
+    db.query(Quote).filter(Quote.analysis_id == analysis_id).delete(synchronize_session=False)
+
+    references = ReferenceSectionBuffer()
+    pages, quotes_data = [], []
+
+    def flush():
+        append_pages(db, pages, paper=paper)
+        db.bulk_insert_mappings(Quote, _quote_rows(analysis_id, quotes_data))
         db.commit()
+        pages.clear()
+        quotes_data.clear()
 
-        if manual_mode:
-            # Skip auto-download, wait for user to upload all papers
-            analysis.status = AnalysisStatus.AWAITING_UPLOADS
-            analysis.status_message = "Please upload the reference papers"
-            db.commit()
-            return {"status": "awaiting_uploads"}
+    for number, text in iter_pages(paper.file_path):
+        pages.append((number, text))
+        quotes_data.extend(iter_page_quotes(number, text))
+        references.add_page(number, text)
+        if len(pages) >= batch_pages:
+            flush()
+    flush()
+
+    return parse_reference_section(references.section())
+
+
+def _start_fetch_stage(db, analysis: Analysis, lock_token: str):
+    from app.services.analysis_lock import renew_lock
+
+    analysis.status = AnalysisStatus.FETCHING_REFERENCES
+    analysis.status_message = "Downloading reference papers..."
+    renew_lock(db, analysis.id, lock_token)
+    db.commit()
+
+
+def missing_reference_papers(db, analysis_id: int):
+    """
+    Query for the reference papers that block a quote.
 
-        # Step 4: Attempt to download reference papers
-        analysis.status = AnalysisStatus.FETCHING_REFERENCES
-        analysis.status_message = "Downloading reference papers..."
+    These are cited by a quote still to be validated but have no file.
+    Uncited references are kept as metadata only and never block.
+    """
+    cited_keys = _outstanding_quotes(db, analysis_id).filter(
+        Quote.reference_key.isnot(None)
+    ).with_entities(Quote.reference_key).distinct()
+
+    return db.query(Paper).filter(
+        Paper.analysis_id == analysis_id,
+        Paper.reference_key.in_(cited_keys.scalar_subquery()),
+        Paper.file_path.is_(None)
+    )
+
+
+def _cited_unfetched_reference_ids(db, analysis_id: int) -> list[int]:
+    """Reference papers to download (those fetched before an interruption are skipped)."""
+    return [row.id for row in missing_reference_papers(db, analysis_id).with_entities(Paper.id).order_by(Paper.id)]
+
+
+def _finish_fetch_stage(db, analysis: Analysis) -> Optional[dict]:
+    """
+    Checkpoint the fetch stage and ask for uploads of references still missing.
+
+    Returns:
+        The task result if the pipeline stops here (missing papers), else None
+    """
+    missing_papers = [
+        row.reference_key
+        for row in missing_reference_papers(db, analysis.id).with_entities(Paper.reference_key).order_by(Paper.id)
+    ]
+
+    analysis.checkpoint = AnalysisCheckpoint.FETCHED
+    if missing_papers:
+        analysis.status = AnalysisStatus.AWAITING_UPLOADS
+        analysis.status_message = f"Could not download {len(missing_papers)} reference papers. Please upload them manually."
         db.commit()
+        return {"status": "awaiting_uploads", "missing": missing_papers}
+    db.commit()
+    return None
 
-        from app.services.paper_fetcher import fetch_paper
-        ref_papers = db.query(Paper).filter(
-            Paper.analysis_id == analysis_id,
-            Paper.reference_key.isnot(None)
-        ).all()
 
-        missing_papers = []
-        for ref_paper in ref_papers:
-            success = fetch_paper(ref_paper, db)
-            if not success:
-                missing_papers.append(ref_paper.reference_key)
+def _lock_conflict(db, analysis_ids: list[int]) -> dict:
+    """Task result for analyses whose processing lease could not be taken."""
+    existing = [row.id for row in db.query(Analysis.id).filter(Analysis.id.in_(analysis_ids))]
+    if not existing:
+        return {"error": "Analysis not found"}
+    print(f"Analyses {existing} are already being processed")
+    return {"status": "already_running"}
 
-        if missing_papers:
-            analysis.status = AnalysisStatus.AWAITING_UPLOADS
-            analysis.status_message = f"Could not download {len(missing_papers)} reference papers. Please upload them manually."
-            db.commit()
-            return {"status": "awaiting_uploads", "missing": missing_papers}
 
-        # Step 5: Validate quotes
-        return validate_quotes_task(analysis_id)
+def _create_records(db, analysis_id: int, references: list[dict], quotes_data: list[dict]):
+    """Bulk insert the reference papers and quotes of an analysis in one commit."""
+    _create_reference_records(db, analysis_id, references)
+
+    db.bulk_insert_mappings(Quote, _quote_rows(analysis_id, quotes_data))
+    db.commit()
+
+
+def _quote_rows(analysis_id: int, quotes_data: list[dict]) -> list[dict]:
+    return [
+        {
+            "text": quote_data["text"],
+            "page_number": quote_data.get("page"),
+            "context_before": quote_data.get("context_before"),
+            "context_after": quote_data.get("context_after"),
+            "reference_key": quote_data.get("reference_key"),
+            "status": QuoteStatus.PENDING,
+            "validated_locally": False,
+            "analysis_id": analysis_id,
+        }
+        for quote_data in quotes_data
+    ]
+
+
+def _create_reference_records(db, analysis_id: int, references: list[dict]):
+    """Bulk insert the reference papers of an analysis, unless an interrupted run already did (does not commit)."""
+    from sqlalchemy import or_
+
+    existing = db.query(Paper.id).join(Analysis, Analysis.id == Paper.analysis_id).filter(
+        Paper.analysis_id == analysis_id,
+        or_(Analysis.uploaded_paper_id.is_(None), Paper.id != Analysis.uploaded_paper_id)
+    ).first()
+    if existing:
+        return
+
+    db.bulk_insert_mappings(Paper, [
+        {
+            "title": ref.get("title"),
+            "authors": ref.get("authors"),
+            "year": ref.get("year"),
+            "doi": ref.get("doi"),
+            "arxiv_id": ref.get("arxiv_id"),
+            "reference_key": ref.get("key"),
+            "reference_text": ref.get("raw_text"),
+            "analysis_id": analysis_id,
+        }
+        for ref in references
+    ])
+
+
+def _outstanding_quotes(db, analysis_id: int):
+    """Query for the quotes of an analysis still to be validated."""
+    from sqlalchemy import and_, or_
+
+    return db.query(Quote).filter(
+        Quote.analysis_id == analysis_id,
+        or_(
+            Quote.status == QuoteStatus.PENDING,
+            and_(Quote.status == QuoteStatus.FAILED, Quote.retryable.is_(True)),
+        )
+    )
+
+
+def _collect_validation_jobs(
+    db,
+    analysis_id: int,
+    quote_ids: Optional[list[int]] = None,
+) -> list[tuple[Quote, dict]]:
+    """
+    Pair each quote still to be validated with its validate_quote arguments.
+
+    Only PENDING quotes and retryable FAILED ones are considered, so a
+    resumed run never repeats finished work. Quotes that used up
+    settings.validation_max_attempts are marked as finally FAILED.
+    Cited references that were never downloaded (e.g. uncited when the
+    analysis was fetched) are fetched on demand.
+    Quotes whose reference paper is unavailable are marked FAILED and skipped.
+    Quotes found verbatim in their source are graded locally and skipped;
+    quotes found approximately are sent with only the located passage.
+    Quotes with a cached result for the same prompt are filled in and skipped.
+
+    Args:
+        quote_ids: Only consider these quotes (all outstanding quotes if None)
+    """
+    from app.config import get_settings
+    from app.services.paper_fetcher import fetch_reference
+    from app.services.text_store import get_paper_text
+    from app.services.quote_matcher import match_quote, located_passage
+    from app.services.validation_cache import get_cached_results
+
+    settings = get_settings()
+    query = _outstanding_quotes(db, analysis_id)
+    if quote_ids is not None:
+        query = query.filter(Quote.id.in_(quote_ids))
+    quotes = query.order_by(Quote.id).all()
+
+    # reference_key -> Paper, loaded once (first paper wins, as with .first())
+    papers_by_key = {}
+    for ref_paper in db.query(Paper).filter(
+        Paper.analysis_id == analysis_id,
+        Paper.reference_key.isnot(None)
+    ).order_by(Paper.id):
+        papers_by_key.setdefault(ref_paper.reference_key, ref_paper)
+
+    manual_mode = db.query(Analysis.manual_mode).filter(Analysis.id == analysis_id).scalar()
+
+    jobs = []
+    source_texts = {}  # Paper ID -> text, so each reference is loaded once
+    located = skipped = 0
+    for quote in quotes:
+        if quote.validation_attempts >= settings.validation_max_attempts:
+            quote.status = QuoteStatus.FAILED
+            quote.retryable = False
+            if not quote.explanation:
+                quote.explanation = f"Validation error: gave up after {quote.validation_attempts} attempts"
+            continue
+
+        ref_paper = papers_by_key.get(quote.reference_key)
+
+        if ref_paper and not ref_paper.file_path and not ref_paper.fetch_attempted and not manual_mode:
+            fetch_reference(ref_paper.id)
+            db.refresh(ref_paper)
+
+        # The whole text is loaded on purpose: the local matcher and passage
+        # retrieval search every page, and the pages a quote needs are only
+        # known after that search
+        source_text = None
+        if ref_paper:
+            if ref_paper.id not in source_texts:
+                source_texts[ref_paper.id] = get_paper_text(ref_paper, db)
+            source_text = source_texts[ref_paper.id]
+        if not source_text:
+            quote.status = QuoteStatus.FAILED
+            quote.explanation = "Could not find or read the reference paper"
+            quote.retryable = True  # The paper may still be uploaded
+            continue
+
+        # Local pre-pass: locate the quote in the source without the LLM
+        match = match_quote(quote.text, source_text, settings.match_min_score) if settings.match_enabled else None
+        if match:
+            located += 1
+            quote.match_score = match["score"]
+            quote.source_text = match["source_text"]
+            quote.source_page = match["source_page"]
+
+            # Short phrases occur word-for-word in almost any source, which proves nothing
+            if match["exact"] and settings.match_auto_grade and match["words"] >= settings.match_auto_grade_min_words:
+                quote.grade = settings.match_auto_grade_value
+                quote.explanation = "The quote appears word-for-word in the source (matched locally without model review)."
+                quote.status = QuoteStatus.VALIDATED
+                quote.retryable = False
+                quote.validated_locally = True
+                skipped += 1
+                continue
+
+            source_text = located_passage(source_text, match, settings.match_context_chars)
+
+        jobs.append((quote, {
+            "quote_text": quote.text,
+            "context_before": quote.context_before,
+            "context_after": quote.context_after,
+            "source_text": source_text,
+        }))
 
+    _share_reference_queries(db, analysis_id, jobs)
+
+    # Fill in cached results in one lookup
+    if settings.validation_cache_enabled and jobs:
+        cached_results = get_cached_results([job for _, job in jobs], db)
+        for (quote, _), cached in zip(jobs, cached_results):
+            if cached:
+                _apply_validation_result(quote, cached, None)
+        jobs = [item for item, cached in zip(jobs, cached_results) if not cached]
+
+    # Count attempts up front, so a quote that keeps killing its worker is eventually given up
+    for quote, _ in jobs:
+        quote.validation_attempts += 1
+    db.commit()
+
+    if quotes:
+        print(f"Matcher: located {located}/{len(quotes)} quotes locally, skipped {skipped} LLM calls")
+    return jobs
+
+
+def _share_reference_queries(db, analysis_id: int, jobs: list[tuple[Quote, dict]]):
+    """
+    Give the jobs against a long reference the retrieval queries of every quote citing it.
+
+    The passages sent for a quote (and so its cache key) then do not depend
+    on which quotes a run happens to validate: resumed runs, chunk tasks and
+    batch polls select the same ones.
+    """
+    from app.services.validation_agent import retrieval_queries
+
+    reference_keys = {quote.reference_key for quote, _ in jobs}
+    citing = {}
+    for row in db.query(Quote.reference_key, Quote.text, Quote.context_before, Quote.context_after).filter(
+        Quote.analysis_id == analysis_id,
+        Quote.reference_key.in_(reference_keys),
+    ).order_by(Quote.id):
+        citing.setdefault(row.reference_key, []).append(
+            {"quote_text": row.text, "context_before": row.context_before, "context_after": row.context_after}
+        )
+
+    queries = {}  # (reference_key, source_text) -> queries
+    for quote, job in jobs:
+        key = (quote.reference_key, job["source_text"])
+        if key not in queries:
+            queries[key] = retrieval_queries(job["source_text"], citing[quote.reference_key])
+        if queries[key]:
+            job["retrieval_queries"] = queries[key]
+
+
+def _apply_validation_result(quote: Quote, result: Optional[dict], error: Optional[str], retryable: bool = False):
+    """Store a validation result (or error) on a quote."""
+    if error is not None:
+        quote.status = QuoteStatus.FAILED
+        quote.explanation = f"Validation error: {error}"
+        quote.retryable = retryable
+        return
+
+    quote.grade = result["grade"]
+    quote.explanation = result["explanation"]
+    quote.source_text = result.get("source_text") or quote.source_text
+    quote.source_page = result.get("source_page") or quote.source_page
+    quote.status = QuoteStatus.VALIDATED
+    quote.retryable = False
+
+    usage = result.get("usage")
+    if usage:
+        quote.input_tokens = usage["input_tokens"]
+        quote.cache_read_tokens = usage["cache_read_tokens"]
+        quote.cache_creation_tokens = usage["cache_creation_tokens"]
+
+
+def _cache_validation_results(db, items: list[tuple[dict, dict]]):
+    """Store fresh (job, result) pairs in the validation cache (best effort)."""
+    from app.config import get_settings
+    from app.services.validation_cache import store_results
+
+    items = [(job, result) for job, result in items if result.get("grade") is not None]
+    if not get_settings().validation_cache_enabled or not items:
+        return
+    try:
+        store_results(items, db)
+        db.commit()
     except Exception as e:
+        # Another worker may have cached the same result concurrently
+        db.rollback()
+        print(f"Validation cache: Failed to store results: {e}")
+
+
+def _validate_jobs(db, analysis_id: int, lock_token: str, jobs: list[tuple[Quote, dict]]):
+    """Validate collected jobs concurrently, committing results in batches."""
+    from app.config import get_settings
+    from app.services.analysis_lock import renew_lock
+    from app.services.validation_agent import validate_quotes_concurrently, is_retryable_error
+
+    settings = get_settings()
+    batcher = CommitBatcher(
+        db, settings.db_commit_batch_size, settings.db_commit_interval_seconds,
+        before_commit=lambda: renew_lock(db, analysis_id, lock_token),
+    )
+
+    # Results are written from this thread only
+    fresh_results = []
+    for index, result, error in validate_quotes_concurrently([job for _, job in jobs]):
+        quote, job = jobs[index]
+        if error is None:
+            _apply_validation_result(quote, result, None)
+            fresh_results.append((job, result))
+        else:
+            _apply_validation_result(quote, None, str(error), retryable=is_retryable_error(error))
+        batcher.add()
+    batcher.flush()
+
+    _cache_validation_results(db, fresh_results)
+
+
+def _complete_analysis(db, analysis: Analysis):
+    analysis.status = AnalysisStatus.COMPLETED
+    analysis.status_message = "Analysis complete"
+    db.commit()
+
+
+def validate_quotes_task(analysis_id: int, lock_token: Optional[str] = None):
+    """
+    Validate the outstanding quotes of an analysis.
+
+    Takes the analysis' processing lease, or shares the caller's if
+    lock_token is given. Results are committed in small batches, so a run
+    that is interrupted loses at most the last batch.
+    """
+    from app.config import get_settings
+    from app.services.analysis_lock import acquire_lock, release_lock
+
+    db = SessionLocal()
+    token = acquire_lock(db, analysis_id, lock_token)
+    if token is None:
+        try:
+            return _lock_conflict(db, [analysis_id])
+        finally:
+            db.close()
+
+    try:
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        if not analysis:
+            return {"error": "Analysis not found"}
+
+        if analysis.batch_mode or get_settings().validation_batch_mode:
+            return validate_quotes_batch_task([analysis_id], lock_token=token)
+
+        analysis.status = AnalysisStatus.VALIDATING
+        analysis.status_message = "Validating quotes against source papers..."
+        db.commit()
+
+        _validate_jobs(db, analysis_id, token, _collect_validation_jobs(db, analysis_id))
+        _complete_analysis(db, analysis)
+
+        return {"status": "completed"}
+
+    except Exception as e:
+        db.rollback()
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
         if analysis:
             analysis.status = AnalysisStatus.FAILED
@@ -113,76 +718,167 @@ def process_analysis(analysis_id: int, manual_mode: bool = False):
             db.commit()
         raise
     finally:
+        if lock_token is None:
+            release_lock(db, analysis_id, token)
         db.close()
 
 
-def validate_quotes_task(analysis_id: int):
-    """Validate all quotes in an analysis."""
+def validate_quotes_batch_task(analysis_ids: list[int], lock_token: Optional[str] = None):
+    """
+    Validate the quotes of one or more analyses through a single Message Batch.
+
+    The batch ID is stored on each analysis, so a restarted task resumes
+    polling the submitted batch instead of submitting it again. Analyses
+    being processed by another worker are skipped.
+
+    A batch still running after settings.validation_batch_wait_seconds is
+    left to a later poll of the same analyses (see _schedule_batch_poll), as
+    batches can take far longer than a task may run.
+    """
+    from app.config import get_settings
+    from app.services.analysis_lock import acquire_lock, renew_lock, release_lock
+    from app.services.validation_agent import submit_validation_batch, wait_for_batch, get_batch_results
+
     db = SessionLocal()
-    try:
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-        if not analysis:
-            return {"error": "Analysis not found"}
 
-        analysis.status = AnalysisStatus.VALIDATING
-        analysis.status_message = "Validating quotes against source papers..."
+    # One lease token covers every analysis of the batch
+    token = lock_token or str(uuid.uuid4())
+    locked_ids = [
+        analysis_id for analysis_id in analysis_ids
+        if acquire_lock(db, analysis_id, lock_token, new_token=token)
+    ]
+
+    def renew_leases():
+        for analysis_id in locked_ids:
+            renew_lock(db, analysis_id, token)
         db.commit()
 
-        from app.services.validation_agent import validate_quote
+    try:
+        if len(locked_ids) < len(analysis_ids):
+            conflict = _lock_conflict(db, [i for i in analysis_ids if i not in locked_ids])
+            if not locked_ids:
+                return conflict
 
-        quotes = db.query(Quote).filter(Quote.analysis_id == analysis_id).all()
+        analyses = db.query(Analysis).filter(Analysis.id.in_(locked_ids)).all()
 
-        for quote in quotes:
-            try:
-                # Find the reference paper
-                ref_paper = db.query(Paper).filter(
-                    Paper.analysis_id == analysis_id,
-                    Paper.reference_key == quote.reference_key
-                ).first()
+        for analysis in analyses:
+            analysis.status = AnalysisStatus.VALIDATING
+            analysis.status_message = "Queued for batch validation..."
+        db.commit()
 
-                if not ref_paper or not ref_paper.extracted_text:
-                    quote.status = QuoteStatus.FAILED
-                    quote.explanation = "Could not find or read the reference paper"
-                    db.commit()
-                    continue
+        # Submit one batch for every analysis that does not have one yet
+        new_analyses = [a for a in analyses if not a.validation_batch_id]
+        jobs = {}
+        for analysis in new_analyses:
+            # Keep quotes of one reference adjacent so they share its cached prefix
+            analysis_jobs = sorted(_collect_validation_jobs(db, analysis.id), key=lambda item: item[0].reference_key or "")
+            for quote, job in analysis_jobs:
+                jobs[f"quote-{quote.id}"] = job
 
-                # Validate the quote
-                result = validate_quote(
-                    quote_text=quote.text,
-                    context_before=quote.context_before,
-                    context_after=quote.context_after,
-                    source_text=ref_paper.extracted_text,
-                )
+        if jobs:
+            batch_id = submit_validation_batch(jobs)
+            for analysis in new_analyses:
+                analysis.validation_batch_id = batch_id
+            db.commit()
+            print(f"Batch: Submitted {len(jobs)} quotes as {batch_id}")
 
-                quote.grade = result["grade"]
-                quote.explanation = result["explanation"]
-                quote.source_text = result.get("source_text")
-                quote.source_page = result.get("source_page")
-                quote.status = QuoteStatus.VALIDATED
+        # Rebuild the jobs of batches submitted by an earlier task, so their results are cached too
+        for analysis in analyses:
+            if analysis not in new_analyses:
+                for quote, job in _collect_validation_jobs(db, analysis.id):
+                    jobs.setdefault(f"quote-{quote.id}", job)
 
-            except Exception as e:
-                quote.status = QuoteStatus.FAILED
-                quote.explanation = f"Validation error: {str(e)}"
+        deadline = time.monotonic() + get_settings().validation_batch_wait_seconds
+        running_batch_ids = set()
+        batch_ids = {a.validation_batch_id for a in analyses if a.validation_batch_id}
+        for batch_id in batch_ids:
+            timeout = max(0.0, deadline - time.monotonic())
+            if wait_for_batch(batch_id, on_poll=renew_leases, timeout=timeout) is None:
+                running_batch_ids.add(batch_id)
+                continue
+            results = get_batch_results(batch_id)
 
+            quote_ids = [int(custom_id.split("-", 1)[1]) for custom_id in results]
+            quotes = db.query(Quote).filter(Quote.id.in_(quote_ids)).all() if quote_ids else []
+            for quote in quotes:
+                custom_id = f"quote-{quote.id}"
+                result, error = results[custom_id]
+                # Errored and expired requests can simply be submitted again
+                _apply_validation_result(quote, result, error, retryable=True)
             db.commit()
 
-        analysis.status = AnalysisStatus.COMPLETED
-        analysis.status_message = "Analysis complete"
+            _cache_validation_results(db, [
+                (jobs[custom_id], result)
+                for custom_id, (result, error) in results.items()
+                if error is None and custom_id in jobs
+            ])
+
+        waiting = [a for a in analyses if a.validation_batch_id in running_batch_ids]
+        finished = [a for a in analyses if a.validation_batch_id not in running_batch_ids]
+
+        # Anything still pending was missing from the batch results
+        if finished:
+            missing = db.query(Quote).filter(
+                Quote.analysis_id.in_([a.id for a in finished]),
+                Quote.status == QuoteStatus.PENDING,
+            )
+            missing_ids = [row.id for row in missing.with_entities(Quote.id)]
+            missing.update({
+                Quote.status: QuoteStatus.FAILED,
+                Quote.explanation: "Validation error: missing from batch results",
+                Quote.retryable: True,
+            }, synchronize_session=False)
+            # A bulk update bypasses the flush hooks that publish quote events
+            if missing_ids:
+                progress.queue_events(db, [
+                    (quote.analysis_id, progress.quote_event(quote))
+                    for quote in db.query(Quote).filter(Quote.id.in_(missing_ids)).populate_existing()
+                ])
+
+        for analysis in finished:
+            analysis.validation_batch_id = None
+            analysis.status = AnalysisStatus.COMPLETED
+            analysis.status_message = "Analysis complete"
+        for analysis in waiting:
+            analysis.status_message = "Waiting for batch results..."
         db.commit()
 
+        if waiting:
+            _schedule_batch_poll([a.id for a in waiting])
+            return {"status": "waiting", "batch_ids": sorted(running_batch_ids)}
         return {"status": "completed"}
 
     except Exception as e:
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-        if analysis:
+        db.rollback()
+        for analysis in db.query(Analysis).filter(Analysis.id.in_(locked_ids)).all():
             analysis.status = AnalysisStatus.FAILED
             analysis.status_message = str(e)
-            db.commit()
+        db.commit()
         raise
     finally:
+        if lock_token is None:
+            for analysis_id in locked_ids:
+                release_lock(db, analysis_id, token)
         db.close()
 
 
+def _schedule_batch_poll(analysis_ids: list[int]):
+    """
+    Check the batches of these analyses again after settings.validation_batch_poll_seconds.
+
+    The batch IDs stay stored on the analyses, so the later run only polls.
+    Without Celery the poll runs on a timer thread of the API process.
+    """
+    import threading
+    from app.config import get_settings
+
+    settings = get_settings()
+    if settings.use_celery:
+        validate_quotes_batch_celery_task.apply_async((analysis_ids,), countdown=settings.validation_batch_poll_seconds)
+    else:
+        threading.Timer(settings.validation_batch_poll_seconds, validate_quotes_batch_task, (analysis_ids,)).start()
+
+
 # Celery task wrappers (for use with Redis/Celery in production)
 @celery_app.task(bind=True)
 def process_analysis_task(self, analysis_id: int, manual_mode: bool = False):
@@ -194,3 +890,317 @@ def process_analysis_task(self, analysis_id: int, manual_mode: bool = False):
 def continue_analysis_celery_task(self, analysis_id: int):
     """Celery task wrapper for validate_quotes_task."""
     return validate_quotes_task(analysis_id)
+
+
+@celery_app.task(bind=True)
+def validate_quotes_batch_celery_task(self, analysis_ids: list[int]):
+    """Celery task wrapper for validate_quotes_batch_task."""
+    return validate_quotes_batch_task(analysis_ids)
+
+
+# Distributed pipeline: the stages of one analysis fan out across Celery workers
+#
+#   analysis_pipeline_task (extraction)
+#     -> chord(reference_fetch_task per reference) -> references_fetched_task
+#     -> chord(validate_quote_chunk_task per reference batch) -> finalize_analysis_task
+#
+# In pipelined mode each fetch is chained to a validate_reference_task, so
+# a reference's quotes are validated as soon as it arrives.
+#
+# The processing lease taken by the first task is passed along and released
+# by finalize_analysis_task (or analysis_failed_task if a stage fails).
+
+def queue_analysis(analysis_id: int, manual_mode: bool = False):
+    """Queue an analysis on the Celery workers."""
+    analysis_pipeline_task.delay(analysis_id, manual_mode)
+
+
+def queue_validation(analysis_id: int):
+    """Queue validation of an analysis whose missing papers were uploaded."""
+    from app.services.analysis_lock import acquire_lock
+
+    db = SessionLocal()
+    lock_token = acquire_lock(db, analysis_id)
+    if lock_token is None:
+        try:
+            return _lock_conflict(db, [analysis_id])
+        finally:
+            db.close()
+
+    try:
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        return _dispatch_validation(db, analysis, lock_token)
+    except Exception as e:
+        _fail_analysis(db, analysis_id, lock_token, e)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True)
+def analysis_pipeline_task(self, analysis_id: int, manual_mode: bool = False):
+    """Run (or resume) the extraction stage, then fan out the next stage."""
+    from app.services.analysis_lock import acquire_lock, release_lock
+
+    db = SessionLocal()
+    lock_token = acquire_lock(db, analysis_id)
+    if lock_token is None:
+        try:
+            return _lock_conflict(db, [analysis_id])
+        finally:
+            db.close()
+
+    try:
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        if not analysis:
+            release_lock(db, analysis_id, lock_token)
+            return {"error": "Analysis not found"}
+
+        if analysis.checkpoint is None:
+            stopped = _run_extraction_stage(db, analysis, manual_mode)
+            if stopped:
+                release_lock(db, analysis_id, lock_token)
+                return stopped
+
+        if analysis.checkpoint == AnalysisCheckpoint.EXTRACTED:
+            from celery import chord
+            from app.config import get_settings
+
+            _start_fetch_stage(db, analysis, lock_token)
+            paper_ids = _cited_unfetched_reference_ids(db, analysis_id)
+
+            settings = get_settings()
+            if not settings.analysis_pipelined or analysis.batch_mode or settings.validation_batch_mode:
+                header = [reference_fetch_task.s(paper_id, analysis_id, lock_token) for paper_id in paper_ids]
+            else:
+                # Validate each reference's quotes as soon as it is fetched
+                header = [
+                    reference_fetch_task.s(paper_id, analysis_id, lock_token)
+                    | validate_reference_task.s(paper_id, analysis_id, lock_token)
+                    for paper_id in paper_ids
+                ]
+                header += [
+                    validate_reference_task.s(True, row.id, analysis_id, lock_token)
+                    for row in db.query(Paper.id).filter(
+                        Paper.analysis_id == analysis_id,
+                        Paper.reference_key.isnot(None),
+                        Paper.file_path.isnot(None)
+                    )
+                ]
+
+            chord(
+                header,
+                references_fetched_task.s(analysis_id, lock_token).on_error(
+                    analysis_failed_task.s(analysis_id, lock_token)
+                ),
+            ).apply_async()
+            return {"status": "fetching_references"}
+
+        return _dispatch_validation(db, analysis, lock_token)
+
+    except Exception as e:
+        _fail_analysis(db, analysis_id, lock_token, e)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def reference_fetch_task(paper_id: int, analysis_id: int, lock_token: str) -> bool:
+    """Resolve one reference paper."""
+    from app.services.analysis_lock import renew_lock
+    from app.services.paper_fetcher import fetch_reference
+
+    success = fetch_reference(paper_id)
+
+    db = SessionLocal()
+    try:
+        renew_lock(db, analysis_id, lock_token)
+        db.commit()
+    finally:
+        db.close()
+    return success
+
+
+@celery_app.task
+def validate_reference_task(fetched: bool, paper_id: int, analysis_id: int, lock_token: str) -> int:
+    """Validate the outstanding quotes citing a reference once it is available (pipelined mode)."""
+    from app.services.analysis_lock import acquire_lock
+
+    if not fetched:
+        return 0
+
+    db = SessionLocal()
+    try:
+        if acquire_lock(db, analysis_id, lock_token) is None:
+            return 0
+
+        reference_key = db.query(Paper.reference_key).filter(Paper.id == paper_id).scalar()
+        quote_ids = [row.id for row in _outstanding_quotes(db, analysis_id).filter(
+            Quote.reference_key == reference_key
+        ).with_entities(Quote.id)]
+        if not quote_ids:
+            return 0
+
+        jobs = _collect_validation_jobs(db, analysis_id, quote_ids)
+        _validate_jobs(db, analysis_id, lock_token, jobs)
+        return len(jobs)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def references_fetched_task(results: list, analysis_id: int, lock_token: str):
+    """
+    Chord callback of the fetch stage: wait for uploads or fan out validation.
+
+    In pipelined mode most quotes are validated by then; only the rest
+    (e.g. quotes whose citation matched no reference) are left.
+    """
+    from app.services.analysis_lock import acquire_lock, release_lock
+
+    db = SessionLocal()
+    try:
+        if acquire_lock(db, analysis_id, lock_token) is None:
+            return {"status": "lease_lost"}
+
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        stopped = _finish_fetch_stage(db, analysis)
+        if stopped:
+            release_lock(db, analysis_id, lock_token)
+            return stopped
+
+        return _dispatch_validation(db, analysis, lock_token)
+
+    except Exception as e:
+        _fail_analysis(db, analysis_id, lock_token, e)
+        raise
+    finally:
+        db.close()
+
+
+def _dispatch_validation(db, analysis: Analysis, lock_token: str) -> dict:
+    """Fan the outstanding quotes out to validation tasks, batched by reference."""
+    from celery import chord
+    from app.config import get_settings
+    from app.services.analysis_lock import release_lock
+
+    settings = get_settings()
+
+    if analysis.batch_mode or settings.validation_batch_mode:
+        # A Message Batch covers the whole analysis in one task
+        release_lock(db, analysis.id, lock_token)
+        validate_quotes_batch_celery_task.delay([analysis.id])
+        return {"status": "validating"}
+
+    analysis.status = AnalysisStatus.VALIDATING
+    analysis.status_message = "Validating quotes against source papers..."
+    db.commit()
+
+    # Quotes of one reference stay together so they can share a request and its cached prefix
+    chunks = []
+    current_key = object()
+    for quote_id, reference_key in _outstanding_quotes(db, analysis.id).with_entities(
+        Quote.id, Quote.reference_key
+    ).order_by(Quote.reference_key, Quote.id):
+        if reference_key != current_key or len(chunks[-1]) >= settings.validation_task_chunk_size:
+            chunks.append([])
+            current_key = reference_key
+        chunks[-1].append(quote_id)
+
+    # An empty header runs the callback straight away
+    chord(
+        [validate_quote_chunk_task.s(analysis.id, quote_ids, lock_token) for quote_ids in chunks],
+        finalize_analysis_task.s(analysis.id, lock_token).on_error(
+            analysis_failed_task.s(analysis.id, lock_token)
+        ),
+    ).apply_async()
+
+    return {"status": "validating", "tasks": len(chunks)}
+
+
+@celery_app.task
+def validate_quote_chunk_task(analysis_id: int, quote_ids: list[int], lock_token: str) -> int:
+    """Validate a batch of quotes of one analysis."""
+    from app.services.analysis_lock import acquire_lock
+
+    db = SessionLocal()
+    try:
+        if acquire_lock(db, analysis_id, lock_token) is None:
+            return 0
+
+        jobs = _collect_validation_jobs(db, analysis_id, quote_ids)
+        _validate_jobs(db, analysis_id, lock_token, jobs)
+        return len(jobs)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def finalize_analysis_task(results: list[int], analysis_id: int, lock_token: str):
+    """Chord callback of the validation stage: mark the analysis complete."""
+    from app.services.analysis_lock import release_lock
+
+    db = SessionLocal()
+    try:
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        _complete_analysis(db, analysis)
+        release_lock(db, analysis_id, lock_token)
+        return {"status": "completed"}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def analysis_failed_task(request, exc, traceback, analysis_id: int, lock_token: str):
+    """Error callback of the pipeline chords."""
+    db = SessionLocal()
+    try:
+        _fail_analysis(db, analysis_id, lock_token, exc)
+    finally:
+        db.close()
+
+
+def _fail_analysis(db, analysis_id: int, lock_token: str, error):
+    from app.services.analysis_lock import release_lock
+
+    db.rollback()
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    if analysis:
+        analysis.status = AnalysisStatus.FAILED
+        analysis.status_message = str(error)
+        db.commit()
+    release_lock(db, analysis_id, lock_token)
+
+
+@celery_app.task
+def evict_validation_cache_task():
+    """
+    Evict expired or least recently used validation cache entries.
+
+    Runs periodically (see beat_schedule in app/celery_app.py) rather than
+    when each analysis completes.
+    """
+    from app.services.validation_cache import evict_entries
+    db = SessionLocal()
+    try:
+        return {"evicted": evict_entries(db)}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def evict_reference_registry_task():
+    """
+    Evict stale or oversized entries from the shared reference registry, and old page cache sidecars.
+
+    Runs periodically (see beat_schedule in app/celery_app.py) rather than
+    inside an analysis; entries used by analyses not yet completed are kept.
+    """
+    from app.services import page_cache
+    from app.services.reference_registry import evict_entries
+    db = SessionLocal()
+    try:
+        return {"evicted": evict_entries(db), "page_cache_evicted": page_cache.evict()}
+    finally:
+        db.close()
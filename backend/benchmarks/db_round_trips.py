@@ -0,0 +1,190 @@
+"""
+Benchmark database round trips per analysis: per-row writes vs. bulk writes.
+
+Creates the records of a synthetic analysis and writes its validation
+results, once the way the pipeline used to (one INSERT and commit per
+reference and quote, one Paper query and commit per quote) and once
+through the current task code. The LLM is replaced by canned results.
+
+Usage (from backend/):
+    python -m benchmarks.db_round_trips [--quotes 50 500] [--references 40]
+    python -m benchmarks.db_round_trips --database-url postgresql://...
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import tasks
+from app.config import get_settings
+from app.models.database import Base
+from app.models.models import Analysis, AnalysisStatus, Paper, Quote, QuoteStatus
+from app.services import validation_agent
+from app.services.text_store import store_text
+
+RESULT = {"grade": 80, "explanation": "Benchmark result", "source_text": None, "source_page": None}
+
+
+class RoundTripCounter:
+    """Counts statements and commits issued through an engine."""
+
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+def make_analysis_data(quote_count: int, reference_count: int, seed: int = 0):
+    rng = random.Random(seed)
+    references = [
+        {"key": f"Author{i} 20{i % 25:02d}", "title": f"Reference {i}", "raw_text": f"Author{i}. Reference {i}."}
+        for i in range(reference_count)
+    ]
+    quotes = [
+        {
+            "text": f"Quoted sentence number {i}.",
+            "page": rng.randint(1, 30),
+            "context_before": "Before.",
+            "context_after": "After.",
+            "reference_key": references[rng.randrange(reference_count)]["key"],
+        }
+        for i in range(quote_count)
+    ]
+    return references, quotes
+
+
+def fake_validate(jobs, max_concurrency=None):
+    for index in range(len(jobs)):
+        yield index, dict(RESULT), None
+
+
+def create_analysis(Session) -> int:
+    db = Session()
+    analysis = Analysis(status=AnalysisStatus.VALIDATING)
+    db.add(analysis)
+    db.commit()
+    analysis_id = analysis.id
+    db.close()
+    return analysis_id
+
+
+def store_reference_texts(Session, analysis_id: int):
+    db = Session()
+    for paper in db.query(Paper).filter(Paper.analysis_id == analysis_id):
+        store_text(db, f"--- Page 1 ---\nText of {paper.title}.", paper=paper)
+    db.commit()
+    db.close()
+
+
+def run_per_row(Session, counter, references, quotes_data):
+    """The previous pipeline: one ORM object, query and commit at a time."""
+    analysis_id = create_analysis(Session)
+
+    counter.reset()
+    db = Session()
+    for ref in references:
+        db.add(Paper(
+            title=ref["title"], reference_key=ref["key"], reference_text=ref["raw_text"], analysis_id=analysis_id,
+        ))
+    db.commit()
+    for quote_data in quotes_data:
+        db.add(Quote(
+            text=quote_data["text"], page_number=quote_data["page"], context_before=quote_data["context_before"],
+            context_after=quote_data["context_after"], reference_key=quote_data["reference_key"],
+            status=QuoteStatus.PENDING, analysis_id=analysis_id,
+        ))
+    db.commit()
+    create_stats = (counter.statements, counter.commits)
+    db.close()
+
+    store_reference_texts(Session, analysis_id)
+
+    counter.reset()
+    db = Session()
+    for quote in db.query(Quote).filter(Quote.analysis_id == analysis_id).all():
+        ref_paper = db.query(Paper).filter(
+            Paper.analysis_id == analysis_id,
+            Paper.reference_key == quote.reference_key
+        ).first()
+        if ref_paper is None:
+            continue
+        tasks._apply_validation_result(quote, dict(RESULT), None)
+        db.commit()
+    validate_stats = (counter.statements, counter.commits)
+    db.close()
+    return create_stats, validate_stats
+
+
+def run_bulk(Session, counter, references, quotes_data):
+    """The current pipeline code."""
+    analysis_id = create_analysis(Session)
+
+    counter.reset()
+    db = Session()
+    tasks._create_records(db, analysis_id, references, quotes_data)
+    create_stats = (counter.statements, counter.commits)
+    db.close()
+
+    store_reference_texts(Session, analysis_id)
+
+    counter.reset()
+    tasks.validate_quotes_task(analysis_id)
+    return create_stats, (counter.statements, counter.commits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quotes", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--references", type=int, default=40)
+    parser.add_argument("--database-url", help="Database to benchmark (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.match_enabled = False  # Every quote should reach the (fake) validator
+    settings.validation_cache_enabled = False
+    validation_agent.validate_quotes_concurrently = fake_validate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        engine = create_engine(database_url, connect_args=connect_args)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        tasks.SessionLocal = Session
+        counter = RoundTripCounter(engine)
+
+        print(f"Database: {engine.url.get_backend_name()}")
+        print(f"{'quotes':>6} {'mode':>8} {'create stmts':>13} {'commits':>8} {'validate stmts':>15} {'commits':>8} {'time (s)':>9}")
+        for quote_count in args.quotes:
+            references, quotes_data = make_analysis_data(quote_count, args.references)
+            for name, run in (("per-row", run_per_row), ("bulk", run_bulk)):
+                start = time.perf_counter()
+                (create_statements, create_commits), (validate_statements, validate_commits) = run(
+                    Session, counter, references, quotes_data
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{quote_count:>6} {name:>8} {create_statements:>13} {create_commits:>8} "
+                    f"{validate_statements:>15} {validate_commits:>8} {elapsed:>9.3f}"
+                )
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark the PDF extraction backends for speed and text fidelity.
+
+Reports pages/sec and two fidelity scores per backend and document:
+  - words: F1 of the extracted words against the ground truth (missing,
+    garbled or extra text such as running headers lowers it)
+  - order: similarity of the word sequences (columns read out of order
+    lower it even when every word is found)
+
+The corpus is a directory of PDFs, each with its ground truth in a .txt
+file of the same name (pages separated by form feeds, as pdftotext
+writes them). PDFs without a .txt are timed only. Without --corpus, a
+synthetic corpus of typical layouts is generated.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_backends [--corpus DIR] [--backends pymupdf pdfplumber]
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Optional
+
+from app.services.pdf_backends import BACKENDS
+from benchmarks.synthetic import LAYOUTS, make_layout_pdf
+
+_word_pattern = re.compile(r"\w+")
+
+
+def words(text: str) -> list[str]:
+    return _word_pattern.findall(text.lower())
+
+
+def word_f1(extracted: list[str], truth: list[str]) -> float:
+    common = sum((Counter(extracted) & Counter(truth)).values())
+    if not common:
+        return 0.0
+    precision, recall = common / len(extracted), common / len(truth)
+    return 2 * precision * recall / (precision + recall)
+
+
+def order_score(extracted: list[str], truth: list[str]) -> float:
+    return SequenceMatcher(None, extracted, truth, autojunk=False).ratio()
+
+
+def fidelity(pages: list[str], truth: list[str]) -> tuple[float, float]:
+    """Mean per-page word F1 and order scores."""
+    if len(truth) != len(pages):
+        # Ground truth not split by page: compare whole documents
+        pages, truth = [" ".join(pages)], [" ".join(truth)]
+    scores = [(word_f1(words(p), words(t)), order_score(words(p), words(t))) for p, t in zip(pages, truth)]
+    return sum(s[0] for s in scores) / len(scores), sum(s[1] for s in scores) / len(scores)
+
+
+def load_corpus(directory: str) -> list[tuple[str, Optional[list[str]]]]:
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(directory, name)
+        truth_path = os.path.splitext(path)[0] + ".txt"
+        truth = None
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding="utf-8") as f:
+                truth = f.read().split("\f")
+        corpus.append((path, truth))
+    return corpus
+
+
+def synthetic_corpus(directory: str, pages: int) -> list[tuple[str, Optional[list[str]]]]:
+    return [
+        (path, make_layout_pdf(path, layout, pages))
+        for layout in LAYOUTS
+        for path in [os.path.join(directory, f"{layout}.pdf")]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDFs with optional .txt ground truth")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic document")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(tmp, args.pages)
+
+        print(f"{'document':<24} {'backend':<20} {'pages/s':>9} {'words':>6} {'order':>6}")
+        totals = {name: [0, 0.0, []] for name in args.backends}
+        for path, truth in corpus:
+            for name in args.backends:
+                backend = BACKENDS[name]
+                start = time.perf_counter()
+                page_count = backend.page_count(path)
+                pages = [text for _, text in backend.iter_range(path, 0, page_count)]
+                elapsed = time.perf_counter() - start
+
+                totals[name][0] += page_count
+                totals[name][1] += elapsed
+                line = f"{os.path.basename(path)[:24]:<24} {name:<20} {page_count / elapsed:>9.1f}"
+                if truth is not None:
+                    scores = fidelity(pages, truth)
+                    totals[name][2].append(scores)
+                    line += f" {scores[0]:>6.3f} {scores[1]:>6.3f}"
+                print(line)
+
+        print()
+        print(f"{'overall':<24} {'backend':<20} {'pages/s':>9} {'words':>6} {'order':>6}")
+        for name, (page_count, elapsed, scores) in totals.items():
+            line = f"{'':<24} {name:<20} {page_count / elapsed:>9.1f}"
+            if scores:
+                line += f" {sum(s[0] for s in scores) / len(scores):>6.3f} {sum(s[1] for s in scores) / len(scores):>6.3f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
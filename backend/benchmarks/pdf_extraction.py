@@ -0,0 +1,65 @@
+"""
+Benchmark serial vs. parallel PDF text extraction, and reads from the page cache.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_extraction [--sizes 10 100 500 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.config import get_settings
+from app.services.parallel import worker_count
+from app.services.pdf_processor import extract_pages, extract_text_from_pdf
+from benchmarks.synthetic import make_pdf
+
+
+def best_of(repeat: int, function):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Workers: {worker_count()}")
+    print(f"{'pages':>6} {'serial (s)':>11} {'parallel (s)':>13} {'speedup':>8} {'cached (s)':>11} {'last 10 (s)':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        get_settings().page_cache_dir = os.path.join(tmp, "page_cache")
+
+        for size in args.sizes:
+            path = make_pdf(os.path.join(tmp, f"doc_{size}.pdf"), size)
+
+            timings = {}
+            outputs = {}
+            for parallel in (False, True):
+                timings[parallel], outputs[parallel] = best_of(
+                    args.repeat, lambda: extract_text_from_pdf(path, parallel=parallel, cache=False)
+                )
+            assert outputs[False] == outputs[True], "parallel output differs from serial"
+
+            # The tail of a fresh copy, then the whole document with only the rest decoded, then all cached
+            copy = make_pdf(os.path.join(tmp, f"copy_{size}.pdf"), size)
+            tail_time, _ = best_of(1, lambda: extract_pages(copy, -10))
+            extract_text_from_pdf(copy)
+            cached_time, cached = best_of(args.repeat, lambda: extract_text_from_pdf(copy))
+            assert cached == outputs[False], "cached output differs from extracted"
+
+            print(
+                f"{size:>6} {timings[False]:>11.3f} {timings[True]:>13.3f} {timings[False] / timings[True]:>7.2f}x"
+                f" {cached_time:>11.3f} {tail_time:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark quote extraction throughput on synthetic theses.
+
+Compares the single-pass extractor with the previous approach of splitting
+the document on page markers and re-scanning each page. The single-pass
+extractor also finds curly quotes and expands multi-key citations, so it
+reports more quotes on the same text; peak memory excludes the input.
+
+Usage (from backend/):
+    python -m benchmarks.quote_extraction [--pages 100 1000 5000]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+
+from app.services.quote_extractor import extract_quotes, normalize_citation_key
+from benchmarks.synthetic import make_thesis_text
+
+
+def split_then_scan(text: str) -> list[dict]:
+    """The previous extractor (straight quotes, one citation key per quote)."""
+    quotes = []
+    quote_pattern = r'"([^"]{10,500})"[\s]*(\[[^\]]+\]|\([^)]+,\s*\d{4}[^)]*\))'
+    pages = re.split(r'--- Page (\d+) ---', text)
+
+    current_page = 1
+    for i, section in enumerate(pages):
+        if i % 2 == 1:
+            current_page = int(section)
+            continue
+        for match in re.finditer(quote_pattern, section):
+            start = max(0, match.start() - 50)
+            end = min(len(section), match.end() + 50)
+            quotes.append({
+                "text": match.group(1).strip(),
+                "reference_key": normalize_citation_key(match.group(2)),
+                "page": current_page,
+                "context_before": section[start:match.start()].strip() or None,
+                "context_after": section[match.end():end].strip() or None,
+            })
+    return quotes
+
+
+def best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory_mb(fn, *args) -> float:
+    """Peak memory allocated while running fn, beyond its input."""
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'pages':>6} {'MB':>6} | {'split (s)':>9} {'found':>6} {'peak MB':>8} | "
+        f"{'single-pass (s)':>15} {'found':>6} {'peak MB':>8} {'MB/s':>6}"
+    )
+
+    for pages in args.pages:
+        text = make_thesis_text(pages)
+        size_mb = len(text.encode()) / 1e6
+
+        old_time, old_quotes = best_of(args.repeat, split_then_scan, text)
+        new_time, new_quotes = best_of(args.repeat, extract_quotes, text)
+
+        old_peak = peak_memory_mb(split_then_scan, text)
+        new_peak = peak_memory_mb(extract_quotes, text)
+
+        print(
+            f"{pages:>6} {size_mb:>6.1f} | {old_time:>9.3f} {len(old_quotes):>6} {old_peak:>8.1f} | "
+            f"{new_time:>15.3f} {len(new_quotes):>6} {new_peak:>8.1f} {size_mb / new_time:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark reference list parsing, including adversarial inputs.
+
+Usage (from backend/):
+    python -m benchmarks.reference_parsing [--entries 100 500 2000 10000]
+
+The worst-case inputs target the patterns most prone to backtracking (long
+runs of whitespace or text without punctuation inside one entry, and many
+header look-alikes). Each is timed at two sizes: a ratio near 2 means
+linear time, near 4 quadratic. The run fails if any ratio exceeds
+MAX_SCALING.
+"""
+
+import argparse
+import time
+
+from app.services.parallel import worker_count
+from app.services.reference_parser import parse_references
+from benchmarks.synthetic import make_bibliography
+
+MAX_SCALING = 3.0
+
+WORST_CASES = {
+    "whitespace run": lambda n: "References\n[1] A" + " " * n + "x",
+    "unpunctuated entry": lambda n: "References\n[1] " + "word " * (n // 5),
+    "no header, many look-alikes": lambda n: "References: " * (n // 12),
+    "unterminated quote": lambda n: 'References\n[1] "' + "a" * n,
+    "digits after doi prefix": lambda n: "References\n[1] doi: 10." + "1" * n,
+}
+
+
+def best_of(repeat: int, fn, *args, **kwargs) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[100, 500, 2000, 10000])
+    parser.add_argument("--worst-case-size", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Workers: {worker_count()}")
+    print(f"{'entries':>8} {'serial (s)':>11} {'parallel (s)':>13} {'entries/s':>10}")
+    for entries in args.entries:
+        text = make_bibliography(entries)
+        serial = best_of(args.repeat, parse_references, text, parallel=False)
+        parallel = best_of(args.repeat, parse_references, text, parallel=True)
+        assert parse_references(text, parallel=False) == parse_references(text, parallel=True)
+        print(f"{entries:>8} {serial:>11.3f} {parallel:>13.3f} {entries / serial:>10.0f}")
+
+    print()
+    print(f"{'worst case':<28} {'n (s)':>8} {'2n (s)':>8} {'ratio':>6}")
+    failures = []
+    for name, make in WORST_CASES.items():
+        n = args.worst_case_size
+        small = best_of(args.repeat, parse_references, make(n), parallel=False)
+        large = best_of(args.repeat, parse_references, make(2 * n), parallel=False)
+        # Sub-millisecond timings are noise
+        ratio = large / max(small, 1e-3)
+        print(f"{name:<28} {small:>8.4f} {large:>8.4f} {ratio:>6.2f}")
+        if ratio > MAX_SCALING:
+            failures.append(name)
+
+    if failures:
+        raise SystemExit(f"Super-linear parsing time: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
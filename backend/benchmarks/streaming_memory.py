@@ -0,0 +1,97 @@
+"""
+Benchmark peak memory of paper extraction, whole-text vs. streaming.
+
+Each run extracts a synthetic thesis PDF (quotes on every page, a numbered
+reference list at the end) through the extraction stage of process_analysis
+into a temporary SQLite database, in a fresh process, and reports the
+process's peak RSS. Streaming should stay roughly flat as pages grow.
+
+Usage (from backend/):
+    python -m benchmarks.streaming_memory [--pages 500 2000 5000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_thesis_pdf
+
+
+def run_child(pdf_path: str, db_path: str, streaming: bool):
+    """Extract one paper in this (fresh) process and print the measurements as JSON."""
+    import resource
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["EXTRACTION_STREAMING_MIN_PAGES"] = "0" if streaming else str(10 ** 9)
+    # Both modes extract the same PDF; each must decode it
+    os.environ["PAGE_CACHE_ENABLED"] = "false"
+
+    from app.models import Base, engine, SessionLocal, Analysis, Paper, Quote, AnalysisStatus, PaperSourceType
+    from app.tasks import _run_extraction_stage
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    analysis = Analysis(status=AnalysisStatus.PENDING)
+    db.add(analysis)
+    db.flush()
+    analysis.uploaded_paper = Paper(file_path=pdf_path, source_type=PaperSourceType.UPLOADED, analysis_id=analysis.id)
+    db.commit()
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    _run_extraction_stage(db, analysis, manual_mode=True)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "seconds": elapsed,
+        "baseline_mb": baseline_kb / 1024,
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "quotes": db.query(Quote).count(),
+        "references": db.query(Paper).filter(Paper.reference_key.isnot(None)).count(),
+    }))
+
+
+def measure(pdf_path: str, streaming: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.streaming_memory", "--child", pdf_path, os.path.join(tmp, "bench.db")]
+            + (["--streaming"] if streaming else []),
+            check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--references", type=int, default=2000)
+    parser.add_argument("--child", nargs=2, metavar=("PDF", "DB"), help=argparse.SUPPRESS)
+    parser.add_argument("--streaming", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, streaming=args.streaming)
+        return
+
+    print(f"{'pages':>6} {'mode':>10} {'time (s)':>9} {'peak RSS (MB)':>14} {'over baseline':>14} {'quotes':>7} {'refs':>5}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = make_thesis_pdf(os.path.join(tmp, f"thesis_{pages}.pdf"), pages, references=args.references)
+            results = {}
+            for streaming in (False, True):
+                result = results[streaming] = measure(pdf_path, streaming)
+                print(
+                    f"{pages:>6} {'streaming' if streaming else 'whole':>10} {result['seconds']:>9.2f} "
+                    f"{result['peak_mb']:>14.1f} {result['peak_mb'] - result['baseline_mb']:>14.1f} "
+                    f"{result['quotes']:>7} {result['references']:>5}"
+                )
+            assert results[False]["quotes"] == results[True]["quotes"], "streaming found different quotes"
+            assert results[False]["references"] == results[True]["references"], "streaming found different references"
+
+
+if __name__ == "__main__":
+    main()
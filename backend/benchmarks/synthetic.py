@@ -0,0 +1,139 @@
+"""Synthetic documents for the benchmarks."""
+
+import random
+from typing import Iterator
+
+import fitz  # PyMuPDF
+
+WORDS = (
+    "analysis model data results method study evidence theory sample effect "
+    "research paper approach significant observed however therefore figure table "
+    "section proposed previous literature framework measure variable hypothesis"
+).split()
+
+
+def make_paragraph(rng: random.Random, words: int = 80) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def thesis_pages(pages: int, seed: int = 0, quotes_per_page: int = 3) -> Iterator[str]:
+    """Page texts of a thesis: paragraphs and quotes with numbered and author-year citations."""
+    rng = random.Random(seed)
+    citations = ["[{n}]", "[{n}, {m}]", "(Author{n}, 2020)", "(Author{n} et al., 2019; Author{m}, 2021)"]
+    marks = [('"', '"'), ("\u201c", "\u201d")]
+
+    for _ in range(pages):
+        paragraphs = [make_paragraph(rng) for _ in range(5)]
+        for _ in range(quotes_per_page):
+            opening, closing = rng.choice(marks)
+            quote = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30)))
+            citation = rng.choice(citations).format(n=rng.randint(1, 200), m=rng.randint(1, 200))
+            i = rng.randrange(len(paragraphs))
+            paragraphs[i] += f" As noted, {opening}{quote}{closing} {citation}."
+        yield "\n\n".join(paragraphs)
+
+
+def make_thesis_text(pages: int, seed: int = 0, quotes_per_page: int = 3) -> str:
+    """Text of a thesis as extract_text_from_pdf returns it, with page markers."""
+    return "\n\n".join(
+        f"--- Page {number} ---\n{text}"
+        for number, text in enumerate(thesis_pages(pages, seed, quotes_per_page), start=1)
+    )
+
+
+def make_thesis_pdf(file_path: str, pages: int, references: int = 200, seed: int = 0) -> str:
+    """Write a thesis PDF: body pages with quotes, then a numbered reference list."""
+    rng = random.Random(seed)
+    with fitz.open() as doc:
+        for text in thesis_pages(pages, seed):
+            doc.new_page().insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=9)
+
+        entries = [
+            f"[{i}] Author{i}, A. and Other, B. {make_paragraph(rng, 8)} Journal, {rng.randint(1950, 2024)}."
+            for i in range(1, references + 1)
+        ]
+        for start in range(0, len(entries), 40):
+            header = "References\n" if start == 0 else ""
+            text = header + "\n".join(entries[start:start + 40])
+            doc.new_page().insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=8)
+        doc.save(file_path)
+    return file_path
+
+
+def make_bibliography(entries: int, seed: int = 0) -> str:
+    """Text of a paper ending in a numbered reference list."""
+    rng = random.Random(seed)
+    body = "\n\n".join(make_paragraph(rng) for _ in range(50))
+    references = "\n".join(
+        f"[{i}] Author{i}, A., Coauthor, B. and Other, C. "
+        f"{' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))).capitalize()}. "
+        f"Journal of {rng.choice(WORDS).capitalize()}, {rng.randint(12, 80)}({rng.randint(1, 12)}), "
+        f"{rng.randint(1950, 2024)}. doi:10.{rng.randint(1000, 9999)}/{rng.randint(10000, 99999)}"
+        for i in range(1, entries + 1)
+    )
+    return f"{body}\n\nReferences\n{references}"
+
+
+def make_pdf(file_path: str, pages: int, seed: int = 0) -> str:
+    """Write a text PDF with the given number of pages (about 400 words each)."""
+    rng = random.Random(seed)
+    with fitz.open() as doc:
+        for _ in range(pages):
+            page = doc.new_page()
+            text = "\n\n".join(make_paragraph(rng) for _ in range(5))
+            page.insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=9)
+        doc.save(file_path)
+    return file_path
+
+
+LAYOUTS = ["single_column", "two_column", "running_headers", "hyphenated"]
+
+
+def _wrap(words: list[str], width: int, hyphenate: bool = False) -> list[str]:
+    lines, line = [], ""
+    for word in words:
+        if line and len(line) + 1 + len(word) > width:
+            room = width - len(line) - 2
+            if hyphenate and len(word) > 6 and room >= 3:
+                lines.append(f"{line} {word[:room]}-")
+                line = word[room:]
+                continue
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    return lines + [line] if line else lines
+
+
+def make_layout_pdf(file_path: str, layout: str, pages: int = 10, seed: int = 0) -> list[str]:
+    """
+    Write a PDF in one of LAYOUTS and return each page's ground-truth body text.
+
+    two_column writes the right column first, so the content stream is out
+    of reading order; running_headers adds a header and page number outside
+    the body; hyphenated splits words across lines.
+    """
+    rng = random.Random(seed)
+    truth = []
+    with fitz.open() as doc:
+        for number in range(1, pages + 1):
+            page = doc.new_page()
+            words = " ".join(make_paragraph(rng, 60) for _ in range(6)).split()
+
+            if layout == "two_column":
+                half = len(words) // 2
+                columns = [(50, _wrap(words[:half], 45)), (310, _wrap(words[half:], 45))]
+                for x, lines in reversed(columns):
+                    for i, line in enumerate(lines):
+                        page.insert_text((x, 72 + i * 11), line, fontsize=8)
+            else:
+                for i, line in enumerate(_wrap(words, 95, hyphenate=layout == "hyphenated")):
+                    page.insert_text((50, 72 + i * 12), line, fontsize=9)
+
+            if layout == "running_headers":
+                page.insert_text((50, 30), "Journal of Synthetic Studies, Volume 12", fontsize=8)
+                page.insert_text((290, 820), str(number), fontsize=8)
+
+            truth.append(" ".join(words))
+        doc.save(file_path)
+    return truth
@@ -0,0 +1,64 @@
+"""Test configuration: a throwaway SQLite database and upload directory, no external services."""
+
+import os
+import tempfile
+
+# Settings are read once on first import of app.config, so these must be set first
+_tmp = tempfile.mkdtemp(prefix="aqv-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_tmp, "uploads"))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("USE_CELERY", "false")
+os.environ.setdefault("PROGRESS_EVENTS_ENABLED", "false")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    from app.models import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def make_analysis(db):
+    """
+    Factory for analyses, optionally with a reference paper and quotes citing it.
+
+    The paper is added if source_text (stored as its extracted text, so no
+    PDF is read) or file_path is given.
+    """
+    from app.models import Analysis, AnalysisStatus, Paper, Quote
+
+    def make(status=AnalysisStatus.VALIDATING, source_text=None, file_path=None, quotes=(), reference_key="[1]",
+             **fields):
+        analysis = Analysis(status=status, **fields)
+        db.add(analysis)
+        db.flush()
+        if source_text is not None or file_path is not None:
+            db.add(Paper(analysis_id=analysis.id, reference_key=reference_key, file_path=file_path or "/unused.pdf",
+                         extracted_text=source_text))
+        for text in quotes:
+            db.add(Quote(analysis_id=analysis.id, reference_key=reference_key, text=text))
+        db.commit()
+        return analysis
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def long_source():
+    """A 40-page source, long enough to go through passage retrieval, with one topic per page."""
+    topics = ["photosynthesis chlorophyll light", "glacier ice melting", "neural network training", "volcano lava eruption"]
+    pages = []
+    for page in range(1, 41):
+        topic = topics[page % len(topics)]
+        pages.append(f"--- Page {page} ---\n" + " ".join(f"{topic} filler{page}x{i}" for i in range(150)))
+    return "\n".join(pages)
@@ -0,0 +1,28 @@
+from app.models import Analysis, AnalysisStatus
+from app.services.analysis_lock import acquire_lock, release_lock
+
+
+def test_token_renews_held_lease(db, make_analysis):
+    analysis_id = make_analysis(AnalysisStatus.PENDING).id
+    token = acquire_lock(db, analysis_id)
+
+    assert token is not None
+    assert acquire_lock(db, analysis_id) is None
+    assert acquire_lock(db, analysis_id, token) == token
+
+
+def test_stale_token_cannot_retake_released_lease(db, make_analysis):
+    analysis_id = make_analysis(AnalysisStatus.PENDING).id
+    token = acquire_lock(db, analysis_id)
+    release_lock(db, analysis_id, token)
+
+    assert acquire_lock(db, analysis_id, token) is None
+    db.expire_all()
+    assert db.get(Analysis, analysis_id).lock_token is None
+
+
+def test_new_token_shares_one_token_across_analyses(db, make_analysis):
+    first, second = make_analysis(AnalysisStatus.PENDING).id, make_analysis(AnalysisStatus.PENDING).id
+
+    assert acquire_lock(db, first, new_token="shared") == "shared"
+    assert acquire_lock(db, second, new_token="shared") == "shared"
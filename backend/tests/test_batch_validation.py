@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import tasks
+from app.config import get_settings
+from app.models import Analysis, AnalysisStatus, QuoteStatus, ValidationCacheEntry
+from app.services import progress, validation_agent
+
+SOURCE = "--- Page 1 ---\nThe results were replicated across three independent laboratories."
+RESPONSE = "GRADE: 85\n\nEXPLANATION: Accurate.\n\nSOURCE_TEXT: NOT FOUND\n\nSOURCE_PAGE: 1"
+
+
+class FakeBatches:
+    """Stand-in for client.messages.batches that ends after a set number of polls."""
+
+    def __init__(self, polls_until_ended):
+        self.polls_until_ended = polls_until_ended
+        self.submitted = {}
+        self.polls = 0
+
+    def create(self, requests):
+        self.submitted = {request["custom_id"]: request["params"] for request in requests}
+        return SimpleNamespace(id="batch-1")
+
+    def retrieve(self, batch_id):
+        self.polls += 1
+        ended = self.polls >= self.polls_until_ended
+        return SimpleNamespace(id=batch_id, processing_status="ended" if ended else "in_progress")
+
+    def results(self, batch_id):
+        custom_ids = sorted(self.submitted)
+        succeeded, errored = custom_ids[0], custom_ids[1]
+        # The third request is missing from the results
+        yield SimpleNamespace(custom_id=succeeded, result=SimpleNamespace(
+            type="succeeded",
+            message=SimpleNamespace(content=[SimpleNamespace(text=RESPONSE)], usage=SimpleNamespace(input_tokens=10)),
+        ))
+        yield SimpleNamespace(custom_id=errored, result=SimpleNamespace(type="errored", error="overloaded"))
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    fake = FakeBatches(polls_until_ended=2)
+    client = SimpleNamespace(messages=SimpleNamespace(batches=fake))
+    monkeypatch.setattr(validation_agent, "get_client", lambda: client)
+    monkeypatch.setattr(get_settings(), "match_enabled", False)
+    monkeypatch.setattr(get_settings(), "validation_batch_wait_seconds", 0)
+    return fake
+
+
+def test_running_batch_is_left_to_a_later_poll(db, make_analysis, batches, monkeypatch):
+    analysis_id = make_analysis(
+        source_text=SOURCE,
+        quotes=["replicated in three labs", "results were independent", "laboratories agreed"],
+        batch_mode=True,
+    ).id
+    scheduled = []
+    monkeypatch.setattr(tasks, "_schedule_batch_poll", scheduled.append)
+
+    # Submit, poll once, and hand over instead of waiting for the batch
+    assert tasks.validate_quotes_batch_task([analysis_id]) == {"status": "waiting", "batch_ids": ["batch-1"]}
+    assert len(batches.submitted) == 3 and batches.polls == 1
+    assert scheduled == [[analysis_id]]
+
+    analysis = db.get(Analysis, analysis_id)
+    assert analysis.validation_batch_id == "batch-1"
+    assert analysis.status == AnalysisStatus.VALIDATING
+    assert {quote.status for quote in analysis.quotes} == {QuoteStatus.PENDING}
+
+    # The scheduled poll finds the stored batch ended and collects its results
+    published = []
+    monkeypatch.setattr(progress, "publish_events", published.extend)
+    submitted = batches.submitted
+    assert tasks.validate_quotes_batch_task([analysis_id]) == {"status": "completed"}
+    assert batches.submitted is submitted and batches.polls == 2
+    assert scheduled == [[analysis_id]]
+
+    db.expire_all()
+    analysis = db.get(Analysis, analysis_id)
+    assert analysis.status == AnalysisStatus.COMPLETED
+    assert analysis.validation_batch_id is None
+
+    quotes = {f"quote-{quote.id}": quote for quote in analysis.quotes}
+    succeeded, errored, missing = (quotes[custom_id] for custom_id in sorted(quotes))
+    assert succeeded.status == QuoteStatus.VALIDATED and succeeded.grade == 85
+    assert errored.status == QuoteStatus.FAILED and errored.retryable
+    assert "overloaded" in errored.explanation
+    assert missing.status == QuoteStatus.FAILED and missing.retryable
+    assert missing.explanation == "Validation error: missing from batch results"
+
+    # Every quote's new status is published, including the bulk-updated missing one
+    quote_events = {event["quote_id"]: event["status"] for _, event in published if event["type"] == "quote"}
+    assert quote_events == {succeeded.id: "validated", errored.id: "failed", missing.id: "failed"}
+
+    # Results collected by the later task are cached like those of a single run
+    assert db.query(ValidationCacheEntry).count() == 1
@@ -0,0 +1,37 @@
+from app.models import Quote, QuoteStatus
+from app.services.quote_matcher import match_quote
+from app.tasks import _collect_validation_jobs
+
+SOURCE = (
+    "--- Page 1 ---\n"
+    "Recent advances in deep learning have changed the field. As shown in prior work, "
+    "convolutional networks trained on large labelled datasets outperform handcrafted features "
+    "on most image classification benchmarks."
+)
+
+
+def test_match_reports_quote_word_count():
+    assert match_quote("deep learning", SOURCE)["words"] == 2
+
+
+def test_short_exact_match_is_not_auto_graded(db, make_analysis):
+    analysis_id = make_analysis(source_text=SOURCE, quotes=["deep learning", "as shown in"]).id
+
+    jobs = _collect_validation_jobs(db, analysis_id)
+
+    assert sorted(quote.text for quote, _ in jobs) == ["as shown in", "deep learning"]
+    for quote, _ in jobs:
+        assert quote.match_score == 1.0
+        assert not quote.validated_locally
+
+
+def test_long_exact_match_is_auto_graded(db, make_analysis):
+    quote_text = "convolutional networks trained on large labelled datasets outperform handcrafted features"
+    analysis_id = make_analysis(source_text=SOURCE, quotes=[quote_text]).id
+
+    jobs = _collect_validation_jobs(db, analysis_id)
+
+    assert jobs == []
+    quote = db.query(Quote).filter(Quote.analysis_id == analysis_id).one()
+    assert quote.status == QuoteStatus.VALIDATED
+    assert quote.validated_locally
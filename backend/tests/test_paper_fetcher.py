@@ -0,0 +1,59 @@
+from app.models import Paper, PaperSourceType
+from app.services import paper_fetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code, content_type, chunks=(), error=None):
+        self.status_code = status_code
+        self.headers = {"content-type": content_type}
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+    def iter_content(self, chunk_size):
+        if self.error:
+            raise self.error
+        yield from self.chunks
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def download(monkeypatch, db, response):
+    monkeypatch.setattr(paper_fetcher, "get_http_session", lambda: FakeSession(response))
+    paper = Paper(reference_key="[1]")
+    db.add(paper)
+    db.commit()
+    return paper_fetcher.download_pdf_from_url("https://example.org/x.pdf", paper, db, PaperSourceType.DOI)
+
+
+def test_response_closed_on_error_status(monkeypatch, db):
+    response = FakeResponse(404, "text/html")
+
+    assert download(monkeypatch, db, response) is False
+    assert response.closed
+
+
+def test_response_closed_when_not_a_pdf(monkeypatch, db):
+    response = FakeResponse(200, "text/html")
+
+    assert download(monkeypatch, db, response) is False
+    assert response.closed
+
+
+def test_response_closed_when_download_fails(monkeypatch, db):
+    response = FakeResponse(200, "application/pdf", error=ConnectionError("reset"))
+
+    assert download(monkeypatch, db, response) is False
+    assert response.closed
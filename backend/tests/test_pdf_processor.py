@@ -0,0 +1,48 @@
+import fitz
+
+from app.services.pdf_processor import extract_pages, extract_text_by_page, extract_text_from_pdf
+
+
+def make_pdf(path, texts):
+    with fitz.open() as doc:
+        for text in texts:
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        doc.save(str(path))
+    return str(path)
+
+
+def test_extract_text_by_page_keeps_blank_pages(tmp_path):
+    path = make_pdf(tmp_path / "doc.pdf", ["First page", "", "Third page"])
+
+    pages = extract_text_by_page(path)
+
+    assert [page["page_number"] for page in pages] == [1, 2, 3]
+    assert pages[1]["text"].strip() == ""
+    assert "Third page" in pages[2]["text"]
+
+
+def test_page_range_and_cache_agree_with_full_extraction(tmp_path):
+    path = make_pdf(tmp_path / "doc.pdf", [f"Page number {i}" for i in range(1, 8)])
+
+    tail = extract_pages(path, -2)
+    assert [number for number, _ in tail] == [6, 7]
+    assert extract_text_from_pdf(path) == extract_text_from_pdf(path, cache=False)
+
+
+def test_page_count_comes_from_the_backend(tmp_path, monkeypatch):
+    from app.services.pdf_backends import PdfPlumberBackend
+
+    path = make_pdf(tmp_path / "doc.pdf", ["One", "Two", "Three"])
+    counted = []
+    original = PdfPlumberBackend.page_count
+
+    def page_count(self, file_path):
+        counted.append(file_path)
+        return original(self, file_path)
+
+    monkeypatch.setattr(PdfPlumberBackend, "page_count", page_count)
+
+    assert [number for number, _ in extract_pages(path, -1, backend="pdfplumber", cache=False)] == [3]
+    assert counted == [path]
@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+from app.services.reference_parser import parse_references
+from benchmarks.reference_parsing import WORST_CASES
+
+# Linear parsing handles these sizes in milliseconds; the quadratic author
+# pattern this guards against took over a minute on the whitespace run
+SIZE = 200_000
+TIME_LIMIT_SECONDS = 2.0
+
+
+@pytest.mark.parametrize("name", list(WORST_CASES))
+def test_pathological_input_parses_in_bounded_time(name):
+    text = WORST_CASES[name](SIZE)
+
+    start = time.perf_counter()
+    parse_references(text, parallel=False)
+
+    assert time.perf_counter() - start < TIME_LIMIT_SECONDS
+
+
+def test_numbered_references():
+    references = parse_references(
+        "Body text.\n\nReferences\n"
+        "[1] Smith, J. A study of things. Journal of Stuff, 2020.\n"
+        "[2] Jones, K. (2019) Another study. arXiv:1901.00001\n"
+    )
+
+    assert [reference["key"] for reference in references] == ["[1]", "[2]"]
+    assert references[0]["year"] == 2020
+    assert references[1]["arxiv_id"] == "1901.00001"
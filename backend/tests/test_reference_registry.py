@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from sqlalchemy.orm import Query
+
+from app.models import AnalysisStatus, ReferenceRegistryEntry
+from app.services import reference_registry
+from app.services.reference_registry import evict_entries, register_paper
+
+
+@pytest.fixture
+def make_paper(make_analysis, tmp_path):
+    """A downloaded reference paper, of a new analysis."""
+    def make(name, content=b"%PDF-1.4 same paper", status=AnalysisStatus.VALIDATING):
+        file_path = tmp_path / f"{name}.pdf"
+        file_path.write_bytes(content)
+        return make_analysis(status, file_path=str(file_path)).papers[0]
+
+    return make
+
+
+def test_same_pdf_is_registered_once(db, make_paper):
+    first = make_paper("first")
+    second = make_paper("second")
+
+    entry = register_paper(first, db)
+    second_path = second.file_path
+    assert register_paper(second, db).id == entry.id
+
+    assert db.query(ReferenceRegistryEntry).count() == 1
+    assert first.file_path == second.file_path == entry.file_path
+    assert not os.path.exists(second_path)
+
+
+def test_concurrent_insert_falls_back_to_existing_entry(db, make_paper, monkeypatch):
+    first = make_paper("first")
+    second = make_paper("second")
+    entry = register_paper(first, db)
+
+    # The second worker looked before the first one's entry was committed
+    original_first = Query.first
+    calls = []
+
+    def first_misses_once(query):
+        calls.append(1)
+        return None if len(calls) == 1 else original_first(query)
+
+    monkeypatch.setattr(Query, "first", first_misses_once)
+    found, created = reference_registry._get_or_create_entry(db, entry.content_hash, entry.file_path)
+    monkeypatch.undo()
+
+    assert found.id == entry.id and not created
+    assert register_paper(second, db).id == entry.id
+    assert db.query(ReferenceRegistryEntry).count() == 1
+
+
+@pytest.mark.parametrize("status", [AnalysisStatus.VALIDATING, AnalysisStatus.FAILED])
+def test_eviction_keeps_entries_of_analyses_not_completed(db, make_paper, status):
+    # Failed analyses can be continued, so their papers are still needed
+    in_progress = make_paper("busy", content=b"%PDF busy", status=status)
+    done = make_paper("done", content=b"%PDF done", status=AnalysisStatus.COMPLETED)
+    busy_entry = register_paper(in_progress, db)
+    register_paper(done, db)
+
+    assert evict_entries(db, max_size_mb=0, max_age_days=0) == 1
+
+    assert [entry.id for entry in db.query(ReferenceRegistryEntry)] == [busy_entry.id]
+    assert os.path.exists(busy_entry.file_path)
+    db.refresh(in_progress)
+    assert in_progress.file_path == busy_entry.file_path
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from app.services import validation_agent
+
+RESPONSE = "GRADE: 90\n\nEXPLANATION: Accurate.\n\nSOURCE_TEXT: NOT FOUND\n\nSOURCE_PAGE: UNKNOWN"
+
+
+def test_requests_against_a_long_source_share_one_cacheable_block(monkeypatch, long_source):
+    source_text = long_source
+    jobs = [
+        {"quote_text": "chlorophyll absorbs light", "context_before": None, "context_after": None, "source_text": source_text},
+        {"quote_text": "the glacier ice is melting", "context_before": None, "context_after": None, "source_text": source_text},
+    ]
+    assert len(source_text) > validation_agent.settings.retrieval_full_source_chars
+
+    requests = []
+
+    def fake_create_message(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=RESPONSE)], usage=SimpleNamespace(input_tokens=10))
+
+    monkeypatch.setattr(validation_agent.settings, "validation_grouping", False)
+    monkeypatch.setattr(validation_agent, "_create_message", fake_create_message)
+
+    results = list(validation_agent.validate_quotes_concurrently(jobs, max_concurrency=2))
+
+    assert [error for _, _, error in results] == [None, None]
+    source_blocks = [request["messages"][0]["content"][0] for request in requests]
+    assert source_blocks[0] == source_blocks[1]
+    assert source_blocks[0]["cache_control"] == {"type": "ephemeral"}
+    # The shared passages cover both quotes
+    assert "chlorophyll" in source_blocks[0]["text"] and "glacier" in source_blocks[0]["text"]
+    assert len(source_blocks[0]["text"]) < len(source_text)
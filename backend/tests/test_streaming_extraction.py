@@ -0,0 +1,65 @@
+"""Streaming extraction of large papers gives the same quotes and references as the whole-text path."""
+
+import fitz  # PyMuPDF
+import pytest
+
+from app.config import get_settings
+from app.models import AnalysisStatus, Paper, PaperSourceType, Quote
+from app.services.pdf_processor import extract_text_from_pdf, get_page_count
+from app.services.quote_extractor import extract_quotes
+from app.services.reference_parser import parse_references
+from app.tasks import _extract_streaming
+from benchmarks.synthetic import make_thesis_pdf
+
+
+@pytest.fixture(scope="module")
+def large_thesis(tmp_path_factory):
+    """
+    A thesis just over the streaming threshold, with a quote that opens on
+    the last page of the first window and closes on the first of the next.
+    """
+    settings = get_settings()
+    boundary = settings.extraction_batch_pages
+    directory = tmp_path_factory.mktemp("streaming")
+    draft = make_thesis_pdf(str(directory / "draft.pdf"), settings.extraction_streaming_min_pages + 20, references=120)
+
+    file_path = str(directory / "thesis.pdf")
+    with fitz.open(draft) as doc:
+        doc[boundary - 1].insert_text((50, 820), "As noted, “the window boundary quote begins here", fontsize=9)
+        doc[boundary].insert_text((50, 30), "and ends on the following page” [7].", fontsize=9)
+        doc.save(file_path)
+    return file_path
+
+
+def _quote_fields(quote: dict) -> tuple:
+    return quote["text"], quote["page"], quote["context_before"], quote["context_after"], quote["reference_key"]
+
+
+def test_streaming_matches_whole_text(db, make_analysis, large_thesis):
+    settings = get_settings()
+    assert get_page_count(large_thesis) >= settings.extraction_streaming_min_pages
+
+    analysis = make_analysis(status=AnalysisStatus.EXTRACTING_QUOTES)
+    paper = Paper(analysis_id=analysis.id, file_path=large_thesis, source_type=PaperSourceType.UPLOADED)
+    db.add(paper)
+    db.commit()
+
+    references = _extract_streaming(db, analysis.id, paper)
+    streamed = [
+        (quote.text, quote.page_number, quote.context_before, quote.context_after, quote.reference_key)
+        for quote in db.query(Quote).filter(Quote.analysis_id == analysis.id).order_by(Quote.id)
+    ]
+
+    text = extract_text_from_pdf(large_thesis)
+    expected = [_quote_fields(quote) for quote in extract_quotes(text)]
+    assert streamed == expected
+    assert references == parse_references(text)
+    assert len(references) == 120
+
+    # Quotes are found on both sides of the window boundary, but none across it
+    boundary = settings.extraction_batch_pages
+    opening, closing = text.index("boundary quote begins"), text.index("ends on the following page")
+    assert opening < text.index(f"--- Page {boundary + 1} ---") < closing
+    pages = {page for _, page, _, _, _ in streamed}
+    assert {boundary, boundary + 1} <= pages
+    assert not any("boundary" in text for text, *_ in streamed)
@@ -0,0 +1,83 @@
+import asyncio
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api.middleware import BodySizeLimitMiddleware
+
+LIMIT = 1000
+
+
+def make_client():
+    app = FastAPI()
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=LIMIT)
+    return TestClient(app), received
+
+
+def test_small_upload_passes():
+    client, received = make_client()
+
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert received == [100]
+
+
+def test_declared_length_over_limit_is_rejected_before_parsing():
+    client, received = make_client()
+
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 5000)})
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_chunked_body_is_aborted_once_over_limit():
+    client, received = make_client()
+
+    def body():
+        for _ in range(100):
+            yield b"x" * 100
+
+    response = client.post(
+        "/upload",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_body_stops_being_read_once_over_limit():
+    client, _ = make_client()
+    app = client.app
+    scope = {
+        "type": "http", "method": "POST", "path": "/upload", "raw_path": b"/upload", "root_path": "",
+        "scheme": "http", "query_string": b"", "server": ("test", 80), "client": ("test", 1),
+        "http_version": "1.1", "headers": [(b"content-type", b"multipart/form-data; boundary=b")],
+    }
+    reads, sent = [], []
+
+    part_header = b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n\r\n'
+
+    async def receive():
+        reads.append(1)
+        body = part_header if len(reads) == 1 else b"x" * 100
+        return {"type": "http.request", "body": body, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    # The body is endless; reading stops just past the limit
+    assert len(reads) <= LIMIT // 100 + 2
@@ -0,0 +1,60 @@
+from app.services import source_retriever, validation_cache
+
+
+def prompt_version():
+    validation_cache.get_prompt_version.cache_clear()
+    return validation_cache.get_prompt_version()
+
+
+def test_prompt_version_changes_with_retriever_parameters(monkeypatch):
+    baseline = prompt_version()
+
+    for name, value in [("PASSAGE_WORDS", 300), ("PASSAGE_STRIDE", 100), ("BM25_K1", 1.2), ("RETRIEVER_VERSION", 99)]:
+        with monkeypatch.context() as patch:
+            patch.setattr(source_retriever, name, value)
+            assert prompt_version() != baseline, name
+
+    assert prompt_version() == baseline
+
+
+def test_prompt_version_changes_with_group_size(monkeypatch):
+    baseline = prompt_version()
+
+    monkeypatch.setattr(validation_cache.settings, "validation_group_max_size", 5)
+    assert prompt_version() != baseline
+
+    monkeypatch.undo()
+    assert prompt_version() == baseline
+
+
+def test_cache_key_follows_the_passages_sent(long_source):
+    job = {"quote_text": "chlorophyll absorbs light", "context_before": None, "context_after": None,
+           "source_text": long_source}
+    with_glacier = {**job, "retrieval_queries": ["chlorophyll absorbs light", "glacier ice melting"]}
+    with_volcano = {**job, "retrieval_queries": ["chlorophyll absorbs light", "volcano lava eruption"]}
+
+    # Same quote and source, but other quotes citing it pull in different evidence
+    assert validation_cache.compute_cache_key(with_glacier) != validation_cache.compute_cache_key(with_volcano)
+    assert validation_cache.compute_cache_key(with_glacier) == validation_cache.compute_cache_key(dict(with_glacier))
+
+    # Short sources are sent whole, so the queries do not matter
+    short = {**job, "source_text": "Chlorophyll absorbs light."}
+    assert validation_cache.compute_cache_key(short) == validation_cache.compute_cache_key(
+        {**short, "retrieval_queries": ["glacier"]}
+    )
+
+
+def test_retrieval_queries_do_not_depend_on_the_quotes_validated(db, make_analysis, long_source):
+    from app.tasks import _collect_validation_jobs
+
+    analysis = make_analysis(
+        source_text=long_source, quotes=["chlorophyll absorbs light", "the glacier is melting", "lava erupted"]
+    )
+    quotes = sorted(analysis.quotes, key=lambda quote: quote.id)
+
+    every_job = _collect_validation_jobs(db, analysis.id)
+    one_job = _collect_validation_jobs(db, analysis.id, [quotes[0].id])
+
+    assert len(every_job[0][1]["retrieval_queries"]) == 3
+    assert one_job[0][1]["retrieval_queries"] == every_job[0][1]["retrieval_queries"]
+    assert validation_cache.compute_cache_key(one_job[0][1]) == validation_cache.compute_cache_key(every_job[0][1])
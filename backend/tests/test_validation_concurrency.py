@@ -0,0 +1,45 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.services import validation_agent
+
+RESPONSE = "GRADE: 90\n\nEXPLANATION: Accurate.\n\nSOURCE_TEXT: NOT FOUND\n\nSOURCE_PAGE: UNKNOWN"
+
+
+def test_callers_sharing_an_executor_share_its_cap(monkeypatch):
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def fake_create_message(**kwargs):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return SimpleNamespace(content=[SimpleNamespace(text=RESPONSE)], usage=SimpleNamespace(input_tokens=10))
+
+    monkeypatch.setattr(validation_agent.settings, "validation_grouping", False)
+    monkeypatch.setattr(validation_agent, "_create_message", fake_create_message)
+
+    def reference_jobs(name):
+        return [
+            {"quote_text": f"quote {i}", "context_before": None, "context_after": None, "source_text": f"{name} {i}"}
+            for i in range(4)
+        ]
+
+    # Like _process_pipelined: one thread per reference, one shared request pool
+    with ThreadPoolExecutor(max_workers=2) as request_pool, ThreadPoolExecutor(max_workers=3) as callers:
+        runs = [
+            callers.submit(lambda name=name: list(validation_agent.validate_quotes_concurrently(
+                reference_jobs(name), max_concurrency=2, executor=request_pool
+            )))
+            for name in ("a", "b", "c")
+        ]
+        results = [run.result() for run in runs]
+
+    assert [len(result) for result in results] == [4, 4, 4]
+    assert max(peak) == 2
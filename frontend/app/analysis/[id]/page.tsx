@@ -8,6 +8,8 @@ import {
   getQuotes,
   getMissingPapers,
   continueAnalysis,
+  subscribeToAnalysis,
+  TERMINAL_STATUSES,
   Analysis,
   Quote,
   MissingPaper,
@@ -92,16 +94,53 @@ export default function AnalysisPage() {
 
   useEffect(() => {
     fetchData()
+  }, [analysisId])
 
-    // Poll for updates if analysis is in progress
-    const interval = setInterval(() => {
-      if (analysis && !['completed', 'failed', 'awaiting_uploads'].includes(analysis.status)) {
-        fetchData()
+  const isRunning = analysis !== null && !TERMINAL_STATUSES.includes(analysis.status)
+
+  useEffect(() => {
+    if (!isRunning) return
+
+    // Follow progress as the server pushes it; poll instead if the event stream fails
+    let interval: ReturnType<typeof setInterval> | undefined
+    // Quote statuses by ID, so a quote graded again (e.g. a retry) is not counted twice
+    const quoteStatuses = new Map<string, string>()
+    const countQuotes = (status: string) =>
+      Array.from(quoteStatuses.values()).filter(s => s === status).length
+
+    const unsubscribe = subscribeToAnalysis(
+      analysisId,
+      (event) => {
+        if (event.type === 'snapshot') {
+          const { type, message, quote_statuses, ...fields } = event
+          quoteStatuses.clear()
+          Object.entries(quote_statuses).forEach(([id, status]) => quoteStatuses.set(id, status))
+          setAnalysis(prev => prev && { ...prev, ...fields, status_message: message })
+        } else if (event.type === 'status') {
+          const { type, message, ...fields } = event
+          setAnalysis(prev => prev && { ...prev, ...fields, status_message: message })
+        } else if (event.type === 'quote') {
+          quoteStatuses.set(String(event.quote_id), event.status)
+          setAnalysis(prev => prev && {
+            ...prev,
+            quotes_validated: countQuotes('validated'),
+            quotes_failed: countQuotes('failed'),
+          })
+        }
+        if ((event.type === 'snapshot' || event.type === 'status') && TERMINAL_STATUSES.includes(event.status)) {
+          fetchData()
+        }
+      },
+      () => {
+        interval = setInterval(fetchData, 3000)
       }
-    }, 3000)
+    )
 
-    return () => clearInterval(interval)
-  }, [analysisId, analysis?.status])
+    return () => {
+      unsubscribe()
+      if (interval) clearInterval(interval)
+    }
+  }, [analysisId, isRunning])
 
   const handleContinue = async () => {
     try {
@@ -274,6 +313,12 @@ export default function AnalysisPage() {
             })}
           </div>
 
+          {analysis.quotes_total > 0 && (
+            <p className="text-center text-sm text-gray-600 mt-6">
+              {analysis.quotes_validated + analysis.quotes_failed} of {analysis.quotes_total} quotes checked
+            </p>
+          )}
+
           <p className="text-center text-sm text-gray-500 mt-6">
             This may take a few minutes depending on the number of references...
           </p>
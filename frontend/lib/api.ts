@@ -28,8 +28,38 @@ export interface Analysis {
   created_at: string
   updated_at: string | null
   uploaded_paper: Paper | null
+  batch_mode: boolean
+  manual_mode: boolean
+  quotes_total: number
+  quotes_validated: number
+  quotes_failed: number
 }
 
+// Statuses after which an analysis makes no more progress on its own
+export const TERMINAL_STATUSES = ['completed', 'failed', 'awaiting_uploads']
+
+export type ProgressEvent =
+  | {
+      type: 'snapshot'
+      status: string
+      message: string | null
+      quotes_total: number
+      quotes_validated: number
+      quotes_failed: number
+      // Status of every quote graded so far, by quote ID
+      quote_statuses: Record<string, string>
+    }
+  | { type: 'status'; status: string; message: string | null }
+  | { type: 'reference'; paper_id: number; reference_key: string | null; available: boolean }
+  | {
+      type: 'quote'
+      quote_id: number
+      reference_key: string | null
+      status: string
+      grade: number | null
+      validated_locally: boolean
+    }
+
 export interface Paper {
   id: number
   title: string | null
@@ -73,6 +103,34 @@ export async function getAnalysis(id: number): Promise<Analysis> {
   return response.data
 }
 
+/**
+ * Follow an analysis' progress over server-sent events.
+ * onError is called (and the stream closed) if the connection fails.
+ * Returns a function that closes the stream.
+ */
+export function subscribeToAnalysis(
+  id: number,
+  onEvent: (event: ProgressEvent) => void,
+  onError: () => void
+): () => void {
+  const source = new EventSource(`${API_URL}/api/analysis/${id}/events`)
+
+  source.onmessage = (message) => {
+    const event: ProgressEvent = JSON.parse(message.data)
+    // The server ends the stream after a terminal status; close it before the browser reconnects
+    if ((event.type === 'snapshot' || event.type === 'status') && TERMINAL_STATUSES.includes(event.status)) {
+      source.close()
+    }
+    onEvent(event)
+  }
+  source.onerror = () => {
+    source.close()
+    onError()
+  }
+
+  return () => source.close()
+}
+
 export async function getQuotes(analysisId: number): Promise<QuotesResponse> {
   const response = await api.get(`/api/quotes/analysis/${analysisId}`)
   return response.data